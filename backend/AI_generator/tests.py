@@ -1,3 +1,54 @@
-from django.test import TestCase
+from unittest.mock import patch
+from django.urls import reverse
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from AI_generator.models import CoverLetter
 
-# Create your tests here.
+User = get_user_model()
+
+
+class CoverLetterAPITestCase(APITestCase):
+    def setUp(self):
+        # Mock S3 so tests don't touch AWS
+        self.boto3_patcher = patch("AI_generator.views.boto3")
+        self.boto3_patcher.start()
+        self.addCleanup(self.boto3_patcher.stop)
+
+        self.user = User.objects.create_user(
+            email="josh@example.com", password="testpass123"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.list_url = reverse("get_cover_letters")
+
+    def test_conditional_get_and_write_invalidation(self):
+        etag = self.client.get(self.list_url)["ETag"]
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse("save_cover_letter"),
+                {
+                    "job_title": "SWE",
+                    "company_name": "Google",
+                    "cover_letter": "Dear hiring manager,\nHello.",
+                },
+                format="json",
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 1)
+        etag = response["ETag"]
+
+        cover_letter = CoverLetter.objects.get()
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.delete(
+                reverse("delete_cover_letter", args=[cover_letter.id])
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 0)
@@ -19,6 +19,8 @@ from rest_framework.pagination import PageNumberPagination
 from reportlab.pdfgen import canvas
 
 from AI_generator.models import CoverLetter
+from sync.etag import COVER_LETTERS, bump_data_version, conditional_get
+from sync.events import publish_change
 from AI_generator.serializers import (
     CoverLetterRequestSerializer,
     CoverLetterSerializer,
@@ -209,6 +211,14 @@ class SaveCoverLetter(APIView):
             company_name=company_name,
             cover_letter_file_path=file_name,
         )
+        bump_data_version(request.user.id, COVER_LETTERS)
+        publish_change(
+            request.user.id,
+            "cover_letter",
+            "created",
+            [cover.id],
+            CoverLetterSerializer(cover).data,
+        )
         return Response(
             {"message": "Cover letter saved", "cover_letter_id": cover.id},
             status=status.HTTP_201_CREATED,
@@ -244,6 +254,7 @@ class GetCoverLetterURL(APIView):
 class GetCoverLetters(APIView):
     permission_classes = [IsAuthenticated]
 
+    @conditional_get(COVER_LETTERS)
     def get(self, request):
         ordering = request.query_params.get("ordering", "-created_at")
         queryset = CoverLetter.objects.filter(user=request.user).order_by(ordering)
@@ -273,4 +284,6 @@ class DeleteCoverLetter(APIView):
             Bucket=settings.AWS_STORAGE_BUCKET_NAME, Key=cl.cover_letter_file_path
         )
         cl.delete()
+        bump_data_version(request.user.id, COVER_LETTERS)
+        publish_change(request.user.id, "cover_letter", "deleted", [cover_letter_id])
         return Response({"message": "Deleted"}, status=status.HTTP_200_OK)
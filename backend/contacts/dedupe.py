@@ -0,0 +1,145 @@
+# contacts/dedupe.py
+
+import json
+
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.db import connection
+from django.db.models import Count
+from django.utils import timezone
+
+from sync.models import Tombstone
+from .models import Contact, Interaction
+
+# ?by= value -> the generated column contacts are grouped on
+DUPLICATE_KEYS = {"email": "normalized_email", "phone": "normalized_phone"}
+DUPLICATE_CLUSTER_LIMIT = 1000  # clusters listed or merged per request
+# Copied onto the kept contact when it has no value of its own
+MERGE_FILL_FIELDS = (
+    "phone",
+    "company",
+    "position",
+    "notes",
+    "linkedin_url",
+    "twitter_url",
+    "avatar",
+)
+# Field -> Postgres type of everything written back to the kept contact
+MERGE_UPDATE_TYPES = {
+    **{field: "text" for field in MERGE_FILL_FIELDS},
+    "tags": "jsonb",
+    "is_favorite": "boolean",
+    "last_contacted": "date",
+    "next_follow_up": "date",
+}
+
+
+def duplicate_clusters(user_id, by="email", keys=None, limit=DUPLICATE_CLUSTER_LIMIT):
+    """
+    The user's contacts sharing a normalized email or phone, as (key, ids)
+    pairs with ids oldest first, largest clusters first. One GROUP BY read
+    off the (user, normalized_*) index. `keys` restricts it to those keys.
+    """
+    column = DUPLICATE_KEYS[by]
+    contacts = Contact.objects.filter(user_id=user_id, **{f"{column}__gt": ""})
+    if keys is not None:
+        contacts = contacts.filter(**{f"{column}__in": keys})
+    rows = (
+        contacts.values(column)
+        .annotate(ids=ArrayAgg("id", ordering="id"), size=Count("id"))
+        .filter(size__gt=1)
+        .order_by("-size", column)[:limit]
+    )
+    return [(row[column], row["ids"]) for row in rows]
+
+
+def _merge_into(keeper, duplicates):
+    for duplicate in duplicates:
+        for field in MERGE_FILL_FIELDS:
+            if not getattr(keeper, field) and getattr(duplicate, field):
+                setattr(keeper, field, getattr(duplicate, field))
+        keeper.tags = list(keeper.tags or [])
+        keeper.tags += [tag for tag in duplicate.tags or [] if tag not in keeper.tags]
+        keeper.is_favorite = keeper.is_favorite or duplicate.is_favorite
+    everyone = [keeper, *duplicates]
+    keeper.last_contacted = max(
+        (c.last_contacted for c in everyone if c.last_contacted), default=None
+    )
+    keeper.next_follow_up = min(
+        (c.next_follow_up for c in everyone if c.next_follow_up), default=None
+    )
+
+
+def _update_keepers(keepers, now):
+    # One UPDATE joining per-field arrays; bulk_update would spend seconds
+    # building a CASE WHEN per field and row
+    quote = connection.ops.quote_name
+    fields = list(MERGE_UPDATE_TYPES)
+    columns = {field: Contact._meta.get_field(field).column for field in fields}
+    arrays = [[keeper.id for keeper in keepers]]
+    for field in fields:
+        values = [getattr(keeper, field) for keeper in keepers]
+        if MERGE_UPDATE_TYPES[field] == "jsonb":
+            values = [json.dumps(value) for value in values]
+        arrays.append(values)
+    assignments = ", ".join(f"{quote(columns[f])} = m.{quote(f)}" for f in fields)
+    unnest = ", ".join(
+        ["%s::bigint[]"] + [f"%s::{MERGE_UPDATE_TYPES[f]}[]" for f in fields]
+    )
+    names = ", ".join(["id"] + [quote(f) for f in fields])
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {Contact._meta.db_table} AS c "
+            f"SET {assignments}, updated_at = %s "
+            f"FROM unnest({unnest}) AS m({names}) WHERE c.id = m.id",
+            [now, *arrays],
+        )
+
+
+def merge_contacts(user_id, clusters):
+    """
+    Merge each cluster of the user's contact ids into its first id: blank
+    fields are filled in from the others, tags combined, the latest
+    last_contacted and soonest next_follow_up kept, and every duplicate's
+    interactions moved over in one UPDATE before the duplicates are deleted.
+    Run inside a transaction. Returns (kept ids, deleted ids, moved
+    interaction ids).
+    """
+    ids = [contact_id for cluster in clusters for contact_id in cluster]
+    contacts = {
+        contact.id: contact
+        for contact in Contact.objects.select_for_update()
+        .filter(user_id=user_id, id__in=ids)
+        .order_by("id")
+    }
+    now = timezone.now()
+    keepers, moves = [], []
+    for cluster in clusters:
+        rows = [
+            contacts[contact_id] for contact_id in cluster if contact_id in contacts
+        ]
+        if len(rows) < 2:
+            continue
+        keeper, *duplicates = rows
+        _merge_into(keeper, duplicates)
+        keeper.updated_at = now
+        keepers.append(keeper)
+        moves += [(duplicate.id, keeper.id) for duplicate in duplicates]
+    if not moves:
+        return [], [], []
+
+    deleted_ids = [duplicate_id for duplicate_id, _ in moves]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {Interaction._meta.db_table} AS i "
+            "SET contact_id = m.keep, updated_at = %s "
+            "FROM unnest(%s::bigint[], %s::bigint[]) AS m(duplicate, keep) "
+            "WHERE i.contact_id = m.duplicate RETURNING i.id",
+            [now, deleted_ids, [keeper_id for _, keeper_id in moves]],
+        )
+        moved_ids = [interaction_id for (interaction_id,) in cursor.fetchall()]
+    _update_keepers(keepers, now)
+    Contact.objects.filter(id__in=deleted_ids).delete()
+    kept_ids = [keeper.id for keeper in keepers]
+    Contact.refresh_interaction_summaries(Contact.objects.filter(id__in=kept_ids))
+    Tombstone.record(user_id, Contact, deleted_ids)
+    return kept_ids, deleted_ids, moved_ids
@@ -0,0 +1,94 @@
+# contacts/follow_ups.py
+
+from datetime import timedelta
+from itertools import groupby
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Contact, FollowUpDigest
+
+# "Due this week": overdue, today, or within the next six days
+FOLLOW_UP_WINDOW_DAYS = 7
+DIGEST_CONTACTS = 10  # contacts listed per digest; the counts cover the rest
+DIGEST_RETENTION_DAYS = 30
+# Rows per server-side cursor fetch, and digests per INSERT
+DIGEST_CHUNK_SIZE = 5000
+DIGEST_BATCH_SIZE = 1000
+
+
+def follow_up_due_by(today=None):
+    """
+    Last day of the follow-up window starting `today` (default: the local
+    date).
+    """
+    return (today or timezone.localdate()) + timedelta(days=FOLLOW_UP_WINDOW_DAYS - 1)
+
+
+def due_follow_ups(queryset, today=None):
+    """
+    Contacts in `queryset` with a follow-up due by the end of the window,
+    soonest (most overdue) first. Served by the partial (user,
+    next_follow_up) index.
+    """
+    return queryset.filter(next_follow_up__lte=follow_up_due_by(today)).order_by(
+        "next_follow_up", "id"
+    )
+
+
+def _digest(user_id, today, due_by, rows):
+    due_count = overdue_count = 0
+    contacts = []
+    for _, contact_id, name, next_follow_up in rows:
+        due_count += 1
+        if next_follow_up < today:
+            overdue_count += 1
+        if len(contacts) < DIGEST_CONTACTS:
+            contacts.append(
+                {
+                    "id": contact_id,
+                    "name": name,
+                    "next_follow_up": next_follow_up.isoformat(),
+                }
+            )
+    return FollowUpDigest(
+        user_id=user_id,
+        date=today,
+        due_by=due_by,
+        due_count=due_count,
+        overdue_count=overdue_count,
+        contacts=contacts,
+    )
+
+
+def build_follow_up_digests(today=None):
+    """
+    Write today's FollowUpDigest for every user with a follow-up due, in one
+    pass over all users' due contacts read in user order off a server-side
+    cursor, replacing any digests already written today. Digests older than
+    DIGEST_RETENTION_DAYS are pruned. Returns the number written.
+    """
+    today = today or timezone.localdate()
+    due_by = follow_up_due_by(today)
+    rows = (
+        due_follow_ups(Contact.objects.all(), today)
+        .order_by("user_id", "next_follow_up", "id")
+        .values_list("user_id", "id", "name", "next_follow_up")
+        .iterator(chunk_size=DIGEST_CHUNK_SIZE)
+    )
+    written = 0
+    with transaction.atomic():
+        FollowUpDigest.objects.filter(date=today).delete()
+        FollowUpDigest.objects.filter(
+            date__lt=today - timedelta(days=DIGEST_RETENTION_DAYS)
+        ).delete()
+        batch = []
+        for user_id, user_rows in groupby(rows, key=lambda row: row[0]):
+            batch.append(_digest(user_id, today, due_by, user_rows))
+            if len(batch) == DIGEST_BATCH_SIZE:
+                FollowUpDigest.objects.bulk_create(batch)
+                written += len(batch)
+                batch = []
+        FollowUpDigest.objects.bulk_create(batch)
+        written += len(batch)
+    return written
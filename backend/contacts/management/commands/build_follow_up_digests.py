@@ -0,0 +1,27 @@
+# contacts/management/commands/build_follow_up_digests.py
+
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from contacts.follow_ups import build_follow_up_digests
+
+
+class Command(BaseCommand):
+    help = (
+        "Write today's follow-up digest for every user with follow-ups due this "
+        "week, in a single pass over all users. Run once a day."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--date",
+            type=date.fromisoformat,
+            help="Build the digests as of this date (YYYY-MM-DD) instead of today",
+        )
+
+    def handle(self, *args, **options):
+        written = build_follow_up_digests(options["date"])
+        self.stdout.write(
+            self.style.SUCCESS(f"✅ Wrote {written} follow-up digest(s).")
+        )
@@ -0,0 +1,38 @@
+# contacts/management/commands/rebuild_interaction_summaries.py
+
+from django.core.management.base import BaseCommand
+from django.db.models import Max, Min
+from contacts.models import Contact
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute every contact's interaction_count and last_interaction_* "
+        "fields from its interactions. Run once after deploying them, or to "
+        "repair drift."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Number of contact ids updated per statement",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        bounds = Contact.objects.aggregate(first=Min("id"), last=Max("id"))
+        updated = 0
+        if bounds["first"] is not None:
+            # Short id-range UPDATEs, each its own transaction, so rows aren't
+            # locked for the whole run
+            for start in range(bounds["first"], bounds["last"] + 1, batch_size):
+                updated += Contact.refresh_interaction_summaries(
+                    Contact.objects.filter(id__gte=start, id__lt=start + batch_size)
+                )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✅ Rebuilt interaction summaries for {updated} contact(s)."
+            )
+        )
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.5 on 2026-10-19 15:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("contacts", "0006_contact_search_vector"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="contact",
+            name="tags",
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
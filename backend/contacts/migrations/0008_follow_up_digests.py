@@ -0,0 +1,59 @@
+# Generated by Django 5.1.5 on 2026-10-19 15:38
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("contacts", "0007_drop_tags_btree"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FollowUpDigest",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField()),
+                ("due_by", models.DateField()),
+                ("due_count", models.PositiveIntegerField()),
+                ("overdue_count", models.PositiveIntegerField()),
+                ("contacts", models.JSONField(default=list)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="contact",
+            index=models.Index(
+                condition=models.Q(("next_follow_up__isnull", False)),
+                fields=["user", "next_follow_up"],
+                name="contact_follow_up_idx",
+            ),
+        ),
+        migrations.AddField(
+            model_name="followupdigest",
+            name="user",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="follow_up_digests",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="followupdigest",
+            constraint=models.UniqueConstraint(
+                fields=("user", "date"), name="unique_user_follow_up_digest"
+            ),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.1.5 on 2026-10-19 15:44
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("contacts", "0008_follow_up_digests"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="contact",
+            name="interaction_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="contact",
+            name="last_interaction_date",
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="contact",
+            name="last_interaction_type",
+            field=models.CharField(blank=True, max_length=20, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="contact",
+            index=models.Index(
+                fields=["user", "last_interaction_date"],
+                name="contacts_co_user_id_089f7a_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.1.5 on 2026-10-19 15:46
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("contacts", "0009_interaction_summary"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="contact",
+            index=models.Index(
+                fields=["user", "name", "id"], name="contacts_co_user_id_f0b179_idx"
+            ),
+        ),
+    ]
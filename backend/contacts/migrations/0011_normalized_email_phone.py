@@ -0,0 +1,57 @@
+# Generated by Django 5.1.5 on 2026-10-19 15:48
+
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("contacts", "0010_contact_name_index"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="contact",
+            name="normalized_email",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=django.db.models.functions.text.Lower(
+                    django.db.models.functions.text.Trim("email")
+                ),
+                output_field=models.CharField(max_length=254),
+            ),
+        ),
+        migrations.AddField(
+            model_name="contact",
+            name="normalized_phone",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=models.Func(
+                    models.F("phone"),
+                    models.Value("[^0-9]"),
+                    models.Value(""),
+                    models.Value("g"),
+                    function="REGEXP_REPLACE",
+                ),
+                output_field=models.CharField(max_length=20),
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="contact",
+            index=models.Index(
+                fields=["user", "normalized_email"],
+                name="contacts_co_user_id_b87406_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="contact",
+            index=models.Index(
+                condition=models.Q(("normalized_phone__gt", "")),
+                fields=["user", "normalized_phone"],
+                name="contact_normalized_phone_idx",
+            ),
+        ),
+    ]
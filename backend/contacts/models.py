@@ -2,8 +2,10 @@
 
 
 from django.db import models
-from django.db.models import indexes
+from django.db.models import Count, F, Func, OuterRef, Q, Subquery, Value, indexes
+from django.db.models.functions import Coalesce, Lower, Replace, Trim
 from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
@@ -45,17 +47,90 @@ class Contact(models.Model):
     linkedin_url = models.URLField(blank=True, null=True)
     twitter_url = models.URLField(blank=True, null=True)
     is_favorite = models.BooleanField(default=False, db_index=True)
-    tags = models.JSONField(default=list, blank=True, db_index=True)
+    tags = models.JSONField(default=list, blank=True)
     avatar = models.URLField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    # Copied from the contact's interactions whenever one is added or deleted
+    # (see refresh_interaction_summaries), so lists can sort and filter by
+    # recency without aggregating interactions
+    interaction_count = models.PositiveIntegerField(default=0)
+    last_interaction_date = models.DateField(blank=True, null=True)
+    last_interaction_type = models.CharField(max_length=20, blank=True, null=True)
+    # Maintained by Postgres for search. The 'simple' configuration keeps
+    # words as typed (no stemming or stop words), and splitting the email at
+    # "@" makes its domain searchable too.
+    search_vector = models.GeneratedField(
+        expression=SearchVector("name", weight="A", config="simple")
+        + SearchVector("company", weight="B", config="simple")
+        + SearchVector(
+            "position",
+            Replace("email", Value("@"), Value(" ")),
+            weight="C",
+            config="simple",
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+    # Also maintained by Postgres, as the keys duplicates are found by
+    normalized_email = models.GeneratedField(
+        expression=Lower(Trim("email")),
+        output_field=models.CharField(max_length=254),
+        db_persist=True,
+    )
+    normalized_phone = models.GeneratedField(  # digits only
+        expression=Func(
+            F("phone"),
+            Value("[^0-9]"),
+            Value(""),
+            Value("g"),
+            function="REGEXP_REPLACE",
+        ),
+        output_field=models.CharField(max_length=20),
+        db_persist=True,
+    )
 
     class Meta:
         indexes = [
             indexes.Index(fields=["user", "-id"]),
             indexes.Index(fields=["user", "relationship", "-id"]),
+            models.Index(fields=["user", "name", "id"]),  # A-Z paging
             models.Index(fields=["user", "is_favorite"]),
-            GinIndex(fields=["tags"]),
+            GinIndex(fields=["tags"]),  # @>, ?| and ? tag filters
+            GinIndex(fields=["search_vector"]),
+            models.Index(fields=["user", "updated_at"]),  # delta sync
+            # Due follow-ups; most contacts never have one scheduled
+            models.Index(
+                fields=["user", "next_follow_up"],
+                condition=Q(next_follow_up__isnull=False),
+                name="contact_follow_up_idx",
+            ),
+            # Stale contacts: least recently in touch first
+            models.Index(fields=["user", "last_interaction_date"]),
+            # Duplicate lookups
+            models.Index(fields=["user", "normalized_email"]),
+            models.Index(
+                fields=["user", "normalized_phone"],
+                condition=Q(normalized_phone__gt=""),
+                name="contact_normalized_phone_idx",
+            ),
         ]
 
+    @classmethod
+    def refresh_interaction_summaries(cls, contacts):
+        """
+        Recompute interaction_count and last_interaction_* for the `contacts`
+        queryset from their interactions, in one UPDATE that reads each
+        contact's newest interaction off the (contact, -date) index.
+        """
+        interactions = Interaction.objects.filter(contact=OuterRef("pk"))
+        count = interactions.order_by().values("contact").annotate(n=Count("id"))
+        latest = interactions.order_by("-date", "-id")
+        return contacts.update(
+            interaction_count=Coalesce(Subquery(count.values("n")), 0),
+            last_interaction_date=Subquery(latest.values("date")[:1]),
+            last_interaction_type=Subquery(latest.values("type")[:1]),
+        )
+
     def __str__(self):
         return self.name
 
@@ -75,6 +150,7 @@ class Interaction(models.Model):
     date = models.DateField()
     type = models.CharField(max_length=20, choices=INTERACTION_TYPES, default="email")
     notes = models.TextField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         # Always order interactions newest first
@@ -85,3 +161,31 @@ class Interaction(models.Model):
 
     def __str__(self):
         return f"{self.type} on {self.date} for {self.contact.name}"
+
+
+class FollowUpDigest(models.Model):
+    """
+    A user's follow-ups due on or before `due_by` as of `date`, written once
+    a day by the build_follow_up_digests command for reminders to read.
+    """
+
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="follow_up_digests"
+    )
+    date = models.DateField()
+    due_by = models.DateField()
+    due_count = models.PositiveIntegerField()
+    overdue_count = models.PositiveIntegerField()
+    # The soonest few as [{"id", "name", "next_follow_up"}], oldest first
+    contacts = models.JSONField(default=list)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "date"], name="unique_user_follow_up_digest"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.due_count} follow-up(s) for user {self.user_id} on {self.date}"
@@ -1,7 +1,41 @@
 from rest_framework import serializers
+from .dedupe import DUPLICATE_CLUSTER_LIMIT, DUPLICATE_KEYS
 from .models import Contact, Interaction
 
 
+def row_plan(serializer):
+    """
+    Resolve once what serializing a row with `serializer` takes: (name,
+    attribute, field) for each readable field, attribute None for fields
+    computed from the whole instance (e.g. SerializerMethodFields).
+    """
+    plan = []
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+        attribute = None if field.source == "*" else field.source
+        if attribute is not None and "." in attribute:
+            raise ValueError(f"{field.field_name}: dotted sources are not supported")
+        plan.append((field.field_name, attribute, field))
+    return plan
+
+
+def serialize_row(plan, instance):
+    """
+    Serialize `instance` with a row_plan: what Serializer.to_representation
+    returns, but reading plain attributes directly instead of going through
+    each field's get_attribute machinery.
+    """
+    row = {}
+    for name, attribute, field in plan:
+        if attribute is None:
+            row[name] = field.to_representation(instance)
+        else:
+            value = getattr(instance, attribute)
+            row[name] = None if value is None else field.to_representation(value)
+    return row
+
+
 class InteractionSerializer(serializers.ModelSerializer):
     class Meta:
         model = Interaction
@@ -31,9 +65,41 @@ class ContactSerializer(serializers.ModelSerializer):
             "tags",
             "avatar",
             "interactions",
+            # Over all interactions, of which `interactions` may hold only the
+            # latest
+            "interaction_count",
+            "last_interaction_date",
+            "last_interaction_type",
         ]
+        read_only_fields = [
+            "interaction_count",
+            "last_interaction_date",
+            "last_interaction_type",
+        ]
+
+    def to_representation(self, instance):
+        # A page of contacts shares one child serializer, so the field plans
+        # are built once per page rather than once per contact
+        if getattr(self, "_row_plan", None) is None:
+            self._row_plan = row_plan(self)
+            self._interaction_plan = row_plan(InteractionSerializer())
+        return serialize_row(self._row_plan, instance)
 
     def get_interactions(self, obj):
-        # Because of Interaction.Meta.ordering, .all() is already newest first
-        qs = obj.interactions.all()
-        return InteractionSerializer(qs, many=True).data
+        # Only the latest few when prefetched as latest_interactions; otherwise
+        # all of them (Interaction.Meta.ordering makes .all() newest first)
+        qs = getattr(obj, "latest_interactions", None)
+        if qs is None:
+            qs = obj.interactions.all()
+        return [serialize_row(self._interaction_plan, i) for i in qs]
+
+
+class ContactMergeSerializer(serializers.Serializer):
+    by = serializers.ChoiceField(choices=list(DUPLICATE_KEYS), default="email")
+    # Normalized keys from the duplicates list; all clusters when omitted
+    keys = serializers.ListField(
+        child=serializers.CharField(),
+        allow_empty=False,
+        required=False,
+        max_length=DUPLICATE_CLUSTER_LIMIT,
+    )
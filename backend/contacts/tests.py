@@ -1,3 +1,342 @@
-from django.test import TestCase
+import csv
+import io
+from datetime import date, timedelta
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from rest_framework import serializers
+from contacts.follow_ups import build_follow_up_digests
+from contacts.models import Contact, FollowUpDigest, Interaction
+from contacts.serializers import ContactSerializer, InteractionSerializer
+from contacts.views import with_interaction_summary
 
-# Create your tests here.
+User = get_user_model()
+
+
+class ContactAPITestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="josh@example.com", password="testpass123"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.contact = Contact.objects.create(
+            user=self.user, name="Ada Lovelace", email="ada@example.com"
+        )
+        self.list_url = reverse("contact-list-create")
+        self.detail_url = reverse("contact-detail", args=[self.contact.id])
+
+    def test_conditional_get_and_write_invalidation(self):
+        interaction = Interaction.objects.create(
+            contact=self.contact, date=date.today(), type="call"
+        )
+        etags = {
+            url: self.client.get(url)["ETag"]
+            for url in (self.list_url, self.detail_url)
+        }
+        for url, etag in etags.items():
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        writes = {
+            "create": lambda: self.client.post(
+                self.list_url,
+                {"name": "Grace Hopper", "email": "grace@example.com"},
+                format="json",
+            ),
+            "update": lambda: self.client.patch(
+                self.detail_url, {"is_favorite": True}, format="json"
+            ),
+            "add_interaction": lambda: self.client.post(
+                reverse("interaction-list-create", args=[self.contact.id]),
+                {"date": str(date.today()), "type": "email"},
+                format="json",
+            ),
+            "delete_interaction": lambda: self.client.delete(
+                reverse("interaction-detail", args=[interaction.id])
+            ),
+        }
+        for name, write in writes.items():
+            with self.subTest(write=name):
+                with self.captureOnCommitCallbacks(execute=True):
+                    self.assertLess(write().status_code, 300)
+                for url, etag in etags.items():
+                    response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                    self.assertEqual(response.status_code, status.HTTP_200_OK)
+                    etags[url] = response["ETag"]
+
+        list_etag = etags[self.list_url]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(self.detail_url)
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=list_etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn(self.contact.id, [c["id"] for c in response.data["results"]])
+
+    def test_list_count_is_cached_per_filter_until_a_write(self):
+        for i in range(12):
+            Contact.objects.create(user=self.user, name=f"Contact {i}")
+        self.assertEqual(self.client.get(self.list_url).data["count"], 13)
+        # Other pages reuse the count instead of running COUNT(*) again
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.list_url, {"page": 2})
+        self.assertEqual(response.data["count"], 13)
+        self.assertFalse(
+            any(q["sql"].startswith("SELECT COUNT(") for q in queries.captured_queries)
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                self.list_url, {"name": "New", "email": "new@example.com"}
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.client.get(self.list_url).data["count"], 14)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(self.detail_url)
+        self.assertEqual(self.client.get(self.list_url, {"page": 2}).data["count"], 13)
+        response = self.client.get(self.list_url, {"search": "New"})
+        self.assertEqual(response.data["count"], 1)
+
+    def test_cursor_paging_walks_every_contact_once(self):
+        for name in ("Bob", "Alice", "Bob", "Carol", "alice"):
+            Contact.objects.create(user=self.user, name=name, relationship="mentor")
+
+        def walk(params):
+            seen, cursor = [], ""
+            while cursor is not None:
+                response = self.client.get(
+                    self.list_url, {**params, "cursor": cursor, "limit": 2}
+                )
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                seen += [(c["name"], c["id"]) for c in response.data["results"]]
+                cursor = response.data["next_cursor"]
+            return seen
+
+        by_id = walk({})
+        self.assertEqual(len(by_id), 6)
+        self.assertEqual(by_id, sorted(by_id, key=lambda c: -c[1]))
+        by_name = walk({"ordering": "name", "relationship": "Mentor"})
+        self.assertEqual(len(by_name), 5)
+        self.assertEqual(len(set(by_name)), 5)
+        response = self.client.get(self.list_url, {"cursor": "!!"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_search_matches_word_prefixes_best_first(self):
+        Contact.objects.create(
+            user=self.user, name="Grace Hopper", email="gh@navy.mil", company="Navy"
+        )
+        Contact.objects.create(user=self.user, name="Navy Recruiting", email="r@x.io")
+        Contact.objects.create(user=self.user, name="Dan O'Brien", email="d@x.io")
+
+        def search(value):
+            response = self.client.get(self.list_url, {"search": value})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            return [c["name"] for c in response.data["results"]]
+
+        self.assertEqual(search("gra HOP"), ["Grace Hopper"])
+        self.assertEqual(search("example"), ["Ada Lovelace"])  # email domain
+        # A name match outranks a company match
+        self.assertEqual(search("navy"), ["Navy Recruiting", "Grace Hopper"])
+        self.assertEqual(search("o'bri"), ["Dan O'Brien"])
+        self.assertEqual(search("zzz"), [])
+
+    def test_list_embeds_latest_interactions_and_pages_the_rest(self):
+        for days_ago in range(5):
+            Interaction.objects.create(
+                contact=self.contact,
+                date=date.today() - timedelta(days=days_ago),
+                notes=f"{days_ago} days ago",
+            )
+        Contact.refresh_interaction_summaries(Contact.objects.all())
+        contact = self.client.get(self.list_url).data["results"][0]
+        self.assertEqual(contact["interaction_count"], 5)
+        self.assertEqual(
+            [i["notes"] for i in contact["interactions"]],
+            ["0 days ago", "1 days ago", "2 days ago"],
+        )
+
+        url = reverse("interaction-list-create", args=[self.contact.id])
+        response = self.client.get(url)
+        self.assertEqual(response.data["count"], 5)
+        self.assertEqual(response.data["results"][-1]["notes"], "4 days ago")
+        other = User.objects.create_user(email="eve@example.com", password="x")
+        self.client.force_authenticate(user=other)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_interaction_writes_maintain_contact_summary(self):
+        url = reverse("interaction-list-create", args=[self.contact.id])
+        for day, kind in ((date(2024, 1, 5), "call"), (date(2024, 3, 1), "email")):
+            self.client.post(url, {"date": str(day), "type": kind}, format="json")
+        Contact.objects.create(user=self.user, name="Never contacted")
+        Contact.objects.create(
+            user=self.user, name="Recent", last_interaction_date=date(2024, 6, 1)
+        )
+        contact = self.client.get(self.detail_url).data
+        self.assertEqual(contact["interaction_count"], 2)
+        self.assertEqual(contact["last_interaction_date"], "2024-03-01")
+        self.assertEqual(contact["last_interaction_type"], "email")
+        response = self.client.get(
+            self.list_url,
+            {"last_interaction_before": "2024-05-01", "ordering": "id"},
+        )
+        self.assertEqual(
+            [c["name"] for c in response.data["results"]],
+            ["Ada Lovelace", "Never contacted"],
+        )
+
+        latest = Interaction.objects.get(type="email")
+        self.client.delete(reverse("interaction-detail", args=[latest.id]))
+        self.contact.refresh_from_db()
+        self.assertEqual(self.contact.interaction_count, 1)
+        self.assertEqual(self.contact.last_interaction_date, date(2024, 1, 5))
+        self.assertEqual(self.contact.last_interaction_type, "call")
+
+    def test_fast_serializer_matches_drf_output(self):
+        self.contact.tags = ["recruiter"]
+        self.contact.next_follow_up = date(2030, 1, 2)
+        self.contact.save()
+        Interaction.objects.create(contact=self.contact, date=date.today(), notes=None)
+        Interaction.objects.create(contact=self.contact, date=date(2020, 5, 1))
+        contact = with_interaction_summary(Contact.objects.all()).get()
+        serializer = ContactSerializer()
+        fast = serializer.to_representation(contact)
+        drf = serializers.ModelSerializer.to_representation(serializer, contact)
+        self.assertEqual(list(fast.items()), list(drf.items()))
+        self.assertEqual(
+            fast["interactions"],
+            InteractionSerializer(contact.latest_interactions, many=True).data,
+        )
+
+    def test_filter_by_several_tags(self):
+        self.contact.tags = ["recruiter", "fintech"]
+        self.contact.save()
+        Contact.objects.create(user=self.user, name="Grace", tags=["fintech"])
+        Contact.objects.create(user=self.user, name="Alan", tags=["biotech"])
+
+        def names(params):
+            response = self.client.get(self.list_url, params)
+            return sorted(c["name"] for c in response.data["results"])
+
+        self.assertEqual(names({"tags": "fintech,recruiter"}), ["Ada Lovelace"])
+        self.assertEqual(
+            names({"tags": "recruiter,biotech", "tag_match": "any"}),
+            ["Ada Lovelace", "Alan"],
+        )
+
+    def test_tag_facets_count_and_refresh_on_write(self):
+        self.contact.tags = ["recruiter", "fintech"]
+        self.contact.save()
+        Contact.objects.create(user=self.user, name="Grace", tags=["fintech"])
+        other = User.objects.create_user(email="eve@example.com", password="x")
+        Contact.objects.create(user=other, name="Eve", tags=["fintech"])
+        url = reverse("contact-tags")
+
+        response = self.client.get(url)
+        self.assertEqual(
+            response.data,
+            [{"tag": "fintech", "count": 2}, {"tag": "recruiter", "count": 1}],
+        )
+        with self.assertNumQueries(0):
+            self.client.get(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                self.list_url,
+                {"name": "Alan", "email": "a@example.com", "tags": ["ai"]},
+                format="json",
+            )
+        self.assertIn({"tag": "ai", "count": 1}, self.client.get(url).data)
+
+    def test_follow_ups_due_this_week(self):
+        today = date.today()
+        for name, days in (("Late", -3), ("Soon", 6), ("Later", 7)):
+            Contact.objects.create(
+                user=self.user, name=name, next_follow_up=today + timedelta(days)
+            )
+        response = self.client.get(reverse("contact-follow-ups"))
+        self.assertEqual(
+            [c["name"] for c in response.data["results"]], ["Late", "Soon"]
+        )
+
+    def test_follow_up_digests_cover_every_user_and_replace_reruns(self):
+        today = date(2030, 6, 10)
+        other = User.objects.create_user(email="eve@example.com", password="x")
+        for user, days in ((self.user, -1), (self.user, 2), (other, 0), (other, 9)):
+            Contact.objects.create(
+                user=user, name="Due", next_follow_up=today + timedelta(days)
+            )
+        self.assertEqual(build_follow_up_digests(today), 2)
+        self.assertEqual(build_follow_up_digests(today), 2)
+        digest = FollowUpDigest.objects.get(user=self.user)
+        self.assertEqual((digest.due_count, digest.overdue_count), (2, 1))
+        self.assertEqual(digest.contacts[0]["next_follow_up"], "2030-06-09")
+        self.assertEqual(FollowUpDigest.objects.get(user=other).due_count, 1)
+
+    def test_duplicates_are_listed_and_merged_into_the_oldest(self):
+        self.contact.tags = ["mentor"]
+        self.contact.save()
+        dupe = Contact.objects.create(
+            user=self.user,
+            name="Ada L.",
+            email=" ADA@example.com",
+            phone="555-0100",
+            tags=["mentor", "math"],
+        )
+        Interaction.objects.create(contact=dupe, date=date(2024, 2, 1), type="call")
+        Contact.objects.create(user=self.user, name="Grace", email="g@example.com")
+        other = User.objects.create_user(email="eve@example.com", password="x")
+        Contact.objects.create(user=other, name="Ada", email="ada@example.com")
+        url = reverse("contact-duplicates")
+
+        response = self.client.get(url)
+        self.assertEqual(
+            response.data["clusters"],
+            [{"key": "ada@example.com", "ids": [self.contact.id, dupe.id]}],
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url, {"by": "email"}, format="json")
+        self.assertEqual(response.data, {"merged": 1, "deleted": 1, "more": False})
+        self.contact.refresh_from_db()
+        self.assertEqual(self.contact.phone, "555-0100")
+        self.assertEqual(self.contact.tags, ["mentor", "math"])
+        self.assertEqual(self.contact.interaction_count, 1)
+        self.assertFalse(Contact.objects.filter(id=dupe.id).exists())
+        self.assertEqual(self.client.get(url).data["clusters"], [])
+
+    def test_export_csv_flattens_tags(self):
+        self.contact.tags = ["recruiter", "fintech"]
+        self.contact.save()
+        response = self.client.get(reverse("contact-export", args=["csv"]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rows = list(
+            csv.reader(io.StringIO(b"".join(response.streaming_content).decode()))
+        )
+        self.assertEqual(rows[1][0], "Ada Lovelace")
+        self.assertEqual(rows[1][6], "recruiter; fintech")
+
+    def test_import_json_lines_normalises_spreadsheet_values(self):
+        content = (
+            b'{"Name": "Grace Hopper", "Email": "grace@example.com",'
+            b' "Relationship": "Former Colleague", "Tags": "navy; cobol",'
+            b' "Favorite": "TRUE"}\n'
+            b'{"name": "Alan Turing", "email": "alan@example.com",'
+            b' "relationship": "rival"}\n'
+            b"not json\n"
+        )
+        response = self.client.post(
+            reverse("contact-import"),
+            {"file": SimpleUploadedFile("contacts.jsonl", content)},
+            format="multipart",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["created"], 1)
+        self.assertEqual(
+            [(e["row"], list(e["errors"])) for e in response.data["errors"]],
+            [(2, ["relationship"]), (3, ["non_field_errors"])],
+        )
+        grace = Contact.objects.get(user=self.user, email="grace@example.com")
+        self.assertEqual(grace.relationship, "former-colleague")
+        self.assertEqual(grace.tags, ["navy", "cobol"])
+        self.assertTrue(grace.is_favorite)
@@ -1,15 +1,38 @@
 # contacts/urls.py (updated)
 from django.urls import path
 from .views import (
+    ContactDuplicatesAPIView,
     ContactListCreateAPIView,
+    ContactExportAPIView,
+    ContactImportAPIView,
+    ContactTagFacetsAPIView,
+    FollowUpsDueAPIView,
     ContactRetrieveUpdateDestroyAPIView,
-    InteractionCreateAPIView,
+    InteractionListCreateAPIView,
     InteractionDestroyAPIView,
 )
 
 urlpatterns = [
     # This route now corresponds to /api/contacts/
     path("", ContactListCreateAPIView.as_view(), name="contact-list-create"),
+    # This route will be /api/contacts/export/<csv|xlsx>/
+    path(
+        "export/<str:file_format>/",
+        ContactExportAPIView.as_view(),
+        name="contact-export",
+    ),
+    # This route will be /api/contacts/import/
+    path("import/", ContactImportAPIView.as_view(), name="contact-import"),
+    # This route will be /api/contacts/tags/
+    path("tags/", ContactTagFacetsAPIView.as_view(), name="contact-tags"),
+    # This route will be /api/contacts/follow-ups/
+    path("follow-ups/", FollowUpsDueAPIView.as_view(), name="contact-follow-ups"),
+    # This route will be /api/contacts/duplicates/
+    path(
+        "duplicates/",
+        ContactDuplicatesAPIView.as_view(),
+        name="contact-duplicates",
+    ),
     # This route will be /api/contacts/<int:pk>/
     path(
         "<int:pk>/",
@@ -19,8 +42,8 @@ urlpatterns = [
     # This route will be /api/contacts/<int:contact_id>/interactions/
     path(
         "<int:contact_id>/interactions/",
-        InteractionCreateAPIView.as_view(),
-        name="interaction-create",
+        InteractionListCreateAPIView.as_view(),
+        name="interaction-list-create",
     ),
     # This route will be /api/contacts/interactions/<int:pk>/
     path(
@@ -1,4 +1,9 @@
-from django.db.models import Q, Prefetch
+import base64
+from functools import partial
+
+from django.core.paginator import Paginator
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import F, Prefetch, Q
 import django_filters
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import generics, filters
@@ -7,106 +12,551 @@ from rest_framework.pagination import PageNumberPagination
 from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
 from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
 import hashlib
+import re
 
+from job_applications.exports import (
+    EXPORT_CHUNK_SIZE,
+    EXPORT_FORMATS,
+    export_response,
+)
+from job_applications.imports import ImportSpec
+from job_applications.views import ImportUploadView
+from sync.etag import CONTACTS, bump_data_version, conditional_get, get_data_versions
+from sync.events import publish_change
+from sync.models import Tombstone
+from .dedupe import (
+    DUPLICATE_CLUSTER_LIMIT,
+    DUPLICATE_KEYS,
+    duplicate_clusters,
+    merge_contacts,
+)
+from .follow_ups import due_follow_ups
 from .models import Contact, Interaction
-from .serializers import ContactSerializer, InteractionSerializer
+from .serializers import (
+    ContactMergeSerializer,
+    ContactSerializer,
+    InteractionSerializer,
+)
+
+# (header, column) pairs in spreadsheet order
+CONTACT_EXPORT_COLUMNS = (
+    ("Name", "name"),
+    ("Email", "email"),
+    ("Phone", "phone"),
+    ("Company", "company"),
+    ("Position", "position"),
+    ("Relationship", "relationship"),
+    ("Tags", "tags"),
+    ("Last Contacted", "last_contacted"),
+    ("Next Follow Up", "next_follow_up"),
+    ("LinkedIn", "linkedin_url"),
+    ("Twitter", "twitter_url"),
+    ("Favorite", "is_favorite"),
+    ("Notes", "notes"),
+)
+
+
+def _split_imported_tags(values):
+    # Spreadsheets hold tags the way the export writes them: "a; b"
+    tags = values["tags"]
+    if isinstance(tags, str):
+        values["tags"] = [tag.strip() for tag in re.split(r"[;,]", tags) if tag.strip()]
+    elif not isinstance(tags, list) or not all(isinstance(t, str) for t in tags):
+        raise ValidationError(
+            {"tags": ["Enter a list of tags or a ;-separated string"]}
+        )
+
+
+def _announce_contact_import(user_id):
+    bump_data_version(user_id, CONTACTS)
+    publish_change(user_id, "contact", "created", [])
+
+
+CONTACT_IMPORT = ImportSpec(
+    model=Contact,
+    columns=CONTACT_EXPORT_COLUMNS,
+    prepare_row=_split_imported_tags,
+    after_import=_announce_contact_import,
+)
+
+
+CONTACT_COUNT_CACHE_TIMEOUT = 60 * 15
+# List params that don't change which contacts match, so not the count
+COUNT_IGNORED_PARAMS = {"page", "ordering"}
+
+
+class KnownCountPaginator(Paginator):
+    """
+    Paginator that takes the total from `count` when given, instead of
+    running its own COUNT query.
+    """
+
+    def __init__(self, object_list, per_page, count=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        if count is not None:
+            self.count = count
+
+
+# Contacts embed only their latest interactions (the cards show three); the
+# full history is paged from the per-contact interactions endpoint
+EMBEDDED_INTERACTIONS = 3
+
+
+def with_interaction_summary(queryset):
+    """
+    Prefetch each contact's latest EMBEDDED_INTERACTIONS interactions into
+    latest_interactions. Django runs the sliced prefetch as one query
+    ranking interactions per contact with ROW_NUMBER(), walking the
+    (contact, -date) index.
+    """
+    latest = Interaction.objects.order_by("-date", "-id")[:EMBEDDED_INTERACTIONS]
+    return queryset.prefetch_related(
+        Prefetch("interactions", queryset=latest, to_attr="latest_interactions")
+    )
+
+
+# Keyset ("?cursor=") paging orders, each ending in the unique id
+CURSOR_ORDERINGS = {"-id": ("-id",), "name": ("name", "id")}
+CONTACT_CURSOR_MAX_LIMIT = 100
+
+
+def encode_contact_cursor(contact, ordering):
+    """
+    Opaque keyset cursor pointing just after contact in `ordering`.
+    """
+    raw = str(contact.id) if ordering == "-id" else f"{contact.name}|{contact.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_contact_cursor(cursor, ordering):
+    """
+    Inverse of encode_contact_cursor: (id,) or (name, id). Raises ValueError
+    on a malformed cursor.
+    """
+    raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+    if ordering == "-id":
+        return (int(raw),)
+    name, contact_id = raw.rsplit("|", 1)
+    return name, int(contact_id)
+
+
+def after_contact_cursor(queryset, ordering, position):
+    # The redundant name__gte bound lets Postgres start the (user, name, id)
+    # index scan at the cursor instead of filtering every row before it
+    if ordering == "-id":
+        (contact_id,) = position
+        return queryset.filter(id__lt=contact_id)
+    name, contact_id = position
+    return queryset.filter(
+        Q(name__gte=name) & (Q(name__gt=name) | Q(name=name, id__gt=contact_id))
+    )
 
 
 class ContactPageNumberPagination(PageNumberPagination):
     page_size = 12
 
+    def paginate_queryset(self, queryset, request, view=None, count=None):
+        self.django_paginator_class = partial(KnownCountPaginator, count=count)
+        return super().paginate_queryset(queryset, request, view)
+
+
+def contact_search_query(value):
+    """
+    Prefix query matching contacts whose search_vector has a word starting
+    with every whitespace-separated term, e.g. "gra hop" finds Grace Hopper.
+    Returns None when there are no terms.
+    """
+    terms = [
+        "'" + term.replace("\\", "\\\\").replace("'", "''") + "':*"
+        for term in value.split()
+    ]
+    if not terms:
+        return None
+    return SearchQuery(" & ".join(terms), search_type="raw", config="simple")
+
+
+class TagListFilter(django_filters.BaseCSVFilter, django_filters.CharFilter):
+    pass
+
 
 class ContactFilter(django_filters.FilterSet):
     search = django_filters.CharFilter(method="filter_search")
-    relationship = django_filters.CharFilter(
-        field_name="relationship", lookup_expr="iexact"
-    )
+    relationship = django_filters.CharFilter(method="filter_relationship")
     tag = django_filters.CharFilter(method="filter_tag")
+    # ?tags=a,b matches contacts with all of the tags, or any of them with
+    # &tag_match=any
+    tags = TagListFilter(method="filter_tags")
+    tag_match = django_filters.ChoiceFilter(
+        choices=[("all", "all"), ("any", "any")], method="filter_tag_match"
+    )
     is_favorite = django_filters.BooleanFilter(field_name="is_favorite")
+    # Stale contacts: no interaction since the date, or none at all
+    last_interaction_before = django_filters.DateFilter(
+        method="filter_last_interaction_before"
+    )
 
     class Meta:
         model = Contact
         fields = ["relationship", "is_favorite"]
 
     def filter_search(self, queryset, name, value):
-        return queryset.filter(
-            Q(name__icontains=value)
-            | Q(email__icontains=value)
-            | Q(company__icontains=value)
-            | Q(position__icontains=value)
+        # Served by the GIN index on search_vector; best matches first, with
+        # name hits outranking company, then position and email hits
+        query = contact_search_query(value)
+        if query is None:
+            return queryset
+        return (
+            queryset.filter(search_vector=query)
+            .annotate(rank=SearchRank(F("search_vector"), query))
+            .order_by("-rank", "-id")
         )
 
+    def filter_relationship(self, queryset, name, value):
+        # Relationships are stored lowercase; matching exactly rather than
+        # with iexact (UPPER() on both sides) keeps the (user, relationship,
+        # -id) index usable
+        return queryset.filter(relationship=value.lower())
+
     def filter_tag(self, queryset, name, value):
         return queryset.filter(tags__contains=[value])
 
+    def filter_tags(self, queryset, name, value):
+        # Both operators are served by the GIN index on tags: @> for all,
+        # ?| for any (on a JSON array, ? matches string elements)
+        tags = [tag.strip() for tag in value if tag.strip()]
+        if not tags:
+            return queryset
+        if self.form.cleaned_data.get("tag_match") == "any":
+            return queryset.filter(tags__has_any_keys=tags)
+        return queryset.filter(tags__contains=tags)
+
+    def filter_tag_match(self, queryset, name, value):
+        # Read by filter_tags
+        return queryset
+
+    def filter_last_interaction_before(self, queryset, name, value):
+        return queryset.filter(
+            Q(last_interaction_date__lt=value) | Q(last_interaction_date__isnull=True)
+        )
+
 
 class ContactListCreateAPIView(generics.ListCreateAPIView):
+    """
+    Contacts paged by number (with a total count), or with ?cursor= (empty
+    for the first page) by keyset for infinite scroll: each page is a short
+    index range scan however deep it is, ordered by -id or, with
+    ?ordering=name, by name.
+    """
+
     serializer_class = ContactSerializer
     pagination_class = ContactPageNumberPagination
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_class = ContactFilter
-    ordering_fields = ["id"]
+    ordering_fields = ["id", "name", "last_interaction_date", "interaction_count"]
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        # Prefetch interactions in descending-date order
-        return (
+        return with_interaction_summary(
             Contact.objects.filter(user=self.request.user)
-            .prefetch_related(
-                Prefetch("interactions", queryset=Interaction.objects.order_by("-date"))
-            )
-            .order_by("-id")
-        )
+        ).order_by("-id")
 
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        contact = serializer.save(user=self.request.user)
+        bump_data_version(self.request.user.id, CONTACTS)
+        publish_change(
+            self.request.user.id, "contact", "created", [contact.id], serializer.data
+        )
 
-    def list(self, request, *args, **kwargs):
-        params = request.query_params
+    def count_cache_key(self, request):
+        # Keyed on the user's contacts version, which every contact write
+        # bumps, so a count is reused across pages until the data changes
         user_id = request.user.id
-        filter_key = "&".join(f"{k}={v}" for k, v in sorted(params.items()))
-        raw_key = f"contacts_count:{user_id}:{filter_key}"
-        key_hash = hashlib.md5(raw_key.encode()).hexdigest()
-        cache_key = f"contacts_count:{key_hash}"
+        (version,) = get_data_versions(user_id, [CONTACTS])
+        filter_key = "&".join(
+            f"{k}={v}"
+            for k, v in sorted(request.query_params.items())
+            if k not in COUNT_IGNORED_PARAMS
+        )
+        key_hash = hashlib.md5(filter_key.encode()).hexdigest()
+        return f"contacts_count:{user_id}:{version}:{key_hash}"
 
+    @conditional_get(CONTACTS)
+    def list(self, request, *args, **kwargs):
         queryset = self.filter_queryset(self.get_queryset())
+        if "cursor" in request.query_params:
+            return self.list_by_cursor(request, queryset)
+        cache_key = self.count_cache_key(request)
         count = cache.get(cache_key)
         if count is None:
             count = queryset.count()
-            cache.set(cache_key, count, timeout=60 * 15)
+            cache.set(cache_key, count, timeout=CONTACT_COUNT_CACHE_TIMEOUT)
 
-        page = self.paginate_queryset(queryset)
+        page = self.paginator.paginate_queryset(
+            queryset, request, view=self, count=count
+        )
         if page is not None:
             data = self.get_serializer(page, many=True).data
-            resp = self.get_paginated_response(data)
-            resp.data["count"] = count
-            return resp
+            return self.get_paginated_response(data)
 
         return Response(self.get_serializer(queryset, many=True).data)
 
+    def list_by_cursor(self, request, queryset):
+        ordering = request.query_params.get("ordering") or "-id"
+        if ordering not in CURSOR_ORDERINGS:
+            return Response(
+                {
+                    "error": "Cursor paging supports ordering by "
+                    + ", ".join(CURSOR_ORDERINGS)
+                },
+                status=400,
+            )
+        try:
+            limit = int(
+                request.query_params.get("limit", ContactPageNumberPagination.page_size)
+            )
+            if not 1 <= limit <= CONTACT_CURSOR_MAX_LIMIT:
+                raise ValueError
+            cursor = request.query_params["cursor"]
+            if cursor:
+                queryset = after_contact_cursor(
+                    queryset, ordering, decode_contact_cursor(cursor, ordering)
+                )
+        except ValueError:
+            return Response({"error": "Invalid limit or cursor"}, status=400)
+
+        # Replaces any search ranking; one extra row tells us whether there
+        # is another page
+        contacts = list(queryset.order_by(*CURSOR_ORDERINGS[ordering])[: limit + 1])
+        has_more = len(contacts) > limit
+        contacts = contacts[:limit]
+        return Response(
+            {
+                "results": self.get_serializer(contacts, many=True).data,
+                "next_cursor": (
+                    encode_contact_cursor(contacts[-1], ordering) if has_more else None
+                ),
+            }
+        )
+
+
+class FollowUpsDueAPIView(generics.ListAPIView):
+    """
+    The user's contacts with a follow-up due this week, overdue ones first.
+    """
+
+    serializer_class = ContactSerializer
+    pagination_class = ContactPageNumberPagination
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return with_interaction_summary(
+            due_follow_ups(Contact.objects.filter(user=self.request.user))
+        )
+
+    # The window moves with the date
+    @conditional_get(CONTACTS, per_day=True)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+
+CONTACT_TAGS_CACHE_TIMEOUT = 60 * 15
+
+
+class ContactTagFacetsAPIView(generics.GenericAPIView):
+    """
+    Every tag the user has used with the number of contacts carrying it,
+    most used first. Counted in one query and cached until the user's
+    contacts change.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    @conditional_get(CONTACTS)
+    def get(self, request):
+        user_id = request.user.id
+        (version,) = get_data_versions(user_id, [CONTACTS])
+        cache_key = f"contact_tags:{user_id}:{version}"
+        data = cache.get(cache_key)
+        if data is None:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT tag, COUNT(*) FROM contacts_contact "
+                    "CROSS JOIN LATERAL jsonb_array_elements_text(tags) AS tag "
+                    "WHERE user_id = %s AND jsonb_typeof(tags) = 'array' "
+                    "GROUP BY tag ORDER BY COUNT(*) DESC, tag",
+                    [user_id],
+                )
+                data = [{"tag": tag, "count": count} for tag, count in cursor]
+            cache.set(cache_key, data, timeout=CONTACT_TAGS_CACHE_TIMEOUT)
+        return Response(data)
+
+
+class ContactDuplicatesAPIView(generics.GenericAPIView):
+    """
+    GET lists clusters of the user's contacts that share a normalized email
+    (or with ?by=phone, phone number); POST merges them, each into its
+    oldest contact, up to DUPLICATE_CLUSTER_LIMIT clusters per request.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    @conditional_get(CONTACTS)
+    def get(self, request):
+        by = request.query_params.get("by", "email")
+        if by not in DUPLICATE_KEYS:
+            return Response(
+                {"error": f"by must be one of: {', '.join(DUPLICATE_KEYS)}"},
+                status=400,
+            )
+        clusters = duplicate_clusters(request.user.id, by)
+        return Response(
+            {"clusters": [{"key": key, "ids": ids} for key, ids in clusters]}
+        )
+
+    def post(self, request):
+        serializer = ContactMergeSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=400)
+        user_id = request.user.id
+        with transaction.atomic():
+            clusters = duplicate_clusters(
+                user_id,
+                serializer.validated_data["by"],
+                serializer.validated_data.get("keys"),
+            )
+            kept_ids, deleted_ids, moved_ids = merge_contacts(
+                user_id, [ids for _, ids in clusters]
+            )
+        if deleted_ids:
+            bump_data_version(user_id, CONTACTS)
+            publish_change(user_id, "contact", "deleted", deleted_ids)
+            publish_change(user_id, "contact", "updated", kept_ids)
+        if moved_ids:
+            publish_change(user_id, "interaction", "updated", moved_ids)
+        return Response(
+            {
+                "merged": len(kept_ids),
+                "deleted": len(deleted_ids),
+                # Merge again for the rest
+                "more": len(clusters) == DUPLICATE_CLUSTER_LIMIT,
+            }
+        )
+
+
+class ContactExportAPIView(generics.GenericAPIView):
+    """
+    Download every contact matching the list filters as CSV or XLSX, read
+    off a server-side cursor in chunks.
+    """
+
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = ContactFilter
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return Contact.objects.filter(user=self.request.user).order_by("-id")
+
+    def get(self, request, file_format):
+        if file_format not in EXPORT_FORMATS:
+            return Response(
+                {"error": f"Format must be one of: {', '.join(EXPORT_FORMATS)}"},
+                status=400,
+            )
+        columns = [column for _, column in CONTACT_EXPORT_COLUMNS]
+        tags_at = columns.index("tags")
+        rows = (
+            row[:tags_at] + ("; ".join(row[tags_at] or []),) + row[tags_at + 1 :]
+            for row in self.filter_queryset(self.get_queryset())
+            .values_list(*columns)
+            .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        )
+        header = [label for label, _ in CONTACT_EXPORT_COLUMNS]
+        return export_response(file_format, "contacts", header, rows)
+
+
+class ContactImportAPIView(ImportUploadView):
+    import_target = "contacts"
+
 
 class ContactRetrieveUpdateDestroyAPIView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = ContactSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return Contact.objects.filter(user=self.request.user).prefetch_related(
-            Prefetch("interactions", queryset=Interaction.objects.order_by("-date"))
+        return with_interaction_summary(Contact.objects.filter(user=self.request.user))
+
+    @conditional_get(CONTACTS)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+    def perform_update(self, serializer):
+        contact = serializer.save()
+        bump_data_version(self.request.user.id, CONTACTS)
+        publish_change(
+            self.request.user.id, "contact", "updated", [contact.id], serializer.data
         )
 
+    def perform_destroy(self, instance):
+        contact_id = instance.id
+        interaction_ids = [i.id for i in instance.interactions.all()]
+        with transaction.atomic():
+            Tombstone.record(self.request.user.id, Contact, [contact_id])
+            Tombstone.record(self.request.user.id, Interaction, interaction_ids)
+            instance.delete()
+        bump_data_version(self.request.user.id, CONTACTS)
+        publish_change(self.request.user.id, "contact", "deleted", [contact_id])
+
+
+class InteractionPageNumberPagination(PageNumberPagination):
+    page_size = 20
+
+
+class InteractionListCreateAPIView(generics.ListCreateAPIView):
+    """
+    A contact's full interaction history, newest first and paginated, and
+    where new interactions are added.
+    """
 
-class InteractionCreateAPIView(generics.CreateAPIView):
     serializer_class = InteractionSerializer
+    pagination_class = InteractionPageNumberPagination
     permission_classes = [IsAuthenticated]
 
-    def perform_create(self, serializer):
-        contact_id = self.kwargs.get("contact_id")
+    def get_contact(self):
         try:
-            contact = Contact.objects.get(pk=contact_id, user=self.request.user)
+            return Contact.objects.only("id").get(
+                pk=self.kwargs.get("contact_id"), user=self.request.user
+            )
         except Contact.DoesNotExist:
             raise NotFound("Contact not found.")
-        serializer.save(contact=contact)
+
+    def get_queryset(self):
+        return Interaction.objects.filter(contact=self.get_contact()).order_by(
+            "-date", "-id"
+        )
+
+    @conditional_get(CONTACTS)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    def perform_create(self, serializer):
+        contact = self.get_contact()
+        with transaction.atomic():
+            contacts = Contact.objects.filter(pk=contact.pk)
+            # Lock the contact so concurrent writes refresh its summary in turn
+            contacts.select_for_update().get()
+            interaction = serializer.save(contact=contact)
+            Contact.refresh_interaction_summaries(contacts)
+        bump_data_version(self.request.user.id, CONTACTS)
+        publish_change(
+            self.request.user.id,
+            "interaction",
+            "created",
+            [interaction.id],
+            {**serializer.data, "contact": contact.id},
+        )
 
 
 class InteractionDestroyAPIView(generics.DestroyAPIView):
@@ -117,3 +567,20 @@ class InteractionDestroyAPIView(generics.DestroyAPIView):
         return Interaction.objects.select_related("contact").filter(
             contact__user=self.request.user
         )
+
+    def perform_destroy(self, instance):
+        interaction_id = instance.id
+        with transaction.atomic():
+            contacts = Contact.objects.filter(pk=instance.contact_id)
+            contacts.select_for_update().get()
+            Tombstone.record(self.request.user.id, Interaction, [interaction_id])
+            instance.delete()
+            Contact.refresh_interaction_summaries(contacts)
+        bump_data_version(self.request.user.id, CONTACTS)
+        publish_change(
+            self.request.user.id,
+            "interaction",
+            "deleted",
+            [interaction_id],
+            {"contact": instance.contact_id},
+        )
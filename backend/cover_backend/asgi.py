@@ -2,6 +2,8 @@
 ASGI config for cover_backend project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Change-event streams (sync.streams) are served here directly; everything
+else goes to Django.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
@@ -13,4 +15,13 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "cover_backend.settings")
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Imported after setup: the stream app needs configured settings and models
+from sync.streams import EVENTS_PATH, change_events_app  # noqa: E402
+
+
+async def application(scope, receive, send):
+    if scope["type"] == "http" and scope["path"] == EVENTS_PATH:
+        return await change_events_app(scope, receive, send)
+    return await django_application(scope, receive, send)
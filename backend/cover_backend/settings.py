@@ -63,6 +63,7 @@ INSTALLED_APPS = [
     "job_applications",
     "contacts",
     "dashboard",
+    "sync",
     "django_filters",
     # "debug_toolbar",
     # "silk",
@@ -369,6 +370,8 @@ AWS_ACCESS_KEY_ID = env("AWS_ACCESS_KEY_ID")
 AWS_SECRET_ACCESS_KEY = env("AWS_SECRET_ACCESS_KEY")
 AWS_STORAGE_BUCKET_NAME = env("AWS_STORAGE_BUCKET_NAME")
 AWS_S3_REGION_NAME = "us-east-2"  # Change if needed
+# Point at an S3-compatible stand-in (MinIO, moto_server) for local runs
+AWS_S3_ENDPOINT_URL = env("AWS_S3_ENDPOINT_URL", default=None)
 AWS_S3_CUSTOM_DOMAIN = f"{AWS_STORAGE_BUCKET_NAME}.s3.amazonaws.com"
 AWS_S3_FILE_OVERWRITE = False
 
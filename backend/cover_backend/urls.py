@@ -15,6 +15,7 @@ urlpatterns = [
     path("cover/", include("AI_generator.urls")),
     path("api/contacts/", include("contacts.urls")),
     path("api/dashboard/", include("dashboard.urls")),
+    path("api/sync/", include("sync.urls")),
     # ─────────── Google OAuth2 flow ───────────
     # 1. Always start the flow via this helper; it logs out any current session
     path("google/login/", google_login_clean, name="google_login"),
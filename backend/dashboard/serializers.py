@@ -34,6 +34,11 @@ class DashboardSerializer(serializers.Serializer):
     location_data = serializers.ListField(child=serializers.DictField())
     company_data = serializers.ListField(child=serializers.DictField())
     time_to_response_data = serializers.ListField(child=serializers.DictField())
+    time_to_response_percentiles = serializers.DictField(
+        child=serializers.FloatField(allow_null=True)
+    )
+    salary_data = serializers.ListField(child=serializers.DictField())
+    salary_stats = serializers.DictField()
 
     # recent list
     recent_applications = RecentJobSerializer(many=True)
@@ -1,3 +1,57 @@
-from django.test import TestCase
+from datetime import date, timedelta
+from django.urls import reverse
+from rest_framework.test import APITestCase, APIClient
+from django.contrib.auth import get_user_model
+from job_applications.models import JobApplication
 
-# Create your tests here.
+User = get_user_model()
+
+
+class DashboardAPITestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="josh@example.com", password="testpass123"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse("dashboard")
+
+    def _respond_after(self, days, new_status="interview"):
+        job = JobApplication.objects.create(
+            user=self.user,
+            company="Google",
+            position="SWE",
+            status="applied",
+            date_applied=date.today() - timedelta(days=days),
+        )
+        job.status = new_status
+        job.save()
+        return job
+
+    def test_time_to_response_uses_transition_log(self):
+        for days in (2, 5, 10, 40):
+            self._respond_after(days)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        buckets = {
+            b["name"]: b["value"] for b in response.data["time_to_response_data"]
+        }
+        self.assertEqual(
+            buckets,
+            {"< 1 week": 2, "1-2 weeks": 1, "2-4 weeks": 0, "> 4 weeks": 1},
+        )
+        self.assertEqual(response.data["time_to_response_percentiles"]["p50"], 7.5)
+
+    def test_time_to_response_range_follows_date_applied(self):
+        # Applied long ago, answered today: outside a 30-day dashboard
+        self._respond_after(100)
+        self._respond_after(5)
+        response = self.client.get(self.url, {"time_range": "30days"})
+        buckets = {
+            b["name"]: b["value"] for b in response.data["time_to_response_data"]
+        }
+        self.assertEqual(
+            buckets,
+            {"< 1 week": 1, "1-2 weeks": 0, "2-4 weeks": 0, "> 4 weeks": 0},
+        )
+        self.assertEqual(response.data["time_to_response_percentiles"]["p90"], 5)
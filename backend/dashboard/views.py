@@ -1,31 +1,72 @@
 # app/job_applications/views.py
 
-from collections import defaultdict
-from django.db.models import Count, Q, Case, When, Value, F, CharField
+from django.db.models import (
+    Aggregate,
+    Avg,
+    Count,
+    Max,
+    Min,
+    Q,
+    Case,
+    When,
+    Value,
+    F,
+    CharField,
+    FloatField,
+)
 from django.db.models.functions import TruncMonth
 from django.db.models.expressions import Func
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from job_applications.models import JobApplication
+from job_applications.models import JobApplication, StatusTransition
+from sync.etag import JOBS, conditional_get
 
 from .serializers import DashboardSerializer, RecentJobSerializer
 from datetime import timedelta, date
 
+# (label, inclusive upper bound in days); None means unbounded
+RESPONSE_BUCKETS = [
+    ("< 1 week", 7),
+    ("1-2 weeks", 14),
+    ("2-4 weeks", 30),
+    ("> 4 weeks", None),
+]
+
+# (label, exclusive upper bound) for the salary midpoint histogram
+SALARY_BUCKETS = [
+    ("< 50k", 50_000),
+    ("50-100k", 100_000),
+    ("100-150k", 150_000),
+    ("150-200k", 200_000),
+    ("200k+", None),
+]
+
+
+class PercentileCont(Aggregate):
+    """Postgres ordered-set aggregate: percentile_cont(p) WITHIN GROUP (ORDER BY x)."""
+
+    function = "percentile_cont"
+    template = "%(function)s(%(percentile)s) WITHIN GROUP (ORDER BY %(expressions)s)"
+    output_field = FloatField()
+
+    def __init__(self, expression, percentile, **extra):
+        super().__init__(expression, percentile=float(percentile), **extra)
+
 
 class DashboardAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
+    # Ranges and bucket ages are relative to today, so the tag rolls daily
+    @conditional_get(JOBS, per_day=True)
     def get(self, request):
         qs = JobApplication.objects.filter(user=request.user)
 
         time_range = request.query_params.get("time_range", "all")
-        if time_range == "30days":
-            qs = qs.filter(date_applied__gte=date.today() - timedelta(days=30))
-        elif time_range == "90days":
-            qs = qs.filter(date_applied__gte=date.today() - timedelta(days=90))
-        elif time_range == "6months":
-            qs = qs.filter(date_applied__gte=date.today() - timedelta(days=180))
+        range_days = {"30days": 30, "90days": 90, "6months": 180}.get(time_range)
+        since = date.today() - timedelta(days=range_days) if range_days else None
+        if since:
+            qs = qs.filter(date_applied__gte=since)
 
         # 1) Summary metrics via a single aggregate()
         metrics = qs.aggregate(
@@ -120,19 +161,83 @@ class DashboardAPIView(APIView):
             {"name": entry["company"], "value": entry["count"]} for entry in comp_qs
         ]
 
-        # 7) Time‑to‑response buckets (simulated)
-        simulated_days = [3, 5, 7, 10, 14, 21, 28, 30]
-        cat_map = defaultdict(int)
-        for d in simulated_days:
-            cat = (
-                "< 1 week"
-                if d <= 7
-                else "1-2 weeks" if d <= 14 else "2-4 weeks" if d <= 30 else "> 4 weeks"
+        # 7) Time‑to‑response buckets from the status transition log.
+        # response_days is stored on write, so this is one aggregate over the
+        # transitions. A time range selects them by when the application was
+        # made, like every other chart, which joins back to job applications.
+        responses_qs = StatusTransition.objects.filter(
+            user=request.user, is_first_response=True, response_days__isnull=False
+        )
+        if since:
+            responses_qs = responses_qs.filter(job_application__date_applied__gte=since)
+        bucket_aggs = {}
+        lower = None
+        for i, (_, upper) in enumerate(RESPONSE_BUCKETS):
+            cond = Q()
+            if lower is not None:
+                cond &= Q(response_days__gt=lower)
+            if upper is not None:
+                cond &= Q(response_days__lte=upper)
+            bucket_aggs[f"bucket_{i}"] = Count("id", filter=cond)
+            lower = upper
+        latency = responses_qs.aggregate(
+            **bucket_aggs,
+            p50=PercentileCont("response_days", 0.5),
+            p90=PercentileCont("response_days", 0.9),
+        )
+        time_to_response_data = [
+            {"name": label, "value": latency[f"bucket_{i}"]}
+            for i, (label, _) in enumerate(RESPONSE_BUCKETS)
+        ]
+        time_to_response_percentiles = {
+            "p50": latency["p50"],
+            "p90": latency["p90"],
+        }
+
+        # 8) Salary distribution over the parsed salary columns, restricted to
+        # the user's most common currency so the numbers are comparable
+        salary_qs = qs.filter(salary_min__isnull=False)
+        currency = (
+            salary_qs.values("salary_currency")
+            .annotate(n=Count("id"))
+            .order_by("-n")
+            .values_list("salary_currency", flat=True)
+            .first()
+        )
+        salary_aggs = {}
+        if currency is not None:
+            salary_qs = salary_qs.filter(salary_currency=currency).annotate(
+                salary_mid=(F("salary_min") + F("salary_max")) / 2
             )
-            cat_map[cat] += 1
-        time_to_response_data = [{"name": k, "value": v} for k, v in cat_map.items()]
+            lower = None
+            for i, (_, upper) in enumerate(SALARY_BUCKETS):
+                cond = Q()
+                if lower is not None:
+                    cond &= Q(salary_mid__gte=lower)
+                if upper is not None:
+                    cond &= Q(salary_mid__lt=upper)
+                salary_aggs[f"bucket_{i}"] = Count("id", filter=cond)
+                lower = upper
+            salary_aggs = salary_qs.aggregate(
+                **salary_aggs,
+                low=Min("salary_min"),
+                high=Max("salary_max"),
+                avg=Avg("salary_mid"),
+                median=PercentileCont("salary_mid", 0.5),
+            )
+        salary_data = [
+            {"name": label, "value": salary_aggs.get(f"bucket_{i}", 0)}
+            for i, (label, _) in enumerate(SALARY_BUCKETS)
+        ]
+        salary_stats = {
+            "currency": currency or "",
+            "min": salary_aggs.get("low"),
+            "max": salary_aggs.get("high"),
+            "average": salary_aggs.get("avg"),
+            "median": salary_aggs.get("median"),
+        }
 
-        # 8) Recent 5 applications
+        # 9) Recent 5 applications
         recent_qs = qs.order_by("-date_applied")[:5]
         recent = RecentJobSerializer(recent_qs, many=True).data
 
@@ -150,6 +255,9 @@ class DashboardAPIView(APIView):
             "location_data": location_data,
             "company_data": company_data,
             "time_to_response_data": time_to_response_data,
+            "time_to_response_percentiles": time_to_response_percentiles,
+            "salary_data": salary_data,
+            "salary_stats": salary_stats,
             "recent_applications": recent,
         }
 
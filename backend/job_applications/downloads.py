@@ -0,0 +1,66 @@
+# job_applications/downloads.py
+
+import hashlib
+import time
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.http import content_disposition_header
+
+DOWNLOAD_URL_EXPIRY = 60 * 60  # seconds a signed URL stays valid
+# URLs are signed at most once per window and cached until it ends, so a URL
+# handed out is always good for at least DOWNLOAD_URL_EXPIRY -
+# DOWNLOAD_URL_WINDOW seconds
+DOWNLOAD_URL_WINDOW = 45 * 60
+
+
+def download_url_window(now=None):
+    """
+    Number of the current signing window. Responses that embed signed URLs
+    must change when it does.
+    """
+    return int((now or time.time()) // DOWNLOAD_URL_WINDOW)
+
+
+def _cache_key(window, file_key, name):
+    digest = hashlib.md5(f"{file_key}\0{name}".encode()).hexdigest()
+    return f"dlurl:{window}:{digest}"
+
+
+def signed_download_urls(s3_factory, files):
+    """
+    Presigned GET URLs for (file_key, name) pairs, as (url, expires_at)
+    tuples in the same order. The browser saves the file as `name`.
+    Signatures cached for this window are reused; the rest are signed
+    locally (no S3 round trip) with a client from s3_factory, which is only
+    created when something needs signing.
+    """
+    now = time.time()
+    window = download_url_window(now)
+    keys = [_cache_key(window, file_key, name) for file_key, name in files]
+    found = cache.get_many(keys)
+    missing = {}
+    s3 = None
+    for key, (file_key, name) in zip(keys, files):
+        if key in found or key in missing:
+            continue
+        s3 = s3 or s3_factory()
+        url = s3.generate_presigned_url(
+            "get_object",
+            Params={
+                "Bucket": settings.AWS_STORAGE_BUCKET_NAME,
+                "Key": file_key,
+                "ResponseContentDisposition": content_disposition_header(True, name),
+            },
+            ExpiresIn=DOWNLOAD_URL_EXPIRY,
+        )
+        expires_at = datetime.fromtimestamp(
+            int(now) + DOWNLOAD_URL_EXPIRY, timezone.utc
+        )
+        missing[key] = (url, expires_at.isoformat())
+    if missing:
+        window_left = (window + 1) * DOWNLOAD_URL_WINDOW - now
+        cache.set_many(missing, max(1, int(window_left)))
+        found.update(missing)
+    return [found[key] for key in keys]
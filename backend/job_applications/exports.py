@@ -0,0 +1,109 @@
+# job_applications/exports.py
+
+import csv
+import io
+import tempfile
+
+import xlsxwriter
+from django.http import FileResponse, StreamingHttpResponse
+
+EXPORT_FORMATS = ("csv", "xlsx")
+# Rows per server-side cursor fetch, and per CSV chunk sent to the client
+EXPORT_CHUNK_SIZE = 2000
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+# Spreadsheet apps evaluate a CSV cell starting with one of these as a formula
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+# (header, column) pairs in spreadsheet order
+JOB_EXPORT_COLUMNS = (
+    ("Company", "company"),
+    ("Position", "position"),
+    ("Location", "location"),
+    ("Status", "status"),
+    ("Date Applied", "date_applied"),
+    ("Salary", "salary"),
+    ("Salary Min", "salary_min"),
+    ("Salary Max", "salary_max"),
+    ("Currency", "salary_currency"),
+    ("Contact Person", "contact_person"),
+    ("Contact Email", "contact_email"),
+    ("URL", "url"),
+    ("Notes", "notes"),
+)
+
+
+def neutralize_formula(value):
+    """
+    Prefix a string cell that would be read as a formula with a quote, so
+    the spreadsheet shows it as text (OWASP's CSV injection advice).
+    unquote_formula undoes it on import.
+    """
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def unquote_formula(value):
+    if value.startswith("'") and value[1:].startswith(FORMULA_PREFIXES):
+        return value[1:]
+    return value
+
+
+def csv_chunks(header, rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    for count, row in enumerate(rows, 1):
+        writer.writerow([neutralize_formula(value) for value in row])
+        if count % EXPORT_CHUNK_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _xlsx_file(header, rows):
+    """
+    Write the rows to a temporary .xlsx file. constant_memory makes XlsxWriter
+    flush each row to disk as soon as the next one starts, so memory stays
+    flat; the zip container can only be assembled once every row is written.
+    Strings are always written as text: never as formulas (a value starting
+    with "=" must not run) and never as hyperlinks (a sheet holds at most
+    65,530).
+    """
+    output = tempfile.TemporaryFile()
+    workbook = xlsxwriter.Workbook(
+        output,
+        {
+            "constant_memory": True,
+            "strings_to_formulas": False,
+            "strings_to_urls": False,
+            "default_date_format": "yyyy-mm-dd",
+        },
+    )
+    sheet = workbook.add_worksheet()
+    sheet.write_row(0, 0, header, workbook.add_format({"bold": True}))
+    for row_number, row in enumerate(rows, 1):
+        sheet.write_row(row_number, 0, row)
+    workbook.close()
+    output.seek(0)
+    return output
+
+
+def export_response(file_format, filename, header, rows):
+    """
+    Response for an export of `rows` (an iterator of tuples), either a CSV
+    streamed as the rows are read or an .xlsx file streamed from disk.
+    """
+    if file_format == "xlsx":
+        return FileResponse(
+            _xlsx_file(header, rows),
+            as_attachment=True,
+            filename=f"{filename}.xlsx",
+            content_type=XLSX_CONTENT_TYPE,
+        )
+    response = StreamingHttpResponse(
+        csv_chunks(header, rows), content_type="text/csv; charset=utf-8"
+    )
+    response["Content-Disposition"] = f'attachment; filename="{filename}.csv"'
+    return response
@@ -0,0 +1,435 @@
+# job_applications/imports.py
+
+import csv
+import io
+import json
+import logging
+import os
+import re
+import tempfile
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Callable
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import connection, models, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .exports import unquote_formula
+from .models import ImportJob
+
+logger = logging.getLogger(__name__)
+
+IMPORT_EXTENSIONS = {
+    ".csv": "csv",
+    ".json": "json",
+    ".jsonl": "json",
+    ".ndjson": "json",
+}
+IMPORT_BATCH_SIZE = 2000  # rows validated and inserted per transaction
+# Uploads up to this size are imported during the request; larger ones are
+# handed to the process_imports worker
+INLINE_IMPORT_MAX_BYTES = 1024 * 1024
+MAX_REPORTED_ERRORS = 1000  # per-row errors kept in a report
+JSON_READ_SIZE = 64 * 1024
+# A running job whose worker hasn't reported progress for this long is dead
+IMPORT_JOB_TIMEOUT = timedelta(minutes=10)
+
+# Import targets by name, resolved lazily so the worker needn't import views
+IMPORT_SPECS = {
+    "job_applications": "job_applications.views.JOB_IMPORT",
+    "contacts": "contacts.views.CONTACT_IMPORT",
+}
+
+_JSON_SEPARATORS = re.compile(r"[\s,]*")
+# Backslash escapes of COPY's text format
+_COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+# Spreadsheets write booleans as TRUE/FALSE or yes/no
+_BOOLEAN_STRINGS = {
+    "true": True,
+    "yes": True,
+    "y": True,
+    "1": True,
+    "false": False,
+    "no": False,
+    "n": False,
+    "0": False,
+}
+
+
+@dataclass
+class ImportSpec:
+    model: type
+    # (header, column) pairs; a header also matches the column name or the
+    # field's verbose name, case-insensitively
+    columns: tuple
+    # Adjusts a row of cleaned {column: value} in place before it is built;
+    # may raise a ValidationError keyed by column
+    prepare_row: Callable = None
+    # Called with the user id and the saved objects of each batch, inside its
+    # transaction, for rows that bulk_create bypasses (e.g. save() side effects)
+    after_batch: Callable = None
+    # Called once with the user id when at least one row was created
+    after_import: Callable = None
+
+    def header_map(self):
+        lookup = {}
+        for label, column in self.columns:
+            field = self.model._meta.get_field(column)
+            for name in (label, column, field.verbose_name):
+                lookup[str(name).strip().lower()] = column
+        return lookup
+
+
+def import_format(filename):
+    """
+    Import format for an uploaded file name, or None if it isn't supported.
+    """
+    return IMPORT_EXTENSIONS.get(os.path.splitext(filename or "")[1].lower())
+
+
+def _csv_rows(text, header_map):
+    reader = csv.reader(text)
+    header = next(reader, None)
+    if header is None:
+        raise ValueError("The file is empty")
+    positions = [
+        (index, header_map[name.strip().lower()])
+        for index, name in enumerate(header)
+        if name.strip().lower() in header_map
+    ]
+    if not positions:
+        raise ValueError("No recognised columns in the header row")
+
+    def rows():
+        for row in reader:
+            if any(row):
+                yield {
+                    column: unquote_formula(row[i])
+                    for i, column in positions
+                    if i < len(row)
+                }
+
+    return rows()
+
+
+def _map_json_row(row, header_map):
+    if not isinstance(row, dict):
+        return None
+    return {
+        header_map[key.strip().lower()]: value
+        for key, value in row.items()
+        if key.strip().lower() in header_map
+    }
+
+
+def _json_lines(text, header_map):
+    for line in text:
+        if line.strip():
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                yield None
+                continue
+            yield _map_json_row(row, header_map)
+
+
+def _skip_whitespace(text):
+    """
+    Read past leading whitespace, however many reads it spans, and return
+    the rest of the read it ends in ("" for a blank file).
+    """
+    while True:
+        chunk = text.read(JSON_READ_SIZE)
+        if not chunk or chunk.strip():
+            return chunk.lstrip()
+
+
+def _json_array(text, header_map):
+    """
+    Yield the objects of a top-level JSON array one at a time, decoding from
+    a sliding buffer instead of loading the whole document.
+    """
+    decoder = json.JSONDecoder()
+    buffer = _skip_whitespace(text)
+    if not buffer.startswith("["):
+        raise ValueError("Malformed JSON")
+    position = 1
+    while True:
+        position = _JSON_SEPARATORS.match(buffer, position).end()
+        if position == len(buffer) or buffer[position] != "]":
+            try:
+                row, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                # Either the next object runs past the buffer or it's malformed
+                chunk = text.read(JSON_READ_SIZE)
+                if not chunk:
+                    raise ValueError("Malformed JSON")
+                buffer, position = buffer[position:] + chunk, 0
+                continue
+            yield _map_json_row(row, header_map)
+            position = end
+        else:
+            return
+
+
+def read_rows(fileobj, file_format, header_map):
+    """
+    Iterator of {column: raw value} rows from a binary file object, parsed
+    as it is read. A JSON file is either an array of objects or JSON Lines;
+    a row that isn't an object comes back as None. Raises ValueError when
+    the file can't be read at all.
+    """
+    text = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+    try:
+        if file_format == "csv":
+            return _csv_rows(text, header_map)
+        is_array = _skip_whitespace(text).startswith("[")
+        text.seek(0)
+    except UnicodeDecodeError:
+        raise ValueError("The file must be UTF-8 encoded")
+    if is_array:
+        return _json_array(text, header_map)
+    return _json_lines(text, header_map)
+
+
+def _field_plans(spec):
+    plans = []
+    for _, column in spec.columns:
+        field = spec.model._meta.get_field(column)
+        default = field.get_default if field.has_default() else None
+        empty = "" if field.empty_strings_allowed and not field.null else None
+        # Accept a choice's label as well as its stored value
+        choices = {}
+        for value, label in field.flatchoices:
+            choices[str(value).lower()] = value
+            choices[str(label).lower()] = value
+        is_boolean = isinstance(field, models.BooleanField)
+        plans.append((column, field, default, empty, choices, is_boolean))
+    return plans
+
+
+def clean_row(plans, values):
+    """
+    Validate a {column: raw value} row with each model field's own clean(),
+    the same checks full_clean() runs. Returns (cleaned values, errors by
+    column).
+    """
+    cleaned, errors = {}, {}
+    for column, field, default, empty, choices, is_boolean in plans:
+        value = values.get(column)
+        if isinstance(value, str):
+            value = value.strip()
+        if value is None or value == "":
+            if default:
+                cleaned[column] = default()
+                continue
+            value = empty
+        elif choices and isinstance(value, str):
+            value = choices.get(value.lower(), value)
+        elif is_boolean and isinstance(value, str):
+            value = _BOOLEAN_STRINGS.get(value.lower(), value)
+        try:
+            cleaned[column] = field.clean(value, None)
+        except ValidationError as e:
+            errors[column] = e.messages
+    return cleaned, errors
+
+
+def _copy_text(field, value):
+    if value is None:
+        return "\\N"
+    if isinstance(field, models.JSONField):
+        value = json.dumps(value, cls=field.encoder)
+    elif isinstance(value, bool):
+        value = "t" if value else "f"
+    elif isinstance(value, date):
+        value = value.isoformat()
+    else:
+        value = str(value)
+    return value.translate(_COPY_ESCAPES)
+
+
+def copy_insert(model, objs):
+    """
+    Insert unsaved instances with COPY FROM STDIN. bulk_create spends as long
+    compiling and binding its multi-row INSERT in Python as Postgres spends
+    running it; COPY streams plain text instead. Ids are drawn from the
+    table's sequence up front, so like bulk_create the instances come back
+    with their pk set. Field values must already be cleaned, and save()
+    and signals are skipped.
+    """
+    meta = model._meta
+    # Generated columns are computed by Postgres and can't be written
+    fields = [field for field in meta.concrete_fields if not field.generated]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT nextval(pg_get_serial_sequence(%s, %s)) "
+            "FROM generate_series(1, %s)",
+            [meta.db_table, meta.pk.column, len(objs)],
+        )
+        buffer = io.StringIO()
+        for obj, (pk,) in zip(objs, cursor.fetchall()):
+            obj.pk = pk
+            buffer.write(
+                "\t".join(
+                    _copy_text(field, field.pre_save(obj, add=True)) for field in fields
+                )
+            )
+            buffer.write("\n")
+            obj._state.adding = False
+            obj._state.db = connection.alias
+        buffer.seek(0)
+        columns = ", ".join(connection.ops.quote_name(f.column) for f in fields)
+        cursor.copy_expert(
+            f"COPY {connection.ops.quote_name(meta.db_table)} ({columns}) "
+            "FROM STDIN",
+            buffer,
+        )
+    return objs
+
+
+def _insert_batch(spec, user_id, batch, report):
+    with transaction.atomic():
+        copy_insert(spec.model, batch)
+        if spec.after_batch:
+            spec.after_batch(user_id, batch)
+    report["created"] += len(batch)
+
+
+def import_rows(spec, user_id, rows, on_batch=None):
+    """
+    Validate rows and insert the valid ones with copy_insert, IMPORT_BATCH_SIZE
+    per transaction, so a bad row is reported rather than failing the file.
+    on_batch, if given, is called with the report so far after each batch.
+    Returns a report with the created and failed counts and the first
+    MAX_REPORTED_ERRORS row errors, rows numbered from 1 in file order after
+    the header. A file that turns unreadable part way stops the import with
+    "error" set; batches already inserted are kept.
+    """
+    plans = _field_plans(spec)
+    report = {"created": 0, "failed": 0, "errors": [], "error": ""}
+    batch = []
+    try:
+        for row_number, values in enumerate(rows, 1):
+            if values is None:
+                errors = {"non_field_errors": ["Expected a JSON object"]}
+            else:
+                cleaned, errors = clean_row(plans, values)
+                if not errors and spec.prepare_row:
+                    try:
+                        spec.prepare_row(cleaned)
+                    except ValidationError as e:
+                        errors = e.message_dict
+            if errors:
+                report["failed"] += 1
+                if len(report["errors"]) < MAX_REPORTED_ERRORS:
+                    report["errors"].append({"row": row_number, "errors": errors})
+                continue
+            batch.append(spec.model(user_id=user_id, **cleaned))
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                _insert_batch(spec, user_id, batch, report)
+                batch = []
+                if on_batch:
+                    on_batch(report)
+    except UnicodeDecodeError:
+        report["error"] = "The file must be UTF-8 encoded"
+    except (ValueError, csv.Error) as e:
+        report["error"] = str(e)
+    if batch:
+        _insert_batch(spec, user_id, batch, report)
+    if report["created"] and spec.after_import:
+        spec.after_import(user_id)
+    return report
+
+
+def get_import_spec(target):
+    return import_string(IMPORT_SPECS[target])
+
+
+def run_import_job(job, s3):
+    """
+    Import a queued job's upload from S3 and store the report on the job.
+    The upload is spooled to a local temporary file first so parsing never
+    waits on the network, then deleted from S3.
+    """
+    spec = get_import_spec(job.target)
+
+    def beat(report):
+        ImportJob.objects.filter(pk=job.pk).update(
+            heartbeat_at=timezone.now(),
+            created_count=report["created"],
+            failed_count=report["failed"],
+        )
+
+    with tempfile.TemporaryFile() as download:
+        s3.download_fileobj(settings.AWS_STORAGE_BUCKET_NAME, job.file_key, download)
+        download.seek(0)
+        try:
+            rows = read_rows(download, job.file_format, spec.header_map())
+        except ValueError as e:
+            report = {"created": 0, "failed": 0, "errors": [], "error": str(e)}
+        else:
+            report = import_rows(spec, job.user_id, rows, on_batch=beat)
+    job.created_count = report["created"]
+    job.failed_count = report["failed"]
+    job.errors = report["errors"]
+    job.error = report["error"]
+    job.status = ImportJob.FAILED if report["error"] else ImportJob.DONE
+    job.finished_at = timezone.now()
+    job.save()
+    _delete_upload(s3, job)
+    return job
+
+
+def _delete_upload(s3, job):
+    try:
+        s3.delete_object(Bucket=settings.AWS_STORAGE_BUCKET_NAME, Key=job.file_key)
+    except Exception as e:
+        logger.error("Error deleting import upload from S3: %s", str(e))
+
+
+def claim_import_job():
+    """
+    Mark the oldest pending job running and return it, or None. SKIP LOCKED
+    lets several workers poll the queue without claiming the same job.
+    """
+    with transaction.atomic():
+        job = (
+            ImportJob.objects.select_for_update(skip_locked=True)
+            .filter(status=ImportJob.PENDING)
+            .order_by("id")
+            .first()
+        )
+        if job:
+            job.status = ImportJob.RUNNING
+            job.heartbeat_at = timezone.now()
+            job.save(update_fields=["status", "heartbeat_at"])
+    return job
+
+
+def fail_stale_import_jobs(s3):
+    """
+    Mark failed the running jobs with no heartbeat for IMPORT_JOB_TIMEOUT,
+    whose worker died, and delete their uploads. They aren't run again:
+    batches already inserted are kept, and a rerun would insert them twice.
+    Returns the jobs failed.
+    """
+    with transaction.atomic():
+        jobs = list(
+            ImportJob.objects.select_for_update(skip_locked=True).filter(
+                status=ImportJob.RUNNING,
+                heartbeat_at__lt=timezone.now() - IMPORT_JOB_TIMEOUT,
+            )
+        )
+        ImportJob.objects.filter(id__in=[job.id for job in jobs]).update(
+            status=ImportJob.FAILED,
+            error="The import stopped before finishing; rows already imported "
+            "were kept",
+            finished_at=timezone.now(),
+        )
+    for job in jobs:
+        _delete_upload(s3, job)
+    return jobs
@@ -0,0 +1,69 @@
+# job_applications/management/commands/backfill_salary_ranges.py
+
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from job_applications.models import JobApplication
+from job_applications.salary import parse_salary
+
+
+class Command(BaseCommand):
+    help = "Populate salary_min/salary_max/salary_currency from the free-text salary."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Number of rows read per chunk",
+        )
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Re-parse every row, not only rows that were never parsed",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+
+        rows = JobApplication.objects.exclude(salary="")
+        if not options["all"]:
+            rows = rows.filter(salary_min__isnull=True)
+        rows = rows.values_list("id", "salary").order_by("id")
+
+        batch = []
+        updated = 0
+        for row in rows.iterator(chunk_size=batch_size):
+            batch.append(row)
+            if len(batch) >= batch_size:
+                updated += self._flush(batch)
+                batch = []
+        if batch:
+            updated += self._flush(batch)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"✅ Parsed salaries for {updated} job application(s).")
+        )
+
+    def _flush(self, batch):
+        # Salaries repeat heavily ("$120k"), so group ids by parsed value and
+        # issue one UPDATE ... WHERE id IN (...) per distinct value.
+        groups = defaultdict(list)
+        for job_id, salary in batch:
+            groups[parse_salary(salary)].append(job_id)
+
+        updated = 0
+        now = timezone.now()
+        with transaction.atomic():
+            for (low, high, currency), ids in groups.items():
+                if low is None:
+                    continue
+                updated += JobApplication.objects.filter(id__in=ids).update(
+                    salary_min=low,
+                    salary_max=high,
+                    salary_currency=currency,
+                    updated_at=now,  # update() skips auto_now; keep delta sync right
+                )
+        return updated
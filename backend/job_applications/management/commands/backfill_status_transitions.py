@@ -0,0 +1,65 @@
+# job_applications/management/commands/backfill_status_transitions.py
+
+from datetime import datetime, time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from job_applications.models import JobApplication, StatusTransition
+
+
+class Command(BaseCommand):
+    help = (
+        "Create an initial StatusTransition for every JobApplication that has no "
+        "history yet (e.g. rows written by bulk_create or before the log existed)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Number of transitions to insert per bulk_create call",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        tz = timezone.get_current_timezone()
+
+        missing = (
+            JobApplication.objects.filter(status_transitions__isnull=True)
+            .values_list("id", "user_id", "status", "date_applied")
+            .order_by("id")
+        )
+
+        batch = []
+        created = 0
+        for job_id, user_id, status, date_applied in missing.iterator(
+            chunk_size=batch_size
+        ):
+            # The real change date is unknown, so the response latency is left
+            # empty rather than guessed; these rows never skew the percentiles.
+            batch.append(
+                StatusTransition(
+                    user_id=user_id,
+                    job_application_id=job_id,
+                    from_status="",
+                    to_status=status,
+                    changed_at=timezone.make_aware(
+                        datetime.combine(date_applied, time.min), tz
+                    ),
+                    is_first_response=status in StatusTransition.RESPONSE_STATUSES,
+                    response_days=None,
+                )
+            )
+            if len(batch) >= batch_size:
+                StatusTransition.objects.bulk_create(batch)
+                created += len(batch)
+                batch = []
+
+        if batch:
+            StatusTransition.objects.bulk_create(batch)
+            created += len(batch)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"✅ Backfilled {created} status transition(s).")
+        )
@@ -0,0 +1,57 @@
+# job_applications/management/commands/process_imports.py
+
+import time
+
+from django.core.management.base import BaseCommand
+from job_applications.imports import (
+    claim_import_job,
+    fail_stale_import_jobs,
+    run_import_job,
+)
+from job_applications.views import get_s3_client
+
+
+class Command(BaseCommand):
+    help = (
+        "Worker for bulk imports too large for the upload request: claim queued "
+        "ImportJobs one at a time and import them. Jobs left running by a worker "
+        "that died are marked failed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=2,
+            help="Seconds to wait before polling again when the queue is empty",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit once the queue is empty instead of polling",
+        )
+
+    def handle(self, *args, **options):
+        s3 = get_s3_client()
+        while True:
+            for stale in fail_stale_import_jobs(s3):
+                self.stderr.write(f"Import {stale.id} failed: its worker stopped")
+            job = claim_import_job()
+            if job is None:
+                if options["once"]:
+                    return
+                time.sleep(options["poll_interval"])
+                continue
+            started = time.time()
+            try:
+                run_import_job(job, s3)
+            except Exception as e:
+                job.status = job.FAILED
+                job.error = "The import could not be completed"
+                job.save(update_fields=["status", "error"])
+                self.stderr.write(f"Import {job.id} failed: {e}")
+                continue
+            self.stdout.write(
+                f"Import {job.id}: {job.created_count} created, "
+                f"{job.failed_count} failed in {time.time() - started:.1f}s"
+            )
@@ -0,0 +1,58 @@
+# job_applications/management/commands/process_thumbnails.py
+
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.core.management.base import BaseCommand
+from job_applications.thumbnails import claim_thumbnail_batch, render_thumbnails
+
+
+class Command(BaseCommand):
+    help = (
+        "Worker that renders attachment thumbnails: claim blobs waiting for a "
+        "preview and render them on a pool of processes, off the request path."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=os.cpu_count(),
+            help="Rendering processes (default: one per CPU)",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=2,
+            help="Seconds to wait before polling again when the queue is empty",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit once the queue is empty instead of polling",
+        )
+
+    def handle(self, *args, **options):
+        # Spawned rather than forked, so no process shares this one's database
+        # connection; each sets Django up once and then only talks to S3
+        with ProcessPoolExecutor(
+            max_workers=options["processes"],
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=django.setup,
+        ) as pool:
+            while True:
+                blobs = claim_thumbnail_batch()
+                if not blobs:
+                    if options["once"]:
+                        return
+                    time.sleep(options["poll_interval"])
+                    continue
+                started = time.time()
+                rendered = render_thumbnails(pool, blobs)
+                self.stdout.write(
+                    f"Thumbnails: {rendered} of {len(blobs)} rendered in "
+                    f"{time.time() - started:.1f}s"
+                )
@@ -5,6 +5,7 @@ from django.core.management.base import BaseCommand
 from faker import Faker
 from accounts.models import CustomUser
 from job_applications.models import JobApplication
+from job_applications.salary import parse_salary
 
 fake = Faker()
 
@@ -107,6 +108,7 @@ class Command(BaseCommand):
             date_applied = fake.date_between(start_date="-90d", end_date="today")
             notes = fake.paragraph(nb_sentences=3)
             salary = f"${random.randint(50, 200)}k"
+            salary_min, salary_max, salary_currency = parse_salary(salary)
             contact_person = fake.name()
             contact_email = fake.email()
             url = fake.url()
@@ -120,6 +122,9 @@ class Command(BaseCommand):
                 date_applied=date_applied,
                 notes=notes,
                 salary=salary,
+                salary_min=salary_min,
+                salary_max=salary_max,
+                salary_currency=salary_currency,
                 contact_person=contact_person,
                 contact_email=contact_email,
                 url=url,
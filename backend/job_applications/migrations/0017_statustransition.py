@@ -0,0 +1,60 @@
+# Generated by Django 5.1.5 on 2026-10-19 14:15
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("job_applications", "0016_alter_jobapplication_date_applied_and_more"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StatusTransition",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("from_status", models.CharField(blank=True, max_length=50)),
+                ("to_status", models.CharField(max_length=50)),
+                ("changed_at", models.DateTimeField(default=django.utils.timezone.now)),
+                ("is_first_response", models.BooleanField(default=False)),
+                ("response_days", models.PositiveIntegerField(blank=True, null=True)),
+                (
+                    "job_application",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="status_transitions",
+                        to="job_applications.jobapplication",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="status_transitions",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["user", "changed_at"],
+                        name="job_applica_user_id_efabb2_idx",
+                    )
+                ],
+            },
+        ),
+    ]
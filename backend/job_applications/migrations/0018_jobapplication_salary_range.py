@@ -0,0 +1,42 @@
+# Generated by Django 5.1.5 on 2026-10-19 14:18
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("job_applications", "0017_statustransition"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="jobapplication",
+            name="salary_currency",
+            field=models.CharField(blank=True, max_length=3),
+        ),
+        migrations.AddField(
+            model_name="jobapplication",
+            name="salary_max",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="jobapplication",
+            name="salary_min",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="jobapplication",
+            index=models.Index(
+                fields=["user", "salary_min"], name="job_applica_user_id_484844_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="jobapplication",
+            index=models.Index(
+                fields=["user", "salary_max"], name="job_applica_user_id_0767c0_idx"
+            ),
+        ),
+    ]
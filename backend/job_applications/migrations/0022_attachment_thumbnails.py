@@ -0,0 +1,43 @@
+# Generated by Django 5.1.5 on 2026-10-19 15:20
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("job_applications", "0021_attachment_blobs"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="attachmentblob",
+            name="thumbnail_key",
+            field=models.CharField(blank=True, max_length=500),
+        ),
+        migrations.AddField(
+            model_name="attachmentblob",
+            name="thumbnail_status",
+            field=models.CharField(
+                choices=[
+                    ("pending", "Pending"),
+                    ("running", "Running"),
+                    ("done", "Done"),
+                    ("unsupported", "Unsupported"),
+                    ("failed", "Failed"),
+                ],
+                default="pending",
+                max_length=20,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="attachmentblob",
+            index=models.Index(
+                condition=models.Q(("thumbnail_status", "pending")),
+                fields=["id"],
+                name="blob_thumbnail_pending_idx",
+            ),
+        ),
+    ]
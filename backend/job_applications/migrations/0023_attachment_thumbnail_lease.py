@@ -0,0 +1,37 @@
+# Generated by Django 5.1.5 on 2026-10-19 16:02
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("job_applications", "0022_attachment_thumbnails"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="attachmentblob",
+            name="blob_thumbnail_pending_idx",
+        ),
+        migrations.AddField(
+            model_name="attachmentblob",
+            name="thumbnail_attempts",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="attachmentblob",
+            name="thumbnail_claimed_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="attachmentblob",
+            index=models.Index(
+                condition=models.Q(("thumbnail_status__in", ["pending", "running"])),
+                fields=["id"],
+                name="blob_thumbnail_queue_idx",
+            ),
+        ),
+    ]
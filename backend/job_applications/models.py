@@ -1,8 +1,14 @@
 # Create your models here.
 
-from django.db import models
+from collections import Counter
+
+from django.db import IntegrityError, models, transaction
 from django.contrib.auth import get_user_model
 from django.db.models import Index, F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .salary import parse_salary
 
 User = get_user_model()
 
@@ -23,9 +29,14 @@ class JobApplication(models.Model):
     )  # test db in dex for date for faster queries
     notes = models.TextField(blank=True)
     salary = models.CharField(max_length=100, blank=True)
+    # Parsed from `salary` on save so range filters and stats stay in SQL
+    salary_min = models.PositiveIntegerField(null=True, blank=True)
+    salary_max = models.PositiveIntegerField(null=True, blank=True)
+    salary_currency = models.CharField(max_length=3, blank=True)
     contact_person = models.CharField(max_length=255, blank=True)
     contact_email = models.EmailField(blank=True)
     url = models.URLField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         indexes = [
@@ -36,13 +47,161 @@ class JobApplication(models.Model):
             Index(fields=["user", "status", "position", "-date_applied", "-id"]),
             Index(fields=["user", "status", "company", "-date_applied", "-id"]),
             Index(fields=["user", "company", "-date_applied", "-id"]),
+            Index(fields=["user", "salary_min"]),
+            Index(fields=["user", "salary_max"]),
+            Index(fields=["user", "updated_at"]),  # delta sync
             # Index(fields=["user", "status", "location", "-date_applied", "-id"]),
         ]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the status it was loaded with so save() can log changes.
+        # Read through __dict__ so a deferred status isn't fetched per row.
+        instance._original_status = instance.__dict__.get("status")
+        return instance
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        saves_salary = update_fields is None or "salary" in update_fields
+        saves_status = update_fields is None or "status" in update_fields
+        is_new = self._state.adding
+        previous_status = None if is_new else getattr(self, "_original_status", None)
+        if saves_salary and "salary" in self.__dict__:
+            self.salary_min, self.salary_max, self.salary_currency = parse_salary(
+                self.salary
+            )
+            if update_fields is not None:
+                kwargs["update_fields"] = {
+                    *update_fields,
+                    "salary_min",
+                    "salary_max",
+                    "salary_currency",
+                }
+        status_changed = saves_status and (
+            is_new or ("status" in self.__dict__ and previous_status != self.status)
+        )
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if status_changed:
+                StatusTransition.record(self, previous_status)
+        if saves_status:
+            self._original_status = self.__dict__.get("status")
+
     def __str__(self):
         return f"{self.position} at {self.company}"
 
 
+class AttachmentBlob(models.Model):
+    """
+    The one stored copy of an attachment file per user and content hash.
+    Every Attachment with the same bytes points at it and ref_count counts
+    them; the S3 object is deleted only when the last one goes.
+    """
+
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="attachment_blobs"
+    )
+    sha256 = models.CharField(max_length=64)
+    file_key = models.CharField(max_length=500)
+    size = models.PositiveBigIntegerField()
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    # First-page preview, rendered by the process_thumbnails worker
+    THUMBNAIL_PENDING = "pending"
+    THUMBNAIL_RUNNING = "running"
+    THUMBNAIL_DONE = "done"
+    THUMBNAIL_UNSUPPORTED = "unsupported"
+    THUMBNAIL_FAILED = "failed"
+    THUMBNAIL_STATUS_CHOICES = [
+        (THUMBNAIL_PENDING, "Pending"),
+        (THUMBNAIL_RUNNING, "Running"),
+        (THUMBNAIL_DONE, "Done"),
+        (THUMBNAIL_UNSUPPORTED, "Unsupported"),
+        (THUMBNAIL_FAILED, "Failed"),
+    ]
+    thumbnail_status = models.CharField(
+        max_length=20, choices=THUMBNAIL_STATUS_CHOICES, default=THUMBNAIL_PENDING
+    )
+    thumbnail_key = models.CharField(max_length=500, blank=True)
+    # When a worker last claimed it, so a claim left running by a worker that
+    # died can be taken again, and how many times it has been claimed
+    thumbnail_claimed_at = models.DateTimeField(null=True, blank=True)
+    thumbnail_attempts = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "sha256"], name="unique_user_blob")
+        ]
+        indexes = [
+            # Only the worker's queue of pending and claimed blobs is ever
+            # looked up
+            Index(
+                fields=["id"],
+                name="blob_thumbnail_queue_idx",
+                condition=models.Q(thumbnail_status__in=["pending", "running"]),
+            )
+        ]
+
+    @classmethod
+    def acquire(cls, user_id, sha256, size, file_key=None):
+        """
+        Take a reference to the user's blob with this digest. If there is
+        none, one is created for `file_key`, an object the caller already
+        stored; with no file_key, None is returned and the caller must store
+        the bytes and try again. Run inside a transaction: the row lock keeps
+        a concurrent release() from deleting the blob under us.
+        """
+        blob = (
+            cls.objects.select_for_update()
+            .filter(user_id=user_id, sha256=sha256)
+            .first()
+        )
+        if blob is None:
+            if file_key is None:
+                return None
+            try:
+                with transaction.atomic():
+                    return cls.objects.create(
+                        user_id=user_id,
+                        sha256=sha256,
+                        size=size,
+                        file_key=file_key,
+                        ref_count=1,
+                    )
+            except IntegrityError:
+                # A concurrent upload of the same bytes got there first
+                blob = cls.objects.select_for_update().get(
+                    user_id=user_id, sha256=sha256
+                )
+        cls.objects.filter(pk=blob.pk).update(ref_count=F("ref_count") + 1)
+        return blob
+
+    @classmethod
+    def release(cls, blob_ids):
+        """
+        Drop one reference per id in `blob_ids` (repeats count, None is
+        skipped) and delete the blobs left unreferenced. Returns their S3
+        keys, thumbnails included, to delete once the transaction has
+        committed.
+        """
+        counts = Counter(blob_id for blob_id in blob_ids if blob_id is not None)
+        for blob_id, count in counts.items():
+            cls.objects.filter(pk=blob_id).update(
+                ref_count=Greatest(F("ref_count") - count, 0)
+            )
+        unused = cls.objects.filter(pk__in=counts, ref_count=0)
+        keys = []
+        for file_key, thumbnail_key in unused.values_list("file_key", "thumbnail_key"):
+            keys += [file_key, thumbnail_key] if thumbnail_key else [file_key]
+        unused.delete()
+        return keys
+
+    def __str__(self):
+        return f"{self.sha256[:12]} x{self.ref_count}"
+
+
 class Attachment(models.Model):
     job_application = models.ForeignKey(
         JobApplication, on_delete=models.CASCADE, related_name="attachments"
@@ -50,7 +209,143 @@ class Attachment(models.Model):
     name = models.CharField(max_length=255)
     type = models.CharField(max_length=50)
     file_url = models.CharField(max_length=500)  # This stores the S3 file key/path
+    # Shared stored copy; null for attachments uploaded before deduplication,
+    # which own their file_url outright
+    blob = models.ForeignKey(
+        AttachmentBlob,
+        on_delete=models.RESTRICT,
+        null=True,
+        blank=True,
+        related_name="attachments",
+    )
     date_added = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return self.name
+
+
+class StatusTransition(models.Model):
+    """
+    Append-only log of JobApplication status changes. response_days is
+    pre-computed on write for the first transition into a response status,
+    so the dashboard can bucket latencies without joining back to the
+    application.
+    """
+
+    PENDING_STATUSES = ("saved", "applied")
+    RESPONSE_STATUSES = ("interview", "offer", "rejected")
+
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="status_transitions"
+    )
+    job_application = models.ForeignKey(
+        JobApplication, on_delete=models.CASCADE, related_name="status_transitions"
+    )
+    from_status = models.CharField(max_length=50, blank=True)
+    to_status = models.CharField(max_length=50)
+    changed_at = models.DateTimeField(default=timezone.now)
+    is_first_response = models.BooleanField(default=False)
+    response_days = models.PositiveIntegerField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            Index(fields=["user", "changed_at"]),
+        ]
+
+    @classmethod
+    def build(
+        cls,
+        user_id,
+        job_application_id,
+        date_applied,
+        previous_status,
+        new_status,
+        has_responded,
+        changed_at,
+    ):
+        """
+        Unsaved transition from plain values, so bulk writers can log many
+        changes with one bulk_create. has_responded says whether the
+        application already has a first-response transition.
+        """
+        is_first_response = (
+            new_status in cls.RESPONSE_STATUSES
+            and previous_status in (None, *cls.PENDING_STATUSES)
+            and not has_responded
+        )
+        response_days = None
+        if is_first_response and previous_status is not None:
+            response_days = max((timezone.localdate(changed_at) - date_applied).days, 0)
+        return cls(
+            user_id=user_id,
+            job_application_id=job_application_id,
+            from_status=previous_status or "",
+            to_status=new_status,
+            changed_at=changed_at,
+            is_first_response=is_first_response,
+            response_days=response_days,
+        )
+
+    @classmethod
+    def record(cls, job_app, previous_status, changed_at=None):
+        has_responded = (
+            previous_status is not None
+            and cls.objects.filter(
+                job_application=job_app, is_first_response=True
+            ).exists()
+        )
+        transition = cls.build(
+            job_app.user_id,
+            job_app.pk,
+            job_app.date_applied,
+            previous_status,
+            job_app.status,
+            has_responded,
+            changed_at or timezone.now(),
+        )
+        transition.save()
+        return transition
+
+    def __str__(self):
+        return f"{self.from_status or '-'} -> {self.to_status}"
+
+
+class ImportJob(models.Model):
+    """
+    A bulk import too large to run during the upload request, queued for the
+    process_imports worker. The upload waits in S3 under file_key until the
+    worker has read it.
+    """
+
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"  # the file couldn't be read to the end
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="import_jobs")
+    target = models.CharField(max_length=50)  # a key of imports.IMPORT_SPECS
+    file_name = models.CharField(max_length=255)
+    file_key = models.CharField(max_length=500)
+    file_format = models.CharField(max_length=10)
+    status = models.CharField(
+        max_length=20, choices=STATUS_CHOICES, default=PENDING, db_index=True
+    )
+    created_count = models.PositiveIntegerField(default=0)
+    failed_count = models.PositiveIntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True)  # per-row, capped
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Set when a worker claims the job and after every batch it inserts, so
+    # a job whose worker died can be told from one still running
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.target} import {self.file_name} ({self.status})"
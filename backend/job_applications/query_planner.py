@@ -0,0 +1,130 @@
+# job_applications/query_planner.py
+
+from dataclasses import dataclass, field
+from datetime import date
+
+from django.db.models import Q
+
+from .models import JobApplication
+
+
+@dataclass
+class ListFilters:
+    status: list = field(default_factory=list)
+    company: list = field(default_factory=list)
+    location: list = field(default_factory=list)
+    date_from: date = None
+    date_to: date = None
+    salary_min: int = None
+    salary_max: int = None
+    search: str = ""
+
+
+@dataclass
+class ListQueryPlan:
+    queryset: object
+    # Diagnostic only: the JobApplication Meta index Postgres should walk for
+    # this query, logged next to its timing. Nothing forces it
+    expected_index: object
+
+
+def parse_int_param(value):
+    """
+    Parse an optional integer query parameter; raises ValueError if malformed.
+    """
+    if value in (None, ""):
+        return None
+    return int(value)
+
+
+def split_list_param(value):
+    """
+    The distinct values of a comma-separated param (?status=applied,interview),
+    sorted so the same selection in any order compares and caches equal.
+    """
+    return sorted({v.strip() for v in (value or "").split(",") if v.strip()})
+
+
+def _parse_date(value):
+    return date.fromisoformat(value) if value else None
+
+
+def parse_list_filters(query_params):
+    """
+    Build ListFilters from request query params; raises ValueError on
+    malformed numbers or dates.
+    """
+    return ListFilters(
+        status=split_list_param(query_params.get("status")),
+        company=split_list_param(query_params.get("company")),
+        location=split_list_param(query_params.get("location")),
+        date_from=_parse_date(query_params.get("dateFrom")),
+        date_to=_parse_date(query_params.get("dateTo")),
+        salary_min=parse_int_param(query_params.get("salaryMin")),
+        salary_max=parse_int_param(query_params.get("salaryMax")),
+        search=(query_params.get("search") or "").strip(),
+    )
+
+
+def _ordered_indexes():
+    """
+    The (user, <equality columns...>, -date_applied, -id) composite indexes,
+    most selective first, as (index, equality_columns) pairs.
+    """
+    candidates = []
+    for index in JobApplication._meta.indexes:
+        fields = list(index.fields)
+        if fields[:1] == ["user"] and fields[-2:] == ["-date_applied", "-id"]:
+            candidates.append((index, tuple(fields[1:-2])))
+    return sorted(candidates, key=lambda c: len(c[1]), reverse=True)
+
+
+def expected_index_for(filters):
+    """
+    The composite index Postgres should walk for these filters: the one with
+    the most equality columns that are each pinned to a single value. Only
+    then does the index range come back already in (-date_applied, -id)
+    order, so a page is a LIMIT over an index scan with no sort.
+    Multi-valued columns stay residual ANY() filters on the
+    (user, -date_applied, -id) walk. This only predicts Postgres's choice for
+    logging; it doesn't change the query.
+    """
+    for index, columns in _ordered_indexes():
+        if all(len(getattr(filters, c, None) or ()) == 1 for c in columns):
+            return index
+    return None
+
+
+def plan_list_queryset(base_qs, filters, order_by_fields):
+    """
+    Apply the list filters to base_qs: single values become equality
+    predicates that the composite indexes' leading columns can match, date
+    bounds a range on date_applied, and everything else a residual
+    predicate.
+
+    Rewriting several statuses into a UNION ALL of per-status index scans was
+    tried; Postgres sorts the appended branches instead of merging them, which
+    was ~30x slower on a 200k-row user than a single status = ANY(...) walk.
+    """
+    qs = base_qs
+    for column in ("status", "company", "location"):
+        values = getattr(filters, column)
+        if len(values) == 1:
+            qs = qs.filter(**{column: values[0]})
+        elif values:
+            qs = qs.filter(**{f"{column}__in": values})
+    if filters.date_from:
+        qs = qs.filter(date_applied__gte=filters.date_from)
+    if filters.date_to:
+        qs = qs.filter(date_applied__lte=filters.date_to)
+    if filters.salary_min is not None:
+        qs = qs.filter(salary_max__gte=filters.salary_min)
+    if filters.salary_max is not None:
+        qs = qs.filter(salary_min__lte=filters.salary_max)
+    if filters.search:
+        query = Q()
+        for term in filters.search.split():
+            query |= Q(company__icontains=term) | Q(position__icontains=term)
+        qs = qs.filter(query)
+
+    return ListQueryPlan(qs.order_by(*order_by_fields), expected_index_for(filters))
@@ -0,0 +1,78 @@
+# job_applications/salary.py
+
+import re
+from functools import lru_cache
+
+# Checked in order, so the prefixed dollars come before the bare "$"
+CURRENCY_SYMBOLS = {
+    "CA$": "CAD",
+    "C$": "CAD",
+    "AU$": "AUD",
+    "A$": "AUD",
+    "$": "USD",
+    "€": "EUR",
+    "£": "GBP",
+    "₹": "INR",
+    "¥": "JPY",
+}
+# ISO 4217 codes recognised in the text; other capitalised words ("RSU",
+# "OTE") are not currencies
+CURRENCY_CODES = frozenset(
+    "AED ARS AUD BRL CAD CHF CLP CNY COP CZK DKK EGP EUR GBP HKD HUF IDR ILS INR "
+    "JPY KRW MXN MYR NGN NOK NZD PHP PKR PLN RON SAR SEK SGD THB TRY TWD UAH USD "
+    "VND ZAR".split()
+)
+HOURS_PER_YEAR = 2080
+# salary_min/salary_max are PositiveIntegerFields
+MAX_SALARY = 2_147_483_647
+
+# The suffix needs a word boundary so "100 monthly" isn't 100 million
+_AMOUNT_RE = re.compile(r"(\d+(?:[.,]\d+)*)\s*(?:([km])\b)?", re.IGNORECASE)
+_CODE_RE = re.compile(r"\b([A-Z]{3})\b")
+# "80.000" / "1.250.000": dots followed by exactly three digits group
+# thousands (European style), they aren't a decimal point
+_DOT_THOUSANDS_RE = re.compile(r"\d{1,3}(?:\.\d{3})+")
+_HOURLY_RE = re.compile(r"(/\s*h(ou)?r|per\s+hour|hourly)", re.IGNORECASE)
+
+
+def _to_number(raw, suffix):
+    # "120,000" -> 120000, "80.000" -> 80000, "1.5" + "m" -> 1500000
+    if _DOT_THOUSANDS_RE.fullmatch(raw):
+        raw = raw.replace(".", "")
+    value = float(raw.replace(",", ""))
+    if suffix:
+        value *= 1_000 if suffix.lower() == "k" else 1_000_000
+    return value
+
+
+@lru_cache(maxsize=4096)
+def parse_salary(text):
+    """
+    Parse a free-text salary such as "$120k", "100k-130k", "€80,000" or
+    "$45/hr" into (salary_min, salary_max, currency) as annual whole units.
+    A currency symbol wins over an ISO code elsewhere in the text.
+    Unparseable input, or amounts too large to store, return None amounts.
+    """
+    if not text:
+        return None, None, ""
+
+    matches = _AMOUNT_RE.findall(text)[:2]
+    if not matches:
+        return None, None, ""
+    # "100-130k" means 100k-130k: a trailing suffix applies to bare numbers
+    last_suffix = matches[-1][1]
+    amounts = [_to_number(raw, suffix or last_suffix) for raw, suffix in matches]
+
+    if _HOURLY_RE.search(text):
+        amounts = [a * HOURS_PER_YEAR for a in amounts]
+
+    currency = next(
+        (iso for symbol, iso in CURRENCY_SYMBOLS.items() if symbol in text), ""
+    )
+    if not currency:
+        codes = [code for code in _CODE_RE.findall(text) if code in CURRENCY_CODES]
+        currency = codes[0] if codes else ""
+
+    if max(amounts) > MAX_SALARY:
+        return None, None, currency
+    return int(round(min(amounts))), int(round(max(amounts))), currency
@@ -1,16 +1,68 @@
 from rest_framework import serializers
-from .models import JobApplication, Attachment
+from .models import JobApplication, Attachment, ImportJob
+
+NOTES_PREVIEW_LENGTH = 200
 
 
 class AttachmentSerializer(serializers.ModelSerializer):
+    # S3 key of the first-page preview, once the thumbnail worker has made it
+    thumbnail = serializers.SerializerMethodField()
+
     class Meta:
         model = Attachment
-        fields = "__all__"
+        exclude = ["blob"]
+
+    def get_thumbnail(self, obj):
+        if obj.blob_id is None:
+            return None
+        return obj.blob.thumbnail_key or None
 
 
 class JobApplicationSerializer(serializers.ModelSerializer):
     attachments = AttachmentSerializer(many=True, read_only=True)
+    # Only present when the queryset is annotated via select_job_fields()
+    notes_preview = serializers.CharField(read_only=True)
 
     class Meta:
         model = JobApplication
         fields = "__all__"
+        read_only_fields = ["salary_min", "salary_max", "salary_currency"]
+
+    def __init__(self, *args, **kwargs):
+        # Optional sparse fieldset, e.g. fields=["id", "company", "status"]
+        self.selected_fields = kwargs.pop("fields", None)
+        super().__init__(*args, **kwargs)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if self.selected_fields is None:
+            fields.pop("notes_preview")
+            return fields
+        return {name: fields[name] for name in self.selected_fields}
+
+
+class BulkJobApplicationIdsSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=1000
+    )
+
+
+class BulkStatusUpdateSerializer(BulkJobApplicationIdsSerializer):
+    status = serializers.CharField(max_length=50)
+
+
+class ImportJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ImportJob
+        fields = [
+            "id",
+            "target",
+            "file_name",
+            "status",
+            "created_count",
+            "failed_count",
+            "errors",
+            "error",
+            "created_at",
+            "finished_at",
+        ]
@@ -1,11 +1,39 @@
-from datetime import date
-from unittest.mock import patch, MagicMock
+import csv
+import io
+import json
+import random
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from unittest.mock import ANY, patch, MagicMock
+from django.db import connection, transaction
+from django.http import QueryDict
+from django.utils import timezone
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework.test import APITestCase, APIClient
 from rest_framework import status
 from django.contrib.auth import get_user_model
-from job_applications.models import JobApplication, Attachment
+from job_applications.imports import (
+    claim_import_job,
+    fail_stale_import_jobs,
+    run_import_job,
+)
+from job_applications.thumbnails import claim_thumbnail_batch, render_thumbnails
+from job_applications.models import (
+    JobApplication,
+    Attachment,
+    AttachmentBlob,
+    StatusTransition,
+    ImportJob,
+)
+from django.core.files.uploadhandler import StopFutureHandlers
+from job_applications.uploads import S3MultipartUploadHandler
+from job_applications.salary import parse_salary
+from job_applications.query_planner import parse_list_filters, plan_list_queryset
+from job_applications.views import generate_cache_key
 from django.core.files.uploadedfile import SimpleUploadedFile
+from reportlab.pdfgen import canvas
 
 User = get_user_model()
 
@@ -76,6 +104,212 @@ class JobApplicationAPITestCase(APITestCase):
         self.assertEqual(JobApplication.objects.count(), 2)
         self.assertEqual(Attachment.objects.count(), 1)
 
+    def test_session_uploads_stream_to_s3(self):
+        s3 = self.mock_s3.return_value
+        self.client.force_login(self.user)
+        data = {
+            "company": "Amazon",
+            "position": "DevOps Intern",
+            "status": "applied",
+            "date_applied": str(date.today()),
+            "attachments": [SimpleUploadedFile("resume.pdf", b"PDF content")],
+        }
+        response = self.client.post(self.list_url, data, format="multipart")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        s3.upload_fileobj.assert_not_called()
+        key = s3.put_object.call_args.kwargs["Key"]
+        self.assertTrue(key.startswith(f"job_applications/{self.user.id}/"))
+        self.assertEqual(Attachment.objects.get().file_url, key)
+
+        # A rejected request doesn't leave its streamed file behind
+        del data["company"]
+        data["attachments"] = [SimpleUploadedFile("cover.pdf", b"tiny")]
+        response = self.client.post(self.list_url, data, format="multipart")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        stored = s3.put_object.call_args.kwargs["Key"]
+        deleted = s3.delete_objects.call_args.kwargs["Delete"]["Objects"]
+        self.assertEqual(deleted, [{"Key": stored}])
+
+    def test_identical_attachments_share_one_stored_copy(self):
+        s3 = self.mock_s3.return_value
+        self.client.force_login(self.user)
+        job_ids = []
+        for company in ("Amazon", "Netflix"):
+            data = {
+                "company": company,
+                "position": "SWE",
+                "status": "applied",
+                "date_applied": str(date.today()),
+                "attachments": [SimpleUploadedFile("resume.pdf", b"Same resume")],
+            }
+            response = self.client.post(self.list_url, data, format="multipart")
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            job_ids.append(response.data["id"])
+        # The second copy was recognised by its hash and never uploaded
+        self.assertEqual(s3.put_object.call_count, 1)
+        blob = AttachmentBlob.objects.get()
+        self.assertEqual(blob.ref_count, 2)
+        self.assertEqual(
+            set(Attachment.objects.values_list("file_url", flat=True)),
+            {blob.file_key},
+        )
+
+        # Removing one reference keeps the object for the other
+        attachment = Attachment.objects.get(job_application_id=job_ids[0])
+        response = self.client.delete(
+            reverse("delete_attachment", args=[job_ids[0], attachment.id])
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        s3.delete_objects.assert_not_called()
+        blob.refresh_from_db()
+        self.assertEqual(blob.ref_count, 1)
+
+        response = self.client.delete(
+            reverse("job_application_detail", args=[job_ids[1]])
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(AttachmentBlob.objects.exists())
+        deleted = s3.delete_objects.call_args.kwargs["Delete"]["Objects"]
+        self.assertEqual(deleted, [{"Key": blob.file_key}])
+
+    def test_attachment_download_urls_are_signed_in_batches(self):
+        s3 = self.mock_s3.return_value
+        s3.generate_presigned_url.side_effect = (
+            lambda op, Params, ExpiresIn: f"https://s3/{Params['Key']}?sig"
+        )
+        other = JobApplication.objects.create(
+            user=self.user,
+            company="Meta",
+            position="SWE",
+            status="applied",
+            date_applied=date.today(),
+        )
+        for job, key in ((self.job, "a/resume.pdf"), (other, "b/cover.pdf")):
+            Attachment.objects.create(
+                job_application=job, name="file.pdf", type="resume", file_url=key
+            )
+        url = reverse("attachment_download_urls")
+        response = self.client.post(
+            url, {"ids": [self.job.id, other.id]}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [att["download_url"] for att in response.data["attachments"]],
+            ["https://s3/a/resume.pdf?sig", "https://s3/b/cover.pdf?sig"],
+        )
+        # Signatures are reused within their window, including by the list
+        response = self.client.get(self.list_url, {"downloadUrls": "true"})
+        self.assertEqual(s3.generate_presigned_url.call_count, 2)
+        attachments = [
+            a for job in response.data["results"] for a in job["attachments"]
+        ]
+        self.assertEqual(len(attachments), 2)
+        self.assertTrue(all(a["download_url"].endswith("?sig") for a in attachments))
+        response = self.client.get(self.list_url)
+        self.assertNotIn("download_url", response.data["results"][0]["attachments"][0])
+
+    def test_thumbnail_worker_renders_first_page(self):
+        pdf = io.BytesIO()
+        page = canvas.Canvas(pdf)
+        page.drawString(72, 720, "Josh - Software Engineer")
+        page.save()
+        blob = AttachmentBlob.objects.create(
+            user=self.user,
+            sha256="a" * 64,
+            file_key="k/resume.pdf",
+            size=1,
+            ref_count=1,
+        )
+        Attachment.objects.create(
+            job_application=self.job,
+            name="resume.pdf",
+            type="resume",
+            file_url=blob.file_key,
+            blob=blob,
+        )
+        s3 = MagicMock()
+        s3.get_object.return_value = {"Body": io.BytesIO(pdf.getvalue())}
+        with patch("job_applications.thumbnails._s3", s3), ThreadPoolExecutor(
+            1
+        ) as pool:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.assertEqual(render_thumbnails(pool, claim_thumbnail_batch()), 1)
+        self.assertEqual(claim_thumbnail_batch(), [])
+
+        stored = s3.put_object.call_args.kwargs
+        self.assertEqual(stored["Key"], "k/resume.pdf.thumb.jpg")
+        self.assertTrue(stored["Body"].startswith(b"\xff\xd8"))  # JPEG
+        response = self.client.get(self.detail_url)
+        self.assertEqual(
+            response.data["attachments"][0]["thumbnail"], "k/resume.pdf.thumb.jpg"
+        )
+
+    def test_thumbnail_worker_reclaims_stale_claims(self):
+        stale, fresh = [
+            AttachmentBlob.objects.create(
+                user=self.user,
+                sha256=c * 64,
+                file_key=f"k/{c}.pdf",
+                size=1,
+                ref_count=1,
+                thumbnail_status=AttachmentBlob.THUMBNAIL_RUNNING,
+                thumbnail_claimed_at=timezone.now() - age,
+                thumbnail_attempts=1,
+            )
+            for c, age in (("b", timedelta(hours=1)), ("c", timedelta(seconds=5)))
+        ]
+        self.assertEqual([b.id for b in claim_thumbnail_batch()], [stale.id])
+        stale.refresh_from_db()
+        self.assertEqual(stale.thumbnail_attempts, 2)
+        self.assertGreater(stale.thumbnail_claimed_at, fresh.thumbnail_claimed_at)
+
+        # A pool that breaks part way puts the blob back in the queue
+        pool = MagicMock()
+        pool.map.side_effect = RuntimeError("pool broken")
+        with self.assertRaises(RuntimeError):
+            render_thumbnails(pool, [stale])
+        stale.refresh_from_db()
+        self.assertEqual(stale.thumbnail_status, AttachmentBlob.THUMBNAIL_PENDING)
+        self.assertIsNone(stale.thumbnail_claimed_at)
+
+        # ...until it has used up its attempts
+        AttachmentBlob.objects.filter(pk=stale.pk).update(thumbnail_attempts=3)
+        self.assertEqual(claim_thumbnail_batch(), [])
+        stale.refresh_from_db()
+        self.assertEqual(stale.thumbnail_status, AttachmentBlob.THUMBNAIL_FAILED)
+
+    def test_upload_handler_sends_multipart_parts(self):
+        s3 = MagicMock()
+        s3.create_multipart_upload.return_value = {"UploadId": "u1"}
+        s3.upload_part.side_effect = lambda **kw: {"ETag": f"e{kw['PartNumber']}"}
+        handler = S3MultipartUploadHandler(None, lambda: s3, "prefix", {"files"})
+        with patch("job_applications.uploads.S3_PART_SIZE", 5):
+            with self.assertRaises(StopFutureHandlers):
+                handler.new_file("files", "a.pdf", "application/pdf", None)
+            for start in range(0, 12, 4):
+                self.assertIsNone(handler.receive_data_chunk(b"abcd", start))
+            uploaded = handler.file_complete(12)
+        handler.upload_complete()
+
+        self.assertEqual(uploaded.key, handler.keys[0])
+        self.assertEqual(
+            [c.kwargs["Body"] for c in s3.upload_part.call_args_list],
+            [b"abcdabcd", b"abcd"],
+        )
+        self.assertEqual(
+            s3.complete_multipart_upload.call_args.kwargs["MultipartUpload"],
+            {
+                "Parts": [
+                    {"ETag": "e1", "PartNumber": 1},
+                    {"ETag": "e2", "PartNumber": 2},
+                ]
+            },
+        )
+        # Fields it doesn't own pass through to the next handler
+        handler.new_file("other", "b.txt", "text/plain", None)
+        self.assertEqual(handler.receive_data_chunk(b"x", 0), b"x")
+        self.assertIsNone(handler.file_complete(1))
+
     def test_get_job_application_detail(self):
         response = self.client.get(self.detail_url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -95,3 +329,535 @@ class JobApplicationAPITestCase(APITestCase):
         response = self.client.delete(self.detail_url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertFalse(JobApplication.objects.filter(id=self.job.id).exists())
+
+    def test_status_change_records_transition(self):
+        self.job.date_applied = date.today() - timedelta(days=10)
+        self.job.save()
+        response = self.client.put(self.detail_url, {"status": "interview"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        transition = StatusTransition.objects.get(
+            job_application=self.job, to_status="interview"
+        )
+        self.assertEqual(transition.from_status, "applied")
+        self.assertTrue(transition.is_first_response)
+        self.assertEqual(transition.response_days, 10)
+
+        # Later moves are logged but don't count as the first response
+        self.client.put(self.detail_url, {"status": "offer"})
+        self.assertEqual(
+            StatusTransition.objects.filter(
+                job_application=self.job, is_first_response=True
+            ).count(),
+            1,
+        )
+
+    def test_save_with_update_fields_logs_only_saved_changes(self):
+        job = JobApplication.objects.get(pk=self.job.pk)
+        job.status = "interview"
+        job.salary = "$90k - $110k"
+        job.notes = "Recruiter call"
+        job.save(update_fields=["notes"])
+        job.refresh_from_db()
+        self.assertEqual(job.status, "applied")
+        self.assertIsNone(job.salary_min)
+        self.assertFalse(
+            StatusTransition.objects.filter(
+                job_application=job, to_status="interview"
+            ).exists()
+        )
+
+        job.status = "interview"
+        job.salary = "$90k - $110k"
+        job.save(update_fields=["status", "salary"])
+        job.refresh_from_db()
+        self.assertEqual((job.salary_min, job.salary_max), (90000, 110000))
+        transition = StatusTransition.objects.get(
+            job_application=job, to_status="interview"
+        )
+        self.assertEqual(transition.from_status, "applied")
+
+    def test_salary_parsed_on_save_and_range_filter(self):
+        self.job.salary = "$90k - $110k"
+        self.job.save()
+        self.assertEqual(
+            (self.job.salary_min, self.job.salary_max, self.job.salary_currency),
+            (90000, 110000, "USD"),
+        )
+        JobApplication.objects.create(
+            user=self.user,
+            company="Meta",
+            position="Developer",
+            status="applied",
+            salary="$150k",
+            date_applied=date.today(),
+        )
+        response = self.client.get(self.list_url, {"salaryMin": 120000})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([job["company"] for job in response.data["results"]], ["Meta"])
+        response = self.client.get(self.list_url, {"salaryMin": "lots"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_parse_salary_edge_cases(self):
+        cases = {
+            "$120k + RSU": (120000, 120000, "USD"),
+            "$100k OTE": (100000, 100000, "USD"),
+            "100k-120k EUR": (100000, 120000, "EUR"),
+            "€80.000": (80000, 80000, "EUR"),
+            "1.250.000 INR": (1250000, 1250000, "INR"),
+            "€1.5m": (1500000, 1500000, "EUR"),
+            "CA$90k": (90000, 90000, "CAD"),
+            "5000 monthly": (5000, 5000, ""),
+            "9" * 400: (None, None, ""),
+        }
+        for text, expected in cases.items():
+            with self.subTest(text=text[:20]):
+                parse_salary.cache_clear()
+                self.assertEqual(parse_salary(text), expected)
+
+        # Out of range amounts are dropped rather than failing the save
+        self.job.salary = "$99999999999"
+        self.job.save()
+        self.job.refresh_from_db()
+        self.assertEqual((self.job.salary_min, self.job.salary_max), (None, None))
+
+    def test_multi_value_filters(self):
+        JobApplication.objects.create(
+            user=self.user,
+            company="Meta",
+            position="Developer",
+            status="interview",
+            location="Remote",
+            date_applied=date.today() - timedelta(days=40),
+        )
+        response = self.client.get(
+            self.list_url, {"status": "applied,interview", "company": "Google,Meta"}
+        )
+        self.assertEqual(response.data["count"], 2)
+        response = self.client.get(
+            self.list_url,
+            {
+                "status": "applied,interview",
+                "dateTo": str(date.today() - timedelta(days=30)),
+            },
+        )
+        self.assertEqual([j["company"] for j in response.data["results"]], ["Meta"])
+        response = self.client.get(self.list_url, {"location": "Remote"})
+        self.assertEqual(response.data["count"], 1)
+        response = self.client.get(self.list_url, {"dateFrom": "yesterday"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_board_groups_by_status_with_cursors(self):
+        for i in range(3):
+            JobApplication.objects.create(
+                user=self.user,
+                company=f"Company {i}",
+                position="SWE",
+                status="interview",
+                date_applied=date.today() - timedelta(days=i),
+            )
+        board_url = reverse("job_application_board")
+        response = self.client.get(board_url, {"limit": 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        columns = {c["status"]: c for c in response.data["columns"]}
+        self.assertEqual(columns["applied"]["count"], 1)
+        self.assertIsNone(columns["applied"]["next_cursor"])
+        self.assertEqual(columns["offer"]["count"], 0)
+        interview = columns["interview"]
+        self.assertEqual(interview["count"], 3)
+        self.assertEqual(
+            [j["company"] for j in interview["results"]], ["Company 0", "Company 1"]
+        )
+
+        response = self.client.get(
+            board_url,
+            {"status": "interview", "cursor": interview["next_cursor"], "limit": 2},
+        )
+        self.assertEqual(
+            [j["company"] for j in response.data["results"]], ["Company 2"]
+        )
+        self.assertIsNone(response.data["next_cursor"])
+
+    def test_bulk_update_status_logs_transitions(self):
+        other = JobApplication.objects.create(
+            user=self.user,
+            company="Meta",
+            position="Developer",
+            status="saved",
+            date_applied=date.today(),
+        )
+        response = self.client.post(
+            reverse("job_application_bulk_update"),
+            {"ids": [self.job.id, other.id], "status": "interview"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["updated"], 2)
+        self.assertEqual(JobApplication.objects.filter(status="interview").count(), 2)
+        self.assertEqual(
+            StatusTransition.objects.filter(
+                to_status="interview", is_first_response=True
+            ).count(),
+            2,
+        )
+
+    def test_bulk_delete_batches_s3_deletes(self):
+        Attachment.objects.bulk_create(
+            [
+                Attachment(
+                    job_application=self.job,
+                    name=f"resume{i}.pdf",
+                    type="resume",
+                    file_url=f"job_applications/{self.user.id}/{i}.pdf",
+                )
+                for i in range(1500)
+            ]
+        )
+        response = self.client.post(
+            reverse("job_application_bulk_delete"),
+            {"ids": [self.job.id]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["deleted"], 1)
+        self.assertFalse(Attachment.objects.exists())
+        calls = self.mock_s3.return_value.delete_objects.call_args_list
+        self.assertEqual(
+            [len(c.kwargs["Delete"]["Objects"]) for c in calls], [1000, 500]
+        )
+
+    def test_sparse_fieldsets(self):
+        self.job.notes = "x" * 1000
+        self.job.save()
+        response = self.client.get(self.list_url)
+        job = response.data["results"][0]
+        self.assertNotIn("notes", job)
+        self.assertEqual(len(job["notes_preview"]), 200)
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.list_url, {"fields": "company,status"})
+        self.assertEqual(set(response.data["results"][0]), {"id", "company", "status"})
+        self.assertFalse(any('"notes"' in q["sql"] for q in ctx.captured_queries))
+
+        response = self.client.get(self.detail_url, {"fields": "notes"})
+        self.assertEqual(response.data, {"id": self.job.id, "notes": "x" * 1000})
+        response = self.client.get(self.detail_url)
+        self.assertIn("notes", response.data)
+        response = self.client.get(self.list_url, {"fields": "password"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_conditional_get_and_write_invalidation(self):
+        etag = self.client.get(self.list_url)["ETag"]
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        detail_etag = self.client.get(self.detail_url)["ETag"]
+        self.assertNotEqual(detail_etag, etag)
+
+        attachment = Attachment.objects.create(
+            job_application=self.job, name="cv.pdf", type="resume", file_url="cv"
+        )
+        other = JobApplication.objects.create(
+            user=self.user,
+            company="Meta",
+            position="Developer",
+            status="saved",
+            date_applied=date.today(),
+        )
+        writes = {
+            "create": lambda: self.client.post(
+                self.list_url,
+                {
+                    "company": "Amazon",
+                    "position": "SRE",
+                    "status": "applied",
+                    "date_applied": str(date.today()),
+                },
+                format="multipart",
+            ),
+            "update": lambda: self.client.put(
+                self.detail_url, {"notes": "call back"}, format="multipart"
+            ),
+            "bulk_update": lambda: self.client.post(
+                reverse("job_application_bulk_update"),
+                {"ids": [self.job.id], "status": "interview"},
+                format="json",
+            ),
+            "delete_attachment": lambda: self.client.delete(
+                reverse("delete_attachment", args=[self.job.id, attachment.id])
+            ),
+            "bulk_delete": lambda: self.client.post(
+                reverse("job_application_bulk_delete"),
+                {"ids": [other.id]},
+                format="json",
+            ),
+            "delete": lambda: self.client.delete(self.detail_url),
+        }
+        for name, write in writes.items():
+            with self.subTest(write=name):
+                with self.captureOnCommitCallbacks(execute=True):
+                    self.assertLess(write().status_code, 300)
+                response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                etag = response["ETag"]
+
+    def test_export_streams_filtered_csv_and_xlsx(self):
+        JobApplication.objects.create(
+            user=self.user,
+            company="Meta",
+            position="Developer",
+            status="offer",
+            date_applied=date.today(),
+            salary="$120k",
+        )
+        url = reverse("job_application_export", args=["csv"])
+        response = self.client.get(url, {"status": "offer"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rows = list(
+            csv.reader(io.StringIO(b"".join(response.streaming_content).decode()))
+        )
+        self.assertEqual(rows[0][:2], ["Company", "Position"])
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[1][0], "Meta")
+        self.assertEqual(rows[1][6], "120000")
+
+        response = self.client.get(reverse("job_application_export", args=["xlsx"]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(b"".join(response.streaming_content).startswith(b"PK"))
+        response = self.client.get(reverse("job_application_export", args=["pdf"]))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_export_writes_formula_like_values_as_text(self):
+        JobApplication.objects.create(
+            user=self.user,
+            company="Meta",
+            position="Developer",
+            status="offer",
+            date_applied=date.today(),
+            notes='=HYPERLINK("http://evil.example","click")',
+        )
+        url = reverse("job_application_export", args=["csv"])
+        response = self.client.get(url, {"status": "offer"})
+        rows = list(
+            csv.reader(io.StringIO(b"".join(response.streaming_content).decode()))
+        )
+        self.assertEqual(rows[1][-1], '\'=HYPERLINK("http://evil.example","click")')
+
+        response = self.client.get(reverse("job_application_export", args=["xlsx"]))
+        with zipfile.ZipFile(io.BytesIO(b"".join(response.streaming_content))) as xlsx:
+            sheet = xlsx.read("xl/worksheets/sheet1.xml")
+        # A text cell, not a formula, and no hyperlink either
+        self.assertIn(
+            b'>=HYPERLINK("http://evil.example","click")<',
+            sheet.replace(b"&quot;", b'"'),
+        )
+        self.assertNotIn(b"<f>", sheet)
+        self.assertNotIn(b"<hyperlink", sheet)
+
+    def test_import_csv_creates_valid_rows_and_reports_bad_ones(self):
+        upload = SimpleUploadedFile(
+            "jobs.csv",
+            b"Company,Position,Status,Date Applied,Salary,contact_email,Ignored\n"
+            b"Meta,Developer,Interview,2024-03-01,$100k - $120k,a@meta.com,x\n"
+            b"Apple,Designer,applied,not-a-date,,not-an-email,x\n"
+            b"Netflix,SRE,offer,2024-03-02,,,x\n",
+            content_type="text/csv",
+        )
+        url = reverse("job_application_import")
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url, {"file": upload}, format="multipart")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["created"], 2)
+        self.assertEqual(response.data["failed"], 1)
+        self.assertEqual(response.data["errors"][0]["row"], 2)
+        self.assertEqual(
+            set(response.data["errors"][0]["errors"]), {"date_applied", "contact_email"}
+        )
+
+        meta = JobApplication.objects.get(user=self.user, company="Meta")
+        self.assertEqual(meta.status, "interview")
+        self.assertEqual((meta.salary_min, meta.salary_max), (100000, 120000))
+        transition = meta.status_transitions.get()
+        self.assertTrue(transition.is_first_response)
+        self.assertIsNone(transition.response_days)
+
+        upload = SimpleUploadedFile("jobs.txt", b"Company\nMeta\n")
+        response = self.client.post(url, {"file": upload}, format="multipart")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        upload = SimpleUploadedFile("jobs.csv", b"Foo,Bar\n1,2\n")
+        response = self.client.post(url, {"file": upload}, format="multipart")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_large_import_is_queued_for_the_worker(self):
+        content = (
+            b'[{"company": "Meta", "position": "Dev", "status": "saved",'
+            b' "date_applied": "2024-03-01"}, {"company": "Apple"}, 3]'
+        )
+        url = reverse("job_application_import")
+        with patch("job_applications.views.INLINE_IMPORT_MAX_BYTES", 10):
+            response = self.client.post(
+                url,
+                {"file": SimpleUploadedFile("jobs.json", content)},
+                format="multipart",
+            )
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data["status"], ImportJob.PENDING)
+        self.mock_s3.return_value.upload_fileobj.assert_called_once()
+
+        s3 = MagicMock()
+        s3.download_fileobj.side_effect = lambda bucket, key, f: f.write(content)
+        job = claim_import_job()
+        self.assertEqual(job.status, ImportJob.RUNNING)
+        self.assertIsNotNone(job.heartbeat_at)
+        self.assertIsNone(claim_import_job())
+        run_import_job(job, s3)
+        s3.delete_object.assert_called_once()
+
+        detail = self.client.get(reverse("import_job_detail", args=[job.id]))
+        self.assertEqual(detail.data["status"], ImportJob.DONE)
+        self.assertEqual(detail.data["created_count"], 1)
+        self.assertEqual(detail.data["failed_count"], 2)
+        self.assertEqual([e["row"] for e in detail.data["errors"]], [2, 3])
+        self.assertTrue(
+            JobApplication.objects.filter(user=self.user, company="Meta").exists()
+        )
+
+    def test_stale_running_import_is_failed(self):
+        stale, live = [
+            ImportJob.objects.create(
+                user=self.user,
+                target="job_applications",
+                file_name="jobs.csv",
+                file_key=f"imports/{name}.csv",
+                file_format="csv",
+                status=ImportJob.RUNNING,
+                heartbeat_at=timezone.now() - age,
+            )
+            for name, age in (("stale", timedelta(hours=1)), ("live", timedelta()))
+        ]
+        s3 = MagicMock()
+        self.assertEqual(fail_stale_import_jobs(s3), [stale])
+        s3.delete_object.assert_called_once_with(Bucket=ANY, Key="imports/stale.csv")
+        stale.refresh_from_db()
+        live.refresh_from_db()
+        self.assertEqual(stale.status, ImportJob.FAILED)
+        self.assertTrue(stale.error)
+        self.assertEqual(live.status, ImportJob.RUNNING)
+
+    def test_import_json_array_after_long_leading_whitespace(self):
+        # More whitespace than one read, so the "[" isn't in the first chunk
+        content = b" " * (70 * 1024) + (
+            b'[{"company": "Meta", "position": "Dev", "status": "saved",'
+            b' "date_applied": "2024-03-01"}]'
+        )
+        url = reverse("job_application_import")
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                url,
+                {"file": SimpleUploadedFile("jobs.json", content)},
+                format="multipart",
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data["created"], response.data["failed"]), (1, 0))
+
+        upload = SimpleUploadedFile("jobs.json", b" " * (70 * 1024) + b"[{")
+        response = self.client.post(url, {"file": upload}, format="multipart")
+        self.assertEqual(response.data["error"], "Malformed JSON")
+
+
+def plan_nodes(node):
+    """Every node of an EXPLAIN (FORMAT JSON) plan tree."""
+    yield node
+    for child in node.get("Plans", ()):
+        yield from plan_nodes(child)
+
+
+class JobApplicationQueryPlanTestCase(APITestCase):
+    """
+    EXPLAIN the planned list queries on a seeded dataset and check Postgres
+    walks the index the planner expects, with no Sort. Sequential scans are
+    switched off for the EXPLAIN so the outcome doesn't hinge on the sampled
+    statistics.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        rng = random.Random(0)
+        statuses = ["saved", "applied", "interview", "offer", "rejected"]
+        companies = ["Google", "Meta", "Apple", "Stripe", "Zoom", "Uber"]
+        users = [
+            User.objects.create_user(email=f"user{i}@example.com", password="x")
+            for i in range(5)
+        ]
+        cls.user = users[0]
+        JobApplication.objects.bulk_create(
+            [
+                JobApplication(
+                    user=user,
+                    company=rng.choice(companies),
+                    position="SWE",
+                    status=rng.choice(statuses),
+                    date_applied=date.today() - timedelta(days=rng.randint(0, 720)),
+                )
+                for user in users
+                for _ in range(4000)
+            ],
+            batch_size=5000,
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE job_applications_jobapplication")
+
+    def plan(self, query_string):
+        return plan_list_queryset(
+            JobApplication.objects.filter(user=self.user),
+            parse_list_filters(QueryDict(query_string)),
+            ("-date_applied", "-id"),
+        )
+
+    def assertUsesExpectedIndex(self, query_string):
+        plan = self.plan(query_string)
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            explain = json.loads(plan.queryset[:18].explain(format="json"))
+        nodes = list(plan_nodes(explain[0]["Plan"]))
+        self.assertEqual(
+            {node["Index Name"] for node in nodes if "Index Name" in node},
+            {plan.expected_index.name},
+        )
+        self.assertNotIn("Sort", {node["Node Type"] for node in nodes})
+        return plan.expected_index
+
+    def test_status_uses_status_index(self):
+        index = self.assertUsesExpectedIndex("status=offer")
+        self.assertEqual(index.fields, ["user", "status", "-date_applied", "-id"])
+
+    def test_status_and_company_uses_compound_index(self):
+        index = self.assertUsesExpectedIndex("status=offer&company=Zoom")
+        self.assertEqual(
+            index.fields, ["user", "status", "company", "-date_applied", "-id"]
+        )
+
+    def test_company_uses_company_index(self):
+        index = self.assertUsesExpectedIndex("company=Zoom")
+        self.assertEqual(index.fields, ["user", "company", "-date_applied", "-id"])
+
+    def test_multi_status_date_range_walks_date_index(self):
+        index = self.assertUsesExpectedIndex(
+            f"status=applied,interview&dateFrom={date.today() - timedelta(days=90)}"
+        )
+        self.assertEqual(index.fields, ["user", "-date_applied", "-id"])
+
+    def test_pinned_columns_are_equality_predicates(self):
+        where = self.plan("status=offer&company=Zoom").queryset.query.where
+        lookups = {(c.lhs.target.name, c.lookup_name) for c in where.children}
+        self.assertEqual(
+            lookups, {("user", "exact"), ("status", "exact"), ("company", "exact")}
+        )
+
+    def test_list_cache_key_ignores_value_order(self):
+        self.assertEqual(
+            generate_cache_key(self.user.id, {"status": "applied,interview"}),
+            generate_cache_key(self.user.id, {"status": "interview, applied"}),
+        )
+        self.assertNotEqual(
+            generate_cache_key(self.user.id, {"status": "applied,interview"}),
+            generate_cache_key(self.user.id, {"status": "applied"}),
+        )
@@ -0,0 +1,200 @@
+# job_applications/thumbnails.py
+
+import io
+import logging
+import textwrap
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from PIL import Image, ImageDraw, ImageFont, ImageOps
+from PyPDF2 import PdfReader
+
+from sync.events import publish_change
+from .models import Attachment, AttachmentBlob
+from .views import delete_s3_keys, get_s3_client, invalidate_user_caches
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_WIDTH = 300
+THUMBNAIL_MAX_HEIGHT = 600
+THUMBNAIL_SUFFIX = ".thumb.jpg"  # stored next to the original
+THUMBNAIL_BATCH_SIZE = 32  # blobs claimed from the queue at a time
+MAX_THUMBNAIL_SOURCE_BYTES = 25 * 1024 * 1024  # larger files aren't previewed
+# A blob still running this long after it was claimed belongs to a worker
+# that died, and is claimed again; after this many claims it is given up on
+THUMBNAIL_LEASE = timedelta(minutes=10)
+MAX_THUMBNAIL_ATTEMPTS = 3
+
+# Text-only PDF pages are laid out on a page this wide (points at 72 dpi,
+# i.e. US Letter) before being scaled down
+PREVIEW_PAGE_WIDTH = 612
+PREVIEW_MARGIN = 48
+PREVIEW_FONT_SIZE = 10
+PREVIEW_LINE_HEIGHT = 13
+PREVIEW_WRAP = 95  # characters per line
+
+_s3 = None  # per worker process
+
+
+def _pdf_first_page(data):
+    """
+    An image of a PDF's first page. Without a PDF rasteriser this is the
+    page's text laid out on a blank page of the same proportions, or for a
+    scanned page with no text, its largest embedded image.
+    """
+    page = PdfReader(io.BytesIO(data)).pages[0]
+    text = page.extract_text() or ""
+    if not text.strip():
+        images = sorted(page.images, key=lambda image: len(image.data))
+        return Image.open(io.BytesIO(images[-1].data)) if images else None
+    width, height = float(page.mediabox.width), float(page.mediabox.height)
+    canvas = Image.new(
+        "RGB",
+        (PREVIEW_PAGE_WIDTH, round(PREVIEW_PAGE_WIDTH * height / width)),
+        "white",
+    )
+    draw = ImageDraw.Draw(canvas)
+    font = ImageFont.load_default(size=PREVIEW_FONT_SIZE)
+    y = PREVIEW_MARGIN
+    for line in text.splitlines():
+        for wrapped in textwrap.wrap(line, PREVIEW_WRAP) or [""]:
+            if y > canvas.height - PREVIEW_MARGIN:
+                return canvas
+            draw.text((PREVIEW_MARGIN, y), wrapped, fill="black", font=font)
+            y += PREVIEW_LINE_HEIGHT
+    return canvas
+
+
+def render_thumbnail(data):
+    """
+    JPEG thumbnail of a file's first page (PDFs) or of the image itself, or
+    None for a format that can't be previewed.
+    """
+    if data.startswith(b"%PDF"):
+        image = _pdf_first_page(data)
+        if image is None:
+            return None
+    else:
+        try:
+            image = Image.open(io.BytesIO(data))
+        except Exception:
+            return None
+        # Let JPEGs decode at a reduced scale that still covers the thumbnail
+        image.draft("RGB", (THUMBNAIL_WIDTH * 2, THUMBNAIL_WIDTH * 2))
+        image = ImageOps.exif_transpose(image)
+    image = image.convert("RGB")
+    image.thumbnail((THUMBNAIL_WIDTH, THUMBNAIL_MAX_HEIGHT))
+    output = io.BytesIO()
+    image.save(output, "JPEG", quality=80, optimize=True)
+    return output.getvalue()
+
+
+def _render_blob(blob_id, file_key):
+    """
+    Download, render and store one thumbnail; runs in a pool process.
+    Returns (blob_id, status, thumbnail key).
+    """
+    global _s3
+    if _s3 is None:
+        _s3 = get_s3_client()
+    bucket = settings.AWS_STORAGE_BUCKET_NAME
+    thumbnail_key = f"{file_key}{THUMBNAIL_SUFFIX}"
+    try:
+        data = _s3.get_object(Bucket=bucket, Key=file_key)["Body"].read()
+        thumbnail = render_thumbnail(data)
+        if thumbnail is None:
+            return blob_id, AttachmentBlob.THUMBNAIL_UNSUPPORTED, ""
+        _s3.put_object(
+            Bucket=bucket, Key=thumbnail_key, Body=thumbnail, ContentType="image/jpeg"
+        )
+    except Exception as e:
+        logger.error("Error rendering thumbnail for %s: %s", file_key, str(e))
+        return blob_id, AttachmentBlob.THUMBNAIL_FAILED, ""
+    return blob_id, AttachmentBlob.THUMBNAIL_DONE, thumbnail_key
+
+
+def claim_thumbnail_batch():
+    """
+    Mark up to THUMBNAIL_BATCH_SIZE pending blobs, or blobs whose claim has
+    outlived THUMBNAIL_LEASE, running and return them. Files too large to
+    preview are marked unsupported on the way, and blobs already claimed
+    MAX_THUMBNAIL_ATTEMPTS times failed.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        blobs = list(
+            AttachmentBlob.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(thumbnail_status=AttachmentBlob.THUMBNAIL_PENDING)
+                | Q(
+                    thumbnail_status=AttachmentBlob.THUMBNAIL_RUNNING,
+                    thumbnail_claimed_at__lt=now - THUMBNAIL_LEASE,
+                )
+            )
+            .order_by("id")[:THUMBNAIL_BATCH_SIZE]
+        )
+        too_large = [b.id for b in blobs if b.size > MAX_THUMBNAIL_SOURCE_BYTES]
+        AttachmentBlob.objects.filter(id__in=too_large).update(
+            thumbnail_status=AttachmentBlob.THUMBNAIL_UNSUPPORTED
+        )
+        exhausted = [
+            b.id for b in blobs if b.thumbnail_attempts >= MAX_THUMBNAIL_ATTEMPTS
+        ]
+        AttachmentBlob.objects.filter(id__in=exhausted).update(
+            thumbnail_status=AttachmentBlob.THUMBNAIL_FAILED
+        )
+        blobs = [b for b in blobs if b.id not in too_large and b.id not in exhausted]
+        AttachmentBlob.objects.filter(id__in=[b.id for b in blobs]).update(
+            thumbnail_status=AttachmentBlob.THUMBNAIL_RUNNING,
+            thumbnail_claimed_at=now,
+            thumbnail_attempts=F("thumbnail_attempts") + 1,
+        )
+    return blobs
+
+
+def render_thumbnails(pool, blobs):
+    """
+    Render the claimed blobs' thumbnails on `pool` (a ProcessPoolExecutor)
+    and record the results. Attachments that gained a thumbnail are touched
+    so delta sync picks them up, and their owners' caches and open event
+    streams are told. Returns the number rendered. If the pool breaks part
+    way, the blobs without a result are put back in the queue.
+    """
+    users = {blob.id: blob.user_id for blob in blobs}
+    unfinished = set(users)
+    rendered, orphaned = defaultdict(list), []
+    try:
+        results = pool.map(
+            _render_blob, [b.id for b in blobs], [b.file_key for b in blobs]
+        )
+        for blob_id, thumbnail_status, thumbnail_key in results:
+            updated = AttachmentBlob.objects.filter(pk=blob_id).update(
+                thumbnail_status=thumbnail_status, thumbnail_key=thumbnail_key
+            )
+            unfinished.discard(blob_id)
+            if not updated and thumbnail_key:
+                # The blob was released while rendering
+                orphaned.append(thumbnail_key)
+            elif thumbnail_key:
+                rendered[users[blob_id]].append(blob_id)
+    finally:
+        AttachmentBlob.objects.filter(
+            id__in=unfinished, thumbnail_status=AttachmentBlob.THUMBNAIL_RUNNING
+        ).update(
+            thumbnail_status=AttachmentBlob.THUMBNAIL_PENDING,
+            thumbnail_claimed_at=None,
+        )
+    if orphaned:
+        delete_s3_keys(get_s3_client(), orphaned)
+    for user_id, blob_ids in rendered.items():
+        with transaction.atomic():
+            attachments = Attachment.objects.filter(blob_id__in=blob_ids)
+            ids = list(attachments.values_list("id", flat=True))
+            attachments.update(updated_at=timezone.now())
+            invalidate_user_caches(user_id)
+            publish_change(user_id, "attachment", "updated", ids)
+    return sum(len(blob_ids) for blob_ids in rendered.values())
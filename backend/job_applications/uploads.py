@@ -0,0 +1,217 @@
+# job_applications/uploads.py
+
+import hashlib
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, StopFutureHandlers
+
+# S3 parts must be at least 5 MB, except the last; 10,000 parts at most
+S3_PART_SIZE = 8 * 1024 * 1024
+
+
+def file_sha256(file):
+    """
+    Hex SHA-256 of an uploaded file's contents, read in chunks.
+    """
+    digest = hashlib.sha256()
+    for chunk in file.chunks():
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+class S3UploadedFile(UploadedFile):
+    """
+    A file S3MultipartUploadHandler has already stored in S3 under `key`.
+    Only the metadata and `sha256` stay on the server; the contents can't be
+    read back. When the upload was skipped because the user already has the
+    same bytes stored, `key` is None and the small file's `content` is kept
+    instead, in case that copy is deleted before the view references it.
+    """
+
+    def __init__(
+        self,
+        key,
+        name,
+        content_type,
+        size,
+        charset,
+        content_type_extra,
+        sha256,
+        content=None,
+    ):
+        super().__init__(None, name, content_type, size, charset, content_type_extra)
+        self.key = key
+        self.sha256 = sha256
+        self.content = content
+
+    def close(self):
+        # Called on every upload when the request ends; there's nothing open
+        pass
+
+
+class S3MultipartUploadHandler(FileUploadHandler):
+    """
+    Upload handler that writes the files of `field_names` straight to S3 as
+    the request body arrives, instead of spooling them to memory or a temp
+    file for the view to upload again. Each file goes up as a multipart
+    upload in S3_PART_SIZE parts, one part uploading in the background while
+    the next is received, so a request holds at most two parts in memory and
+    nothing on disk. A file smaller than one part is sent with put_object.
+    Other fields fall through to the next handlers.
+
+    Files are hashed as they stream. A file smaller than one part whose
+    SHA-256 `is_stored(digest)` reports as already stored isn't uploaded at
+    all; larger ones are committed to S3 before their hash is known.
+
+    Files come back as S3UploadedFile objects keyed under `key_prefix`. If
+    the request fails, call discard() to abort unfinished uploads; it
+    returns the keys already written so the caller can delete them.
+    """
+
+    def __init__(self, request, s3_factory, key_prefix, field_names, is_stored=None):
+        super().__init__(request)
+        self.s3_factory = s3_factory
+        self.key_prefix = key_prefix
+        self.field_names = field_names
+        self.is_stored = is_stored
+        self.keys = []
+        self.active = False
+        self._s3 = None
+        self._executor = None
+        self._upload_id = None
+        self._pending = None
+
+    @property
+    def s3(self):
+        if self._s3 is None:
+            self._s3 = self.s3_factory()
+        return self._s3
+
+    def new_file(self, field_name, file_name, *args, **kwargs):
+        super().new_file(field_name, file_name, *args, **kwargs)
+        self.active = field_name in self.field_names
+        if not self.active:
+            return
+        self.key = f"{self.key_prefix}/{uuid.uuid4().hex}_{self.file_name}"
+        self._buffer = bytearray()
+        self._hash = hashlib.sha256()
+        self._parts = []
+        self._upload_id = None
+        # The file is ours; later handlers needn't open temp files for it
+        raise StopFutureHandlers()
+
+    def receive_data_chunk(self, raw_data, start):
+        if not self.active:
+            return raw_data
+        self._buffer += raw_data
+        self._hash.update(raw_data)
+        if len(self._buffer) >= S3_PART_SIZE:
+            self._send_part()
+        return None
+
+    def file_complete(self, file_size):
+        if not self.active:
+            return None
+        self.active = False
+        bucket = settings.AWS_STORAGE_BUCKET_NAME
+        sha256 = self._hash.hexdigest()
+        if self._upload_id is None and self.is_stored and self.is_stored(sha256):
+            content, self._buffer = bytes(self._buffer), bytearray()
+            return S3UploadedFile(
+                None,
+                self.file_name,
+                self.content_type,
+                file_size,
+                self.charset,
+                self.content_type_extra,
+                sha256,
+                content,
+            )
+        if self._upload_id is None:
+            self.s3.put_object(
+                Bucket=bucket,
+                Key=self.key,
+                Body=self._buffer,
+                ContentType=self.content_type,
+            )
+        else:
+            if self._buffer:
+                self._send_part()
+            self._wait_for_part()
+            self.s3.complete_multipart_upload(
+                Bucket=bucket,
+                Key=self.key,
+                UploadId=self._upload_id,
+                MultipartUpload={"Parts": self._parts},
+            )
+            self._upload_id = None
+        self._buffer = bytearray()
+        self.keys.append(self.key)
+        return S3UploadedFile(
+            self.key,
+            self.file_name,
+            self.content_type,
+            file_size,
+            self.charset,
+            self.content_type_extra,
+            sha256,
+        )
+
+    def upload_complete(self):
+        self._shutdown()
+
+    def discard(self):
+        """
+        Abort an unfinished upload and return the keys already stored.
+        """
+        if self._upload_id is not None:
+            try:
+                self._wait_for_part()
+            except Exception:
+                pass
+            self.s3.abort_multipart_upload(
+                Bucket=settings.AWS_STORAGE_BUCKET_NAME,
+                Key=self.key,
+                UploadId=self._upload_id,
+            )
+            self._upload_id = None
+        self._shutdown()
+        return self.keys
+
+    def _send_part(self):
+        if self._upload_id is None:
+            self._upload_id = self.s3.create_multipart_upload(
+                Bucket=settings.AWS_STORAGE_BUCKET_NAME,
+                Key=self.key,
+                ContentType=self.content_type,
+            )["UploadId"]
+            self._executor = self._executor or ThreadPoolExecutor(max_workers=1)
+        # One part in flight: wait for it before handing over the next
+        self._wait_for_part()
+        part_number = len(self._parts) + 1
+        future = self._executor.submit(
+            self.s3.upload_part,
+            Bucket=settings.AWS_STORAGE_BUCKET_NAME,
+            Key=self.key,
+            UploadId=self._upload_id,
+            PartNumber=part_number,
+            Body=self._buffer,
+        )
+        self._pending = (part_number, future)
+        self._buffer = bytearray()
+
+    def _wait_for_part(self):
+        if self._pending is not None:
+            part_number, future = self._pending
+            self._pending = None
+            etag = future.result()["ETag"]
+            self._parts.append({"ETag": etag, "PartNumber": part_number})
+
+    def _shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
@@ -2,7 +2,14 @@ from django.urls import path
 from .views import (
     JobApplicationListCreateView,
     JobApplicationDetailView,
+    JobApplicationBoardView,
+    JobApplicationBulkUpdateView,
+    JobApplicationBulkDeleteView,
+    JobApplicationExportView,
+    JobApplicationImportView,
+    ImportJobDetailView,
     DeleteAttachmentView,
+    AttachmentDownloadURLsView,
 )
 
 urlpatterns = [
@@ -10,6 +17,36 @@ urlpatterns = [
     path(
         "", JobApplicationListCreateView.as_view(), name="job_application_list_create"
     ),
+    # Kanban board: first page of every status column plus per-status counts.
+    path("board/", JobApplicationBoardView.as_view(), name="job_application_board"),
+    # Set the status of many job applications at once.
+    path(
+        "bulk-update/",
+        JobApplicationBulkUpdateView.as_view(),
+        name="job_application_bulk_update",
+    ),
+    # Delete many job applications (and their attachments) at once.
+    path(
+        "bulk-delete/",
+        JobApplicationBulkDeleteView.as_view(),
+        name="job_application_bulk_delete",
+    ),
+    # Download the (filtered) job applications as a CSV or XLSX file.
+    path(
+        "export/<str:file_format>/",
+        JobApplicationExportView.as_view(),
+        name="job_application_export",
+    ),
+    # Signed download URLs for the attachments of many job applications.
+    path(
+        "attachment-urls/",
+        AttachmentDownloadURLsView.as_view(),
+        name="attachment_download_urls",
+    ),
+    # Create job applications in bulk from an uploaded CSV or JSON file.
+    path("import/", JobApplicationImportView.as_view(), name="job_application_import"),
+    # Progress and row report of an import queued for the background worker.
+    path("imports/<int:pk>/", ImportJobDetailView.as_view(), name="import_job_detail"),
     # Retrieve, update, or delete a single job application by its primary key.
     path(
         "<int:pk>/", JobApplicationDetailView.as_view(), name="job_application_detail"
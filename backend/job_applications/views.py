@@ -1,19 +1,63 @@
+import base64
 import logging
 import uuid
 import boto3
 import time
 import hashlib
+from datetime import date, datetime, time as day_time
 from functools import wraps
 
-from django.db.models import Q
+from django.db import transaction
+from django.db.models import Count, F, Prefetch, Q, Value, Window
+from django.utils import timezone
+from django.db.models.functions import Left, NullIf, RowNumber
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.permissions import IsAuthenticated
 from django.conf import settings
-from .models import JobApplication, Attachment
-from .serializers import JobApplicationSerializer
+from sync.etag import JOBS, bump_data_version, conditional_get
+from sync.events import publish_change
+from sync.models import Tombstone
+from .models import (
+    JobApplication,
+    Attachment,
+    AttachmentBlob,
+    StatusTransition,
+    ImportJob,
+)
+from .serializers import (
+    NOTES_PREVIEW_LENGTH,
+    JobApplicationSerializer,
+    BulkJobApplicationIdsSerializer,
+    BulkStatusUpdateSerializer,
+    ImportJobSerializer,
+)
+from .salary import parse_salary
+from .downloads import download_url_window, signed_download_urls
+from .uploads import S3MultipartUploadHandler, S3UploadedFile, file_sha256
+from .query_planner import (
+    parse_list_filters,
+    plan_list_queryset,
+    split_list_param,
+)
+from .exports import (
+    EXPORT_CHUNK_SIZE,
+    EXPORT_FORMATS,
+    JOB_EXPORT_COLUMNS,
+    export_response,
+)
+from .imports import (
+    IMPORT_EXTENSIONS,
+    INLINE_IMPORT_MAX_BYTES,
+    ImportSpec,
+    copy_insert,
+    get_import_spec,
+    import_format,
+    import_rows,
+    read_rows,
+)
 from django.core.cache import cache
 from rest_framework.pagination import PageNumberPagination
 
@@ -22,6 +66,47 @@ logger = logging.getLogger(__name__)
 LIST_CACHE_TIMEOUT = 60 * 15  # 15 minutes
 DETAIL_CACHE_TIMEOUT = 60 * 30  # 30 minutes
 CACHE_VERSION = 1  # Bump this to invalidate old caches when models change
+# Query params that change the list response and so must be part of its key
+LIST_CACHE_PARAMS = (
+    "status",
+    "search",
+    "sortOrder",
+    "page",
+    "salaryMin",
+    "salaryMax",
+    "company",
+    "location",
+    "dateFrom",
+    "dateTo",
+    "fields",
+)
+# Comma-separated list params, whose values are keyed in sorted order
+LIST_MULTI_VALUE_PARAMS = ("status", "company", "location")
+# Compact default for list responses: what the job cards render, with the
+# unbounded notes column replaced by a preview cut in SQL
+LIST_DEFAULT_FIELDS = (
+    "id",
+    "company",
+    "position",
+    "location",
+    "status",
+    "date_applied",
+    "salary",
+    "contact_person",
+    "contact_email",
+    "url",
+    "notes_preview",
+    "attachments",
+)
+JOB_COLUMNS = {f.name for f in JobApplication._meta.concrete_fields}
+SELECTABLE_FIELDS = JOB_COLUMNS | {"attachments", "notes_preview"}
+
+
+# Kanban columns, in board order
+BOARD_STATUSES = ["saved", "applied", "interview", "offer", "rejected"]
+BOARD_PAGE_SIZE = 10
+MAX_BOARD_PAGE_SIZE = 50
+S3_DELETE_BATCH_SIZE = 1000  # delete_objects accepts at most 1,000 keys
 
 
 class JobApplicationPageNumberPagination(PageNumberPagination):
@@ -34,16 +119,21 @@ def generate_cache_key(user_id, query_params=None, detail_id=None):
     and optionally a detail ID. Now includes sortOrder.
     """
     if detail_id:
-        return f"jad:{user_id}:{detail_id}:v{CACHE_VERSION}"
+        detail_key = f"jad:{user_id}:{detail_id}:v{CACHE_VERSION}"
+        if query_params and query_params.get("fields"):
+            fields_hash = hashlib.md5(query_params["fields"].encode()).hexdigest()
+            return f"{detail_key}:{fields_hash[:10]}"
+        return detail_key
 
     base_key = f"jal:{user_id}:v{CACHE_VERSION}"
     if query_params:
         # Only include specified keys for caching
         filtered = {
-            k: v
-            for k, v in query_params.items()
-            if k in ("status", "search", "sortOrder", "page") and v
+            k: v for k, v in query_params.items() if k in LIST_CACHE_PARAMS and v
         }
+        for k in LIST_MULTI_VALUE_PARAMS:
+            if k in filtered:
+                filtered[k] = ",".join(split_list_param(filtered[k]))
         if filtered:
             param_str = "&".join(f"{k}={v}" for k, v in sorted(filtered.items()))
             param_hash = hashlib.md5(param_str.encode()).hexdigest()[:10]
@@ -55,6 +145,7 @@ def invalidate_user_caches(user_id):
     """
     Invalidate all cache entries for the given user.
     """
+    bump_data_version(user_id, JOBS)
     try:
         cache.delete_pattern(f"jal:{user_id}:*")
         cache.delete_pattern(f"jad:{user_id}:*")
@@ -77,16 +168,15 @@ def cached_response(timeout):
                 return view_func(self, request, *args, **kwargs)
             if "pk" in kwargs:
                 # Detail view caching
-                cache_key = generate_cache_key(request.user.id, detail_id=kwargs["pk"])
+                cache_key = generate_cache_key(
+                    request.user.id,
+                    {"fields": request.query_params.get("fields", "")},
+                    detail_id=kwargs["pk"],
+                )
                 current_timeout = DETAIL_CACHE_TIMEOUT
             else:
                 # Use "page" parameter for list view pagination caching
-                params = {
-                    "status": request.query_params.get("status", ""),
-                    "search": request.query_params.get("search", ""),
-                    "page": request.query_params.get("page", ""),
-                    "sortOrder": request.query_params.get("sortOrder", ""),
-                }
+                params = {k: request.query_params.get(k, "") for k in LIST_CACHE_PARAMS}
                 cache_key = generate_cache_key(request.user.id, params)
                 current_timeout = timeout
             cached_data = cache.get(cache_key)
@@ -103,6 +193,117 @@ def cached_response(timeout):
     return decorator
 
 
+def parse_fields_param(value, default):
+    """
+    Resolve ?fields=a,b into a tuple of serializer field names. "all" means
+    every field (returned as None); unknown names raise ValueError.
+    """
+    if not value:
+        return default
+    if value == "all":
+        return None
+    names = tuple(dict.fromkeys(n.strip() for n in value.split(",") if n.strip()))
+    unknown = set(names) - SELECTABLE_FIELDS
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return names if "id" in names else ("id",) + names
+
+
+def select_job_fields(queryset, fields, also_load=()):
+    """
+    Read only what `fields` needs: .only() on the selected columns (plus
+    `also_load`, columns the view itself reads), a Left() annotation for
+    notes_preview, and the attachments prefetch only when attachments are
+    requested. fields=None loads everything.
+    """
+    attachments = Prefetch(
+        "attachments", queryset=Attachment.objects.select_related("blob")
+    )
+    if fields is None:
+        return queryset.prefetch_related(attachments)
+    queryset = queryset.only(*(f for f in fields if f in JOB_COLUMNS), *also_load)
+    if "notes_preview" in fields:
+        queryset = queryset.annotate(notes_preview=Left("notes", NOTES_PREVIEW_LENGTH))
+    if "attachments" in fields:
+        queryset = queryset.prefetch_related(attachments)
+    return queryset
+
+
+def wants_download_urls(request):
+    return request.query_params.get("downloadUrls") in ("true", "1")
+
+
+def download_url_vary(request):
+    # Embedded signatures are renewed every window, so the ETag must be too
+    return [str(download_url_window())] if wants_download_urls(request) else []
+
+
+def add_download_urls(attachments):
+    """
+    Set download_url and expires_at on serialized attachments (dicts with
+    file_url, name and thumbnail), plus thumbnail_url for those with a
+    thumbnail, signing them all in one batch.
+    """
+    files = [(att["file_url"], att["name"]) for att in attachments]
+    thumbnails = [att for att in attachments if att["thumbnail"]]
+    files += [(att["thumbnail"], f"{att['name']}.jpg") for att in thumbnails]
+    urls = signed_download_urls(get_s3_client, files)
+    for att, (url, expires_at) in zip(attachments, urls):
+        att["download_url"] = url
+        att["expires_at"] = expires_at
+    for att, (url, _) in zip(thumbnails, urls[len(attachments) :]):
+        att["thumbnail_url"] = url
+
+
+def with_download_urls(view_func):
+    """
+    Decorator for list GETs: with ?downloadUrls=true, add signed download
+    URLs to every attachment in the page. Apply it outside cached_response
+    so cached pages never hold signatures past their window.
+    """
+
+    @wraps(view_func)
+    def wrapper(self, request, *args, **kwargs):
+        response = view_func(self, request, *args, **kwargs)
+        if response.status_code == 200 and wants_download_urls(request):
+            add_download_urls(
+                [
+                    att
+                    for job in response.data["results"]
+                    for att in job.get("attachments", ())
+                ]
+            )
+        return response
+
+    return wrapper
+
+
+def card_data(job_app):
+    """
+    Serialize a saved job the way list pages render it, for change events.
+    """
+    job_app.notes_preview = (job_app.notes or "")[:NOTES_PREVIEW_LENGTH]
+    return JobApplicationSerializer(job_app, fields=LIST_DEFAULT_FIELDS).data
+
+
+def encode_board_cursor(job_app):
+    """
+    Opaque keyset cursor pointing just after job_app in (-date_applied, -id) order.
+    """
+    raw = f"{job_app.date_applied.isoformat()}|{job_app.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_board_cursor(cursor):
+    """
+    Inverse of encode_board_cursor; raises ValueError on a malformed cursor
+    (binascii.Error and UnicodeDecodeError are both ValueErrors).
+    """
+    raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+    date_str, job_id = raw.split("|")
+    return date.fromisoformat(date_str), int(job_id)
+
+
 def get_s3_client():
     """
     Helper to instantiate and return an S3 client.
@@ -112,32 +313,228 @@ def get_s3_client():
         aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
         aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
         region_name=settings.AWS_S3_REGION_NAME,
+        endpoint_url=settings.AWS_S3_ENDPOINT_URL,
     )
 
 
-class JobApplicationListCreateView(APIView):
+def delete_s3_keys(s3, keys):
+    """
+    Delete S3 keys in 1,000-key delete_objects batches, falling back to
+    per-key deletes for a batch that fails.
+    """
+    for i in range(0, len(keys), S3_DELETE_BATCH_SIZE):
+        chunk = keys[i : i + S3_DELETE_BATCH_SIZE]
+        try:
+            s3.delete_objects(
+                Bucket=settings.AWS_STORAGE_BUCKET_NAME,
+                Delete={"Objects": [{"Key": key} for key in chunk], "Quiet": True},
+            )
+        except Exception as e:
+            logger.error("Error batch deleting from S3: %s", str(e))
+            for key in chunk:
+                try:
+                    s3.delete_object(Bucket=settings.AWS_STORAGE_BUCKET_NAME, Key=key)
+                except Exception as ex:
+                    logger.error("Error deleting file from S3: %s", str(ex))
+
+
+def _prepare_imported_job(values):
+    values["status"] = values["status"].lower()
+    # copy_insert skips save(), which derives the salary range
+    values["salary_min"], values["salary_max"], values["salary_currency"] = (
+        parse_salary(values["salary"])
+    )
+
+
+def _log_imported_statuses(user_id, job_apps):
+    # save() would log each new row's first status. The real change date is
+    # unknown, so like backfill_status_transitions use the date applied.
+    tz = timezone.get_current_timezone()
+    copy_insert(
+        StatusTransition,
+        [
+            StatusTransition.build(
+                user_id,
+                job_app.id,
+                job_app.date_applied,
+                None,
+                job_app.status,
+                False,
+                timezone.make_aware(
+                    datetime.combine(job_app.date_applied, day_time.min), tz
+                ),
+            )
+            for job_app in job_apps
+        ],
+    )
+
+
+def _announce_job_import(user_id):
+    invalidate_user_caches(user_id)
+    publish_change(user_id, "job_application", "created", [])
+
+
+JOB_IMPORT = ImportSpec(
+    model=JobApplication,
+    # salary_min/max/currency are derived from salary, never imported
+    columns=tuple(
+        (label, column)
+        for label, column in JOB_EXPORT_COLUMNS
+        if column not in JobApplicationSerializer.Meta.read_only_fields
+    ),
+    prepare_row=_prepare_imported_job,
+    after_batch=_log_imported_statuses,
+    after_import=_announce_job_import,
+)
+
+
+def _store_attachment(s3, user_id, file):
+    file_key = f"job_applications/{user_id}/{uuid.uuid4().hex}_{file.name}"
+    if isinstance(file, S3UploadedFile):
+        s3.put_object(
+            Bucket=settings.AWS_STORAGE_BUCKET_NAME,
+            Key=file_key,
+            Body=file.content,
+            ContentType=file.content_type,
+        )
+    else:
+        s3.upload_fileobj(
+            file,
+            settings.AWS_STORAGE_BUCKET_NAME,
+            file_key,
+            ExtraArgs={"ContentType": file.content_type},
+        )
+    return file_key
+
+
+def save_attachments(job_app, files):
+    """
+    Create Attachment rows for uploaded files, sharing one stored copy per
+    distinct file content (AttachmentBlob). Files streamed to S3 by
+    S3MultipartUploadHandler are already hashed, and stored unless the user
+    already had them; others are hashed here and uploaded only if new. A
+    stored upload that turns out to duplicate a blob is deleted again.
+    """
+    s3 = None
+    redundant_keys = []
+    attachment_objects = []
+    with transaction.atomic():
+        for file in files:
+            if isinstance(file, S3UploadedFile):
+                sha256, stored_key = file.sha256, file.key
+            else:
+                sha256, stored_key = file_sha256(file), None
+            blob = AttachmentBlob.acquire(
+                job_app.user_id, sha256, file.size, stored_key
+            )
+            if blob is None:
+                s3 = s3 or get_s3_client()
+                stored_key = _store_attachment(s3, job_app.user_id, file)
+                blob = AttachmentBlob.acquire(
+                    job_app.user_id, sha256, file.size, stored_key
+                )
+            if stored_key and stored_key != blob.file_key:
+                redundant_keys.append(stored_key)
+            attachment_type = (
+                "coverLetter" if "cover" in file.name.lower() else "resume"
+            )
+            attachment_objects.append(
+                Attachment(
+                    job_application=job_app,
+                    name=file.name,
+                    type=attachment_type,
+                    file_url=blob.file_key,
+                    blob=blob,
+                )
+            )
+        if attachment_objects:
+            Attachment.objects.bulk_create(attachment_objects)
+    if redundant_keys:
+        delete_s3_keys(s3 or get_s3_client(), redundant_keys)
+
+
+def release_attachment_files(attachment_rows):
+    """
+    Release the stored files of deleted attachments, given (file_url,
+    blob_id) pairs, and return the S3 keys nothing references any more.
+    Call in the deleting transaction and delete the keys after it commits.
+    """
+    legacy_keys = [file_url for file_url, blob_id in attachment_rows if not blob_id]
+    return legacy_keys + AttachmentBlob.release(
+        blob_id for _, blob_id in attachment_rows
+    )
+
+
+class StreamAttachmentsToS3Mixin:
+    """
+    For multipart writes, stream the "attachments" files straight to S3 with
+    S3MultipartUploadHandler instead of spooling them to temp files, and
+    remove them again if the request fails.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        # The handler has to be installed before authentication, because the
+        # session CSRF check reads the form and so parses the body. The key
+        # prefix needs the user, so only session-authenticated requests
+        # stream; others fall back to the default handlers.
+        django_request = request._request
+        self.s3_upload_handler = None
+        if (
+            request.content_type.startswith("multipart/form-data")
+            and django_request.user.is_authenticated
+        ):
+            self.s3_upload_handler = S3MultipartUploadHandler(
+                django_request,
+                get_s3_client,
+                f"job_applications/{django_request.user.id}",
+                {"attachments"},
+                lambda sha256: AttachmentBlob.objects.filter(
+                    user=django_request.user, sha256=sha256
+                ).exists(),
+            )
+            django_request.upload_handlers.insert(0, self.s3_upload_handler)
+        super().initial(request, *args, **kwargs)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        handler = getattr(self, "s3_upload_handler", None)
+        if handler is not None and response.status_code >= 400:
+            try:
+                keys = handler.discard()
+                if keys:
+                    delete_s3_keys(handler.s3, keys)
+            except Exception as e:
+                logger.error("Error discarding streamed uploads: %s", str(e))
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+class JobApplicationListCreateView(StreamAttachmentsToS3Mixin, APIView):
     permission_classes = [IsAuthenticated]
     parser_classes = [MultiPartParser, FormParser]
 
+    @conditional_get(JOBS, vary=download_url_vary)
+    @with_download_urls
     @cached_response(LIST_CACHE_TIMEOUT)
     def get(self, request):
         total_start = time.time()
 
         # Retrieve query parameters
-        status_filter = request.query_params.get("status")
-        search = request.query_params.get("search")
         sort_order = request.query_params.get("sortOrder", "desc")  # default descending
-        t1 = time.time()
-        job_apps = JobApplication.objects.filter(user=request.user)
-        if status_filter:
-            job_apps = job_apps.filter(status=status_filter)
-        if search:
-            search_terms = search.strip().split()
-            query = Q()
-            for term in search_terms:
-                query |= Q(company__icontains=term) | Q(position__icontains=term)
-            job_apps = job_apps.filter(query)
-        t2 = time.time()
+        try:
+            fields = parse_fields_param(
+                request.query_params.get("fields"), LIST_DEFAULT_FIELDS
+            )
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            filters = parse_list_filters(request.query_params)
+        except ValueError:
+            return Response(
+                {
+                    "error": "salaryMin/salaryMax must be whole numbers and "
+                    "dateFrom/dateTo must be YYYY-MM-DD dates"
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
         # Determine ordering based on sortOrder parameter.
         if sort_order == "asc":
@@ -145,64 +542,51 @@ class JobApplicationListCreateView(APIView):
         else:
             order_by_fields = ("-date_applied", "-id")
 
-        job_apps = (
-            job_apps.select_related("user")
-            .prefetch_related("attachments")
-            .order_by(*order_by_fields)
+        t1 = time.time()
+        plan = plan_list_queryset(
+            JobApplication.objects.filter(user=request.user), filters, order_by_fields
         )
-        t3 = time.time()
+        job_apps = select_job_fields(plan.queryset, fields)
+        t2 = time.time()
 
         # Pagination using the custom page number pagination class
         paginator = JobApplicationPageNumberPagination()
         page = paginator.paginate_queryset(job_apps, request)
         t4 = time.time()
-        serializer = JobApplicationSerializer(page, many=True)
+        serializer = JobApplicationSerializer(page, many=True, fields=fields)
         t5 = time.time()
         response = paginator.get_paginated_response(serializer.data)
         total_end = time.time()
 
         # Log performance metrics
-        logger.debug(f"[Timer] Filtering: {(t2 - t1):.3f}s")
-        logger.debug(f"[Timer] Prefetch/order: {(t3 - t2):.3f}s")
-        logger.debug(f"[Timer] Pagination: {(t4 - t3):.3f}s")
+        logger.debug(
+            f"[Timer] Filtering: {(t2 - t1):.3f}s "
+            f"(expected index="
+            f"{plan.expected_index.name if plan.expected_index else None})"
+        )
+        logger.debug(f"[Timer] Pagination: {(t4 - t2):.3f}s")
         logger.debug(f"[Timer] Serialization: {(t5 - t4):.3f}s")
         logger.debug(f"[Timer] Total view time: {(total_end - total_start):.3f}s")
         return response
 
     def post(self, request):
         start_time = time.time()
-        data = request.data.copy()
+        # Form fields only: copying request.data would deep-copy the files
+        data = request.POST.copy()
         data["user"] = request.user.id
 
         serializer = JobApplicationSerializer(data=data)
         if serializer.is_valid():
             job_app = serializer.save()
-            attachments = request.FILES.getlist("attachments")
-            if attachments:
-                s3 = get_s3_client()
-                attachment_objects = []
-                for file in attachments:
-                    file_key = f"job_applications/{request.user.id}/{uuid.uuid4().hex}_{file.name}"
-                    s3.upload_fileobj(
-                        file,
-                        settings.AWS_STORAGE_BUCKET_NAME,
-                        file_key,
-                        ExtraArgs={"ContentType": file.content_type},
-                    )
-                    attachment_type = (
-                        "coverLetter" if "cover" in file.name.lower() else "resume"
-                    )
-                    attachment_objects.append(
-                        Attachment(
-                            job_application=job_app,
-                            name=file.name,
-                            type=attachment_type,
-                            file_url=file_key,
-                        )
-                    )
-                if attachment_objects:
-                    Attachment.objects.bulk_create(attachment_objects)
+            save_attachments(job_app, request.FILES.getlist("attachments"))
             invalidate_user_caches(request.user.id)
+            publish_change(
+                request.user.id,
+                "job_application",
+                "created",
+                [job_app.id],
+                card_data(job_app),
+            )
             end_time = time.time()
             logger.debug(
                 f"[Timer] Create job application: {(end_time - start_time):.3f}s"
@@ -213,26 +597,32 @@ class JobApplicationListCreateView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class JobApplicationDetailView(APIView):
+class JobApplicationDetailView(StreamAttachmentsToS3Mixin, APIView):
     permission_classes = [IsAuthenticated]
     parser_classes = [MultiPartParser, FormParser]
 
-    def get_object(self, pk, user):
+    def get_object(self, pk, user, fields=None):
         try:
-            return JobApplication.objects.prefetch_related("attachments").get(
+            return select_job_fields(JobApplication.objects, fields).get(
                 pk=pk, user=user
             )
         except JobApplication.DoesNotExist:
             return None
 
+    @conditional_get(JOBS)
     @cached_response(DETAIL_CACHE_TIMEOUT)
     def get(self, request, pk):
-        job_app = self.get_object(pk, request.user)
+        # Detail responses default to every field; ?fields= narrows them
+        try:
+            fields = parse_fields_param(request.query_params.get("fields"), None)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        job_app = self.get_object(pk, request.user, fields)
         if not job_app:
             return Response(
                 {"error": "Job application not found"}, status=status.HTTP_404_NOT_FOUND
             )
-        serializer = JobApplicationSerializer(job_app)
+        serializer = JobApplicationSerializer(job_app, fields=fields)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     def put(self, request, pk):
@@ -244,37 +634,16 @@ class JobApplicationDetailView(APIView):
             )
 
         serializer = JobApplicationSerializer(
-            job_app, data=request.data.copy(), partial=True
+            job_app, data=request.POST.copy(), partial=True
         )
         if serializer.is_valid():
             job_app = serializer.save()
-            attachments = request.FILES.getlist("attachments")
-            if attachments:
-                s3 = get_s3_client()
-                attachment_objects = []
-                for file in attachments:
-                    file_key = f"job_applications/{request.user.id}/{uuid.uuid4().hex}_{file.name}"
-                    s3.upload_fileobj(
-                        file,
-                        settings.AWS_STORAGE_BUCKET_NAME,
-                        file_key,
-                        ExtraArgs={"ContentType": file.content_type},
-                    )
-                    attachment_type = (
-                        "coverLetter" if "cover" in file.name.lower() else "resume"
-                    )
-                    attachment_objects.append(
-                        Attachment(
-                            job_application=job_app,
-                            name=file.name,
-                            type=attachment_type,
-                            file_url=file_key,
-                        )
-                    )
-                if attachment_objects:
-                    Attachment.objects.bulk_create(attachment_objects)
+            save_attachments(job_app, request.FILES.getlist("attachments"))
             cache.delete(generate_cache_key(request.user.id, detail_id=pk))
             invalidate_user_caches(request.user.id)
+            publish_change(
+                request.user.id, "job_application", "updated", [pk], card_data(job_app)
+            )
             end_time = time.time()
             logger.debug(
                 f"[Timer] Update job application: {(end_time - start_time):.3f}s"
@@ -291,28 +660,25 @@ class JobApplicationDetailView(APIView):
             return Response(
                 {"error": "Job application not found"}, status=status.HTTP_404_NOT_FOUND
             )
-        attachments = list(job_app.attachments.all())
-        if attachments:
-            s3 = get_s3_client()
-            s3_objects = [{"Key": att.file_url} for att in attachments]
-            try:
-                if s3_objects:
-                    s3.delete_objects(
-                        Bucket=settings.AWS_STORAGE_BUCKET_NAME,
-                        Delete={"Objects": s3_objects},
-                    )
-            except Exception as e:
-                logger.error("Error batch deleting from S3: %s", str(e))
-                for att in attachments:
-                    try:
-                        s3.delete_object(
-                            Bucket=settings.AWS_STORAGE_BUCKET_NAME, Key=att.file_url
-                        )
-                    except Exception as ex:
-                        logger.error("Error deleting file from S3: %s", str(ex))
-        job_app.delete()
+        with transaction.atomic():
+            attachment_rows = list(
+                job_app.attachments.values_list("id", "file_url", "blob_id")
+            )
+            job_app.delete()
+            keys = release_attachment_files(
+                [(file_url, blob_id) for _, file_url, blob_id in attachment_rows]
+            )
+            Tombstone.record(request.user.id, JobApplication, [pk])
+            Tombstone.record(
+                request.user.id,
+                Attachment,
+                [att_id for att_id, _, _ in attachment_rows],
+            )
+        if keys:
+            delete_s3_keys(get_s3_client(), keys)
         cache.delete(generate_cache_key(request.user.id, detail_id=pk))
         invalidate_user_caches(request.user.id)
+        publish_change(request.user.id, "job_application", "deleted", [pk])
         end_time = time.time()
         logger.debug(f"[Timer] Delete job application: {(end_time - start_time):.3f}s")
         return Response(
@@ -320,6 +686,128 @@ class JobApplicationDetailView(APIView):
         )
 
 
+class JobApplicationBulkUpdateView(APIView):
+    """
+    Set the status of many applications with one UPDATE ... WHERE id IN.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        start_time = time.time()
+        serializer = BulkStatusUpdateSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        ids = serializer.validated_data["ids"]
+        new_status = serializer.validated_data["status"]
+        now = timezone.now()
+
+        with transaction.atomic():
+            # queryset.update() skips JobApplication.save(), so the status
+            # transitions are logged here with one bulk_create instead.
+            rows = list(
+                JobApplication.objects.select_for_update()
+                .filter(user=request.user, id__in=ids)
+                .exclude(status=new_status)
+                .values_list("id", "status", "date_applied")
+            )
+            changed_ids = [job_id for job_id, _, _ in rows]
+            if changed_ids:
+                responded = set(
+                    StatusTransition.objects.filter(
+                        job_application_id__in=changed_ids, is_first_response=True
+                    ).values_list("job_application_id", flat=True)
+                )
+                StatusTransition.objects.bulk_create(
+                    [
+                        StatusTransition.build(
+                            request.user.id,
+                            job_id,
+                            date_applied,
+                            previous_status,
+                            new_status,
+                            job_id in responded,
+                            now,
+                        )
+                        for job_id, previous_status, date_applied in rows
+                    ]
+                )
+                # update() skips auto_now, so bump updated_at for delta sync
+                JobApplication.objects.filter(id__in=changed_ids).update(
+                    status=new_status, updated_at=now
+                )
+
+        invalidate_user_caches(request.user.id)
+        if changed_ids:
+            publish_change(
+                request.user.id,
+                "job_application",
+                "updated",
+                changed_ids,
+                {"status": new_status},
+            )
+        end_time = time.time()
+        logger.debug(
+            f"[Timer] Bulk update {len(changed_ids)} job application(s): "
+            f"{(end_time - start_time):.3f}s"
+        )
+        return Response({"updated": len(changed_ids)}, status=status.HTTP_200_OK)
+
+
+class JobApplicationBulkDeleteView(APIView):
+    """
+    Delete many applications and their S3 attachments in one request.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        start_time = time.time()
+        serializer = BulkJobApplicationIdsSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        ids = serializer.validated_data["ids"]
+
+        with transaction.atomic():
+            job_ids = list(
+                JobApplication.objects.filter(
+                    user=request.user, id__in=ids
+                ).values_list("id", flat=True)
+            )
+            attachment_rows = list(
+                Attachment.objects.filter(job_application_id__in=job_ids).values_list(
+                    "id", "file_url", "blob_id"
+                )
+            )
+            _, deleted_per_model = JobApplication.objects.filter(
+                id__in=job_ids
+            ).delete()
+            keys = release_attachment_files(
+                [(file_url, blob_id) for _, file_url, blob_id in attachment_rows]
+            )
+            Tombstone.record(request.user.id, JobApplication, job_ids)
+            Tombstone.record(
+                request.user.id,
+                Attachment,
+                [att_id for att_id, _, _ in attachment_rows],
+            )
+        deleted = deleted_per_model.get(JobApplication._meta.label, 0)
+
+        # Rows are gone before the objects: a failed S3 call leaves an orphaned
+        # blob rather than an attachment row pointing at nothing.
+        if keys:
+            delete_s3_keys(get_s3_client(), keys)
+        invalidate_user_caches(request.user.id)
+        if job_ids:
+            publish_change(request.user.id, "job_application", "deleted", job_ids)
+        end_time = time.time()
+        logger.debug(
+            f"[Timer] Bulk delete {deleted} job application(s): "
+            f"{(end_time - start_time):.3f}s"
+        )
+        return Response({"deleted": deleted}, status=status.HTTP_200_OK)
+
+
 class DeleteAttachmentView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -341,15 +829,294 @@ class DeleteAttachmentView(APIView):
             return Response(
                 {"error": "Attachment not found"}, status=status.HTTP_404_NOT_FOUND
             )
-        s3 = get_s3_client()
-        try:
-            s3.delete_object(
-                Bucket=settings.AWS_STORAGE_BUCKET_NAME, Key=attachment.file_url
-            )
-        except Exception as e:
-            logger.error("Error deleting file from S3: %s", str(e))
-        attachment.delete()
-        cache.delete(generate_cache_key(request.user.id, detail_id=job_id))
+        with transaction.atomic():
+            Tombstone.record(request.user.id, Attachment, [attachment.id])
+            attachment.delete()
+            keys = release_attachment_files([(attachment.file_url, attachment.blob_id)])
+        if keys:
+            delete_s3_keys(get_s3_client(), keys)
+        # List pages and every fieldset variant of the detail embed attachments
+        invalidate_user_caches(request.user.id)
+        publish_change(
+            request.user.id,
+            "attachment",
+            "deleted",
+            [attachment_id],
+            {"job_application": job_id},
+        )
         end_time = time.time()
         logger.debug(f"[Timer] Delete attachment: {(end_time - start_time):.3f}s")
         return Response({"message": "Attachment deleted"}, status=status.HTTP_200_OK)
+
+
+class JobApplicationExportView(APIView):
+    """
+    Download every job application matching the list filters as CSV or XLSX.
+    Rows come off a server-side cursor in chunks, so memory use does not
+    grow with the size of the export.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, file_format):
+        if file_format not in EXPORT_FORMATS:
+            return Response(
+                {"error": f"Format must be one of: {', '.join(EXPORT_FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            filters = parse_list_filters(request.query_params)
+        except ValueError:
+            return Response(
+                {
+                    "error": "salaryMin/salaryMax must be whole numbers and "
+                    "dateFrom/dateTo must be YYYY-MM-DD dates"
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        plan = plan_list_queryset(
+            JobApplication.objects.filter(user=request.user),
+            filters,
+            ("-date_applied", "-id"),
+        )
+        header = [label for label, _ in JOB_EXPORT_COLUMNS]
+        rows = plan.queryset.values_list(
+            *(column for _, column in JOB_EXPORT_COLUMNS)
+        ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        return export_response(file_format, "job_applications", header, rows)
+
+
+class AttachmentDownloadURLsView(APIView):
+    """
+    Signed download URLs for every attachment of the given job applications
+    (e.g. a page of the list) in one call.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        start_time = time.time()
+        serializer = BulkJobApplicationIdsSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        attachments = list(
+            Attachment.objects.filter(
+                job_application__user=request.user,
+                job_application_id__in=serializer.validated_data["ids"],
+            )
+            .order_by("job_application_id", "id")
+            .values("id", "job_application", "name", "type", "file_url")
+            .annotate(thumbnail=NullIf("blob__thumbnail_key", Value("")))
+        )
+        add_download_urls(attachments)
+        end_time = time.time()
+        logger.debug(
+            f"[Timer] Sign {len(attachments)} attachment URL(s): "
+            f"{(end_time - start_time):.3f}s"
+        )
+        return Response({"attachments": attachments}, status=status.HTTP_200_OK)
+
+
+class ImportUploadView(APIView):
+    """
+    Bulk import from a CSV or JSON file uploaded as "file". Files up to
+    INLINE_IMPORT_MAX_BYTES are imported during the request and answered
+    with the row report; larger ones are parked in S3 and answered 202 with
+    an ImportJob for the process_imports worker, to poll at imports/<id>/.
+    """
+
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser, FormParser]
+    import_target = None  # a key of imports.IMPORT_SPECS
+
+    def post(self, request):
+        start_time = time.time()
+        upload = request.FILES.get("file")
+        if upload is None:
+            return Response(
+                {"error": "Upload the CSV or JSON file as 'file'"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        file_format = import_format(upload.name)
+        if file_format is None:
+            return Response(
+                {"error": f"File must be one of: {', '.join(IMPORT_EXTENSIONS)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if upload.size > INLINE_IMPORT_MAX_BYTES:
+            file_key = f"imports/{request.user.id}/{uuid.uuid4().hex}_{upload.name}"
+            get_s3_client().upload_fileobj(
+                upload, settings.AWS_STORAGE_BUCKET_NAME, file_key
+            )
+            job = ImportJob.objects.create(
+                user=request.user,
+                target=self.import_target,
+                file_name=upload.name,
+                file_key=file_key,
+                file_format=file_format,
+            )
+            logger.debug(f"[Timer] Queue import: {(time.time() - start_time):.3f}s")
+            return Response(
+                ImportJobSerializer(job).data, status=status.HTTP_202_ACCEPTED
+            )
+
+        spec = get_import_spec(self.import_target)
+        try:
+            rows = read_rows(upload, file_format, spec.header_map())
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        report = import_rows(spec, request.user.id, rows)
+        logger.debug(
+            f"[Timer] Import {report['created']} rows: "
+            f"{(time.time() - start_time):.3f}s"
+        )
+        return Response(report, status=status.HTTP_200_OK)
+
+
+class JobApplicationImportView(ImportUploadView):
+    import_target = "job_applications"
+
+
+class ImportJobDetailView(APIView):
+    """
+    Progress and row report of a queued import.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        try:
+            job = ImportJob.objects.get(pk=pk, user=request.user)
+        except ImportJob.DoesNotExist:
+            return Response(
+                {"error": "Import not found"}, status=status.HTTP_404_NOT_FOUND
+            )
+        return Response(ImportJobSerializer(job).data, status=status.HTTP_200_OK)
+
+
+class JobApplicationBoardView(APIView):
+    """
+    Kanban board: the first `limit` applications of every status plus
+    per-status counts in one query, and keyset "load more" per column.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    @conditional_get(JOBS)
+    def get(self, request):
+        try:
+            limit = min(
+                int(request.query_params.get("limit", BOARD_PAGE_SIZE)),
+                MAX_BOARD_PAGE_SIZE,
+            )
+            if limit < 1:
+                raise ValueError("limit must be positive")
+            cursor = request.query_params.get("cursor")
+            position = decode_board_cursor(cursor) if cursor else None
+        except ValueError:
+            return Response(
+                {"error": "Invalid limit or cursor"}, status=status.HTTP_400_BAD_REQUEST
+            )
+        fields_param = request.query_params.get("fields", "")
+        try:
+            fields = parse_fields_param(fields_param, LIST_DEFAULT_FIELDS)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        status_filter = request.query_params.get("status")
+        if position and not status_filter:
+            return Response(
+                {"error": "status is required when paging with a cursor"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Shares the jal:{user_id}:* namespace so invalidate_user_caches clears it
+        param_str = (
+            f"limit={limit}&status={status_filter or ''}&cursor={cursor or ''}"
+            f"&fields={fields_param}"
+        )
+        cache_key = (
+            f"{generate_cache_key(request.user.id)}:board:"
+            f"{hashlib.md5(param_str.encode()).hexdigest()[:10]}"
+        )
+        cached_data = cache.get(cache_key)
+        if cached_data:
+            logger.info(f"Cache hit for key: {cache_key}")
+            return Response(cached_data)
+
+        start_time = time.time()
+        if status_filter:
+            data = self.get_column(request.user, status_filter, position, limit, fields)
+        else:
+            data = {"columns": self.get_board(request.user, limit, fields)}
+        cache.set(cache_key, data, LIST_CACHE_TIMEOUT)
+        end_time = time.time()
+        logger.debug(f"[Timer] Board view: {(end_time - start_time):.3f}s")
+        return Response(data, status=status.HTTP_200_OK)
+
+    def get_board(self, user, limit, fields):
+        # ROW_NUMBER/COUNT over PARTITION BY status: Postgres reads the
+        # (user, status, -date_applied, -id) index already in window order,
+        # and Django wraps the rank filter in a subquery, so this is one query
+        # (plus the attachments prefetch) however many columns there are.
+        ordering = (F("date_applied").desc(), F("id").desc())
+        ranked = (
+            select_job_fields(
+                JobApplication.objects.filter(user=user),
+                fields,
+                also_load=("status", "date_applied"),
+            )
+            .annotate(
+                board_rank=Window(
+                    RowNumber(), partition_by=[F("status")], order_by=ordering
+                ),
+                status_count=Window(Count("id"), partition_by=[F("status")]),
+            )
+            .filter(board_rank__lte=limit)
+            .order_by("status", "board_rank")
+        )
+
+        grouped = {}
+        for job_app in ranked:
+            grouped.setdefault(job_app.status, []).append(job_app)
+
+        extra_statuses = sorted(set(grouped) - set(BOARD_STATUSES))
+        columns = []
+        for board_status in BOARD_STATUSES + extra_statuses:
+            jobs = grouped.get(board_status, [])
+            count = jobs[0].status_count if jobs else 0
+            columns.append(
+                {
+                    "status": board_status,
+                    "count": count,
+                    "results": JobApplicationSerializer(
+                        jobs, many=True, fields=fields
+                    ).data,
+                    "next_cursor": (
+                        encode_board_cursor(jobs[-1]) if count > len(jobs) else None
+                    ),
+                }
+            )
+        return columns
+
+    def get_column(self, user, board_status, position, limit, fields):
+        jobs = select_job_fields(
+            JobApplication.objects.filter(user=user, status=board_status),
+            fields,
+            also_load=("date_applied",),
+        )
+        if position:
+            date_applied, job_id = position
+            jobs = jobs.filter(
+                Q(date_applied__lt=date_applied)
+                | Q(date_applied=date_applied, id__lt=job_id)
+            )
+        # One extra row tells us whether there is another page
+        jobs = list(jobs.order_by("-date_applied", "-id")[: limit + 1])
+        has_more = len(jobs) > limit
+        jobs = jobs[:limit]
+        return {
+            "status": board_status,
+            "results": JobApplicationSerializer(jobs, many=True, fields=fields).data,
+            "next_cursor": encode_board_cursor(jobs[-1]) if has_more else None,
+        }
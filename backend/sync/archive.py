@@ -0,0 +1,241 @@
+# sync/archive.py
+
+import logging
+import os
+import queue
+import threading
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.utils.text import get_valid_filename
+
+from AI_generator.models import CoverLetter
+from contacts.models import Contact, Interaction
+from contacts.views import CONTACT_EXPORT_COLUMNS
+from job_applications.exports import EXPORT_CHUNK_SIZE, JOB_EXPORT_COLUMNS, csv_chunks
+from job_applications.models import JobApplication, Attachment
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_PREFETCH = 4  # S3 objects downloaded ahead of the zip writer
+ARCHIVE_CHUNK_SIZE = 256 * 1024  # bytes per S3 read
+ARCHIVE_CHUNKS_AHEAD = 4  # chunks buffered per object being downloaded
+PUT_TIMEOUT = 1  # seconds between checks that the download is still wanted
+
+_DONE = object()
+
+
+class _ZipSink:
+    """
+    Unseekable file object that collects what ZipFile writes until the
+    response generator drains it. ZipFile notices it can't seek and writes
+    data descriptors after each member instead of patching headers.
+    """
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _table(zf, sink, name, header, rows):
+    with zf.open(name, "w", force_zip64=True) as member:
+        for chunk in csv_chunks(header, rows):
+            member.write(chunk.encode())
+            yield sink.drain()
+    yield sink.drain()
+
+
+def _download(s3, key, chunks, cancelled):
+    """
+    Worker thread: stream one S3 object into a bounded queue, ending with
+    _DONE or the exception that stopped it. Gives up once the archive is
+    abandoned, so a disconnected client doesn't leave threads blocked.
+    """
+
+    def put(item):
+        while not cancelled.is_set():
+            try:
+                chunks.put(item, timeout=PUT_TIMEOUT)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    try:
+        body = s3.get_object(Bucket=settings.AWS_STORAGE_BUCKET_NAME, Key=key)["Body"]
+        with body:
+            for chunk in body.iter_chunks(ARCHIVE_CHUNK_SIZE):
+                if not put(chunk):
+                    return
+        put(_DONE)
+    except Exception as e:
+        put(e)
+
+
+def _files(zf, sink, s3, files, missing):
+    """
+    Add (archive name, S3 key) files as stored members. Up to ARCHIVE_PREFETCH
+    objects download concurrently, each at most ARCHIVE_CHUNKS_AHEAD chunks
+    ahead of the writer, so memory is bounded whatever the file sizes.
+    """
+    cancelled = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=ARCHIVE_PREFETCH)
+    pending = deque()
+    files = iter(files)
+    try:
+        while True:
+            while len(pending) < ARCHIVE_PREFETCH:
+                name, key = next(files, (None, None))
+                if name is None:
+                    break
+                chunks = queue.Queue(maxsize=ARCHIVE_CHUNKS_AHEAD)
+                executor.submit(_download, s3, key, chunks, cancelled)
+                pending.append((name, chunks))
+            if not pending:
+                return
+            name, chunks = pending.popleft()
+            item = chunks.get()
+            if isinstance(item, Exception):
+                logger.error("Error fetching %s for archive: %s", name, str(item))
+                missing.append(name)
+                continue
+            # Bytes go out as they arrive; PDFs don't deflate usefully
+            info = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+            with zf.open(info, "w", force_zip64=True) as member:
+                while item is not _DONE:
+                    if isinstance(item, Exception):
+                        # Too late to drop the member; it stays truncated
+                        logger.error(
+                            "Error fetching %s for archive: %s", name, str(item)
+                        )
+                        missing.append(name)
+                        break
+                    member.write(item)
+                    yield sink.drain()
+                    item = chunks.get()
+            yield sink.drain()
+    finally:
+        cancelled.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _attachment_files(user):
+    rows = (
+        Attachment.objects.filter(job_application__user=user)
+        .order_by("id")
+        .values_list("id", "job_application_id", "name", "file_url")
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+    for attachment_id, job_id, name, key in rows:
+        yield f"attachments/{job_id}/{attachment_id}_{get_valid_filename(name)}", key
+
+
+def _cover_letter_files(user):
+    rows = (
+        CoverLetter.objects.filter(user=user)
+        .order_by("id")
+        .values_list("id", "cover_letter_file_path")
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+    for cover_id, key in rows:
+        name = get_valid_filename(os.path.basename(key))
+        yield f"cover_letters/{cover_id}_{name}", key
+
+
+def _rows(queryset, columns):
+    return (
+        queryset.order_by("id")
+        .values_list(*columns)
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+
+
+def archive_chunks(user, s3):
+    """
+    Generate a ZIP of everything the user has stored: one CSV per table, then
+    the attachment and cover letter files from S3. Rows come off server-side
+    cursors and files are streamed through in chunks, so memory use is the
+    same for any account size.
+    """
+    sink = _ZipSink()
+    missing = []
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        job_columns = (("ID", "id"),) + JOB_EXPORT_COLUMNS
+        yield from _table(
+            zf,
+            sink,
+            "job_applications.csv",
+            [label for label, _ in job_columns],
+            _rows(
+                JobApplication.objects.filter(user=user),
+                [column for _, column in job_columns],
+            ),
+        )
+        yield from _table(
+            zf,
+            sink,
+            "attachments.csv",
+            ["ID", "Job Application ID", "Name", "Type", "Date Added"],
+            _rows(
+                Attachment.objects.filter(job_application__user=user),
+                ["id", "job_application_id", "name", "type", "date_added"],
+            ),
+        )
+
+        contact_columns = [column for _, column in CONTACT_EXPORT_COLUMNS]
+        tags_at = contact_columns.index("tags") + 1
+        yield from _table(
+            zf,
+            sink,
+            "contacts.csv",
+            ["ID"] + [label for label, _ in CONTACT_EXPORT_COLUMNS],
+            (
+                row[:tags_at] + ("; ".join(row[tags_at] or []),) + row[tags_at + 1 :]
+                for row in _rows(
+                    Contact.objects.filter(user=user), ["id"] + contact_columns
+                )
+            ),
+        )
+        yield from _table(
+            zf,
+            sink,
+            "interactions.csv",
+            ["ID", "Contact ID", "Date", "Type", "Notes"],
+            _rows(
+                Interaction.objects.filter(contact__user=user),
+                ["id", "contact_id", "date", "type", "notes"],
+            ),
+        )
+        yield from _table(
+            zf,
+            sink,
+            "cover_letters.csv",
+            ["ID", "Job Title", "Company", "Created At"],
+            _rows(
+                CoverLetter.objects.filter(user=user),
+                ["id", "job_title", "company_name", "created_at"],
+            ),
+        )
+
+        yield from _files(zf, sink, s3, _attachment_files(user), missing)
+        yield from _files(zf, sink, s3, _cover_letter_files(user), missing)
+        if missing:
+            zf.writestr(
+                "missing_files.txt",
+                "These files could not be downloaded:\n" + "\n".join(missing),
+            )
+    yield sink.drain()
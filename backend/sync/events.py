@@ -0,0 +1,134 @@
+# sync/events.py
+
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from contextlib import asynccontextmanager
+
+import redis.asyncio as aioredis
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django_redis import get_redis_connection
+
+logger = logging.getLogger(__name__)
+
+EVENT_CHANNEL_PREFIX = "events:"
+EVENT_QUEUE_SIZE = 100  # per connection; a client this far behind must resync
+RECONNECT_DELAY = 2  # seconds between Redis reconnect attempts
+SUBSCRIBE_TIMEOUT = 3  # seconds a new stream waits for the subscription
+
+RESYNC = "resync"
+CHANGE = "change"
+
+
+def publish_change(user_id, model, action, ids, data=None):
+    """
+    Publish a change event to the user's channel once the current transaction
+    commits. `data` holds field values that apply to every id, e.g. the new
+    row for a create/update or {"status": ...} for a bulk status change.
+    """
+    message = json.dumps(
+        {"model": model, "action": action, "ids": list(ids), "data": data},
+        cls=DjangoJSONEncoder,
+    )
+
+    def publish():
+        # Notifications are best effort: clients resync on reconnect anyway
+        try:
+            get_redis_connection("default").publish(
+                f"{EVENT_CHANNEL_PREFIX}{user_id}", message
+            )
+        except Exception as e:
+            logger.error("Error publishing change event: %s", str(e))
+
+    transaction.on_commit(publish)
+
+
+class ChangeBroker:
+    """
+    Fans Redis change events out to the event streams open in this process.
+
+    The process holds a single pattern subscription (events:*) however many
+    streams are open, and hands each message to the in-memory queues of that
+    user's streams, so an idle stream costs a queue and a coroutine rather
+    than a Redis connection.
+    """
+
+    def __init__(self):
+        self._queues = defaultdict(set)
+        self._task = None
+        self._loop = None
+        self._subscribed = None
+
+    @asynccontextmanager
+    async def subscribe(self, user_id):
+        queue = asyncio.Queue(maxsize=EVENT_QUEUE_SIZE)
+        self._queues[user_id].add(queue)
+        try:
+            self._ensure_listening()
+            try:
+                await asyncio.wait_for(self._subscribed.wait(), SUBSCRIBE_TIMEOUT)
+            except asyncio.TimeoutError:
+                # Redis is down; the stream stays open and gets a resync
+                # once the listener reconnects
+                pass
+            yield queue
+        finally:
+            self._queues[user_id].discard(queue)
+            if not self._queues[user_id]:
+                del self._queues[user_id]
+
+    def _ensure_listening(self):
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._loop is not loop:
+            self._loop = loop
+            self._subscribed = asyncio.Event()
+            self._task = loop.create_task(self._listen())
+
+    async def _listen(self):
+        reconnecting = False
+        while True:
+            try:
+                async with aioredis.from_url(
+                    settings.REDIS_URL
+                ) as client, client.pubsub() as pubsub:
+                    await pubsub.psubscribe(f"{EVENT_CHANNEL_PREFIX}*")
+                    self._subscribed.set()
+                    if reconnecting:
+                        # Events published while disconnected are lost
+                        self._broadcast_resync()
+                    async for message in pubsub.listen():
+                        if message["type"] == "pmessage":
+                            self._dispatch(message["channel"], message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Change event listener failed: %s", str(e))
+            self._subscribed.clear()
+            reconnecting = True
+            await asyncio.sleep(RECONNECT_DELAY)
+
+    def _dispatch(self, channel, data):
+        user_id = int(channel.decode()[len(EVENT_CHANNEL_PREFIX) :])
+        for queue in self._queues.get(user_id, ()):
+            self._put(queue, (CHANGE, data.decode()))
+
+    def _broadcast_resync(self):
+        for queues in self._queues.values():
+            for queue in queues:
+                self._put(queue, (RESYNC, "{}"))
+
+    @staticmethod
+    def _put(queue, event):
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Too far behind to patch; drop the backlog and ask for a refetch
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait((RESYNC, "{}"))
+
+
+broker = ChangeBroker()
@@ -0,0 +1,125 @@
+# sync/management/commands/loadtest_events.py
+
+import asyncio
+import statistics
+import time
+
+import httpx
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import Client
+from accounts.models import CustomUser
+from sync.events import publish_change
+
+
+def read_rss_mb(pid):
+    with open(f"/proc/{pid}/status") as status_file:
+        for line in status_file:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return None
+
+
+class Command(BaseCommand):
+    help = (
+        "Open N idle change-event streams against a running ASGI server, then "
+        "publish one event and time its fan-out to every stream."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--url",
+            default="http://127.0.0.1:8001/api/sync/events/",
+            help="Event stream URL of the server under test",
+        )
+        parser.add_argument("--connections", type=int, default=5000)
+        parser.add_argument(
+            "--connect-concurrency",
+            type=int,
+            default=50,
+            help="Streams being opened at once; each holds a database "
+            "connection until it is authenticated",
+        )
+        parser.add_argument(
+            "--idle", type=float, default=10, help="Seconds to hold streams idle"
+        )
+        parser.add_argument(
+            "--server-pid", type=int, help="Report this process's resident memory"
+        )
+        parser.add_argument("--email", default="loadtest@example.com")
+
+    def handle(self, *args, **options):
+        user, _ = CustomUser.objects.get_or_create(email=options["email"])
+        client = Client()
+        client.force_login(user)
+        session_id = client.cookies[settings.SESSION_COOKIE_NAME].value
+        asyncio.run(self.run(user.id, session_id, options))
+
+    async def run(self, user_id, session_id, options):
+        total = options["connections"]
+        pid = options["server_pid"]
+        connected = 0
+        all_connected = asyncio.Event()
+        published_at = None
+        latencies = []
+        all_received = asyncio.Event()
+        gate = asyncio.Semaphore(options["connect_concurrency"])
+
+        async def stream(http):
+            nonlocal connected
+            await gate.acquire()
+            async with http.stream("GET", options["url"]) as response:
+                lines = response.aiter_lines()
+                async for line in lines:
+                    if line.startswith("retry:"):
+                        break
+                gate.release()
+                connected += 1
+                if connected == total:
+                    all_connected.set()
+                async for line in lines:
+                    if line == "event: change":
+                        latencies.append(time.perf_counter() - published_at)
+                        if len(latencies) == total:
+                            all_received.set()
+
+        rss_before = read_rss_mb(pid) if pid else None
+        limits = httpx.Limits(max_connections=None, max_keepalive_connections=0)
+        async with httpx.AsyncClient(
+            limits=limits,
+            timeout=httpx.Timeout(None),
+            cookies={settings.SESSION_COOKIE_NAME: session_id},
+        ) as http:
+            started = time.perf_counter()
+            tasks = [asyncio.create_task(stream(http)) for _ in range(total)]
+            await all_connected.wait()
+            connect_time = time.perf_counter() - started
+            self.stdout.write(f"{total} streams open in {connect_time:.1f}s")
+
+            await asyncio.sleep(options["idle"])
+            if pid:
+                rss = read_rss_mb(pid)
+                self.stdout.write(
+                    f"Server RSS: {rss_before:.0f} MB idle -> {rss:.0f} MB with "
+                    f"{total} streams ({(rss - rss_before) * 1024 / total:.1f} KB "
+                    "per stream)"
+                )
+
+            published_at = time.perf_counter()
+            await sync_to_async(publish_change)(
+                user_id, "job_application", "updated", [0], {"status": "loadtest"}
+            )
+            await asyncio.wait_for(all_received.wait(), 60)
+            latencies.sort()
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"✅ Fan-out to {total} streams: "
+                    f"p50 {statistics.median(latencies) * 1000:.0f}ms, "
+                    f"p99 {latencies[int(total * 0.99) - 1] * 1000:.0f}ms, "
+                    f"max {latencies[-1] * 1000:.0f}ms"
+                )
+            )
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,18 @@
+# sync/management/commands/prune_tombstones.py
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from sync.models import Tombstone
+from sync.views import TOMBSTONE_RETENTION
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete tombstones older than the sync retention window; clients with an "
+        "older cursor already fall back to a full resync."
+    )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - TOMBSTONE_RETENTION
+        deleted, _ = Tombstone.objects.filter(deleted_at__lt=cutoff).delete()
+        self.stdout.write(self.style.SUCCESS(f"✅ Pruned {deleted} tombstone(s)."))
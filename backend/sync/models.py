@@ -0,0 +1,46 @@
+# sync/models.py
+
+from django.db import models
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+User = get_user_model()
+
+
+class Tombstone(models.Model):
+    """
+    Marker left behind when a synced row is deleted, so delta-sync clients
+    can drop it from their local cache.
+    """
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="tombstones")
+    # app_label.ModelName of the deleted row, e.g. "contacts.Contact"
+    model = models.CharField(max_length=100)
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "deleted_at"]),
+        ]
+
+    @classmethod
+    def record(cls, user_id, model, ids):
+        """
+        Write one tombstone per id with a single bulk_create.
+        """
+        now = timezone.now()
+        return cls.objects.bulk_create(
+            [
+                cls(
+                    user_id=user_id,
+                    model=model._meta.label,
+                    object_id=object_id,
+                    deleted_at=now,
+                )
+                for object_id in ids
+            ]
+        )
+
+    def __str__(self):
+        return f"{self.model}#{self.object_id} deleted {self.deleted_at}"
@@ -0,0 +1,39 @@
+# sync/serializers.py
+from rest_framework import serializers
+from contacts.models import Interaction
+from contacts.serializers import ContactSerializer
+from job_applications.models import JobApplication
+from job_applications.serializers import AttachmentSerializer
+
+
+class SyncJobApplicationSerializer(serializers.ModelSerializer):
+    # Attachments are synced as their own rows, not nested
+    class Meta:
+        model = JobApplication
+        fields = "__all__"
+
+
+class SyncContactSerializer(ContactSerializer):
+    # Interactions are synced as their own rows; clients derive the summary
+    class Meta(ContactSerializer.Meta):
+        fields = [
+            f
+            for f in ContactSerializer.Meta.fields
+            if f not in ("interactions", *ContactSerializer.Meta.read_only_fields)
+        ] + ["updated_at"]
+
+
+class SyncInteractionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Interaction
+        fields = ["id", "contact", "date", "type", "notes", "updated_at"]
+
+
+class SyncResponseSerializer(serializers.Serializer):
+    server_time = serializers.DateTimeField()
+    full = serializers.BooleanField()
+    job_applications = SyncJobApplicationSerializer(many=True)
+    attachments = AttachmentSerializer(many=True)
+    contacts = SyncContactSerializer(many=True)
+    interactions = SyncInteractionSerializer(many=True)
+    deleted = serializers.DictField(child=serializers.ListField())
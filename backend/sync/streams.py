@@ -0,0 +1,112 @@
+# sync/streams.py
+
+import asyncio
+import io
+import json
+from importlib import import_module
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user
+from django.core.handlers.asgi import ASGIRequest
+from django.db import close_old_connections
+
+from .events import broker
+
+EVENTS_PATH = "/api/sync/events/"
+# Comment line sent on idle streams so proxies keep them open
+HEARTBEAT_INTERVAL = 25  # seconds
+RETRY_MS = 5000  # EventSource reconnect delay
+
+
+def _authenticate(request):
+    """
+    Resolve the session cookie to a user the way SessionMiddleware and
+    AuthenticationMiddleware would, then release the database connection.
+    """
+    engine = import_module(settings.SESSION_ENGINE)
+    session_key = request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+    request.session = engine.SessionStore(session_key)
+    try:
+        return get_user(request)
+    finally:
+        close_old_connections()
+
+
+def _cors_headers(request):
+    # Mirrors django-cors-headers for the configured origins
+    origin = request.headers.get("Origin")
+    if not origin or origin not in settings.CORS_ALLOWED_ORIGINS:
+        return []
+    headers = [(b"access-control-allow-origin", origin.encode()), (b"vary", b"Origin")]
+    if settings.CORS_ALLOW_CREDENTIALS:
+        headers.append((b"access-control-allow-credentials", b"true"))
+    return headers
+
+
+async def _send_chunk(send, text):
+    await send({"type": "http.response.body", "body": text.encode(), "more_body": True})
+
+
+async def _pump(queue, send):
+    await _send_chunk(send, f"retry: {RETRY_MS}\n\n")
+    while True:
+        try:
+            event, data = await asyncio.wait_for(queue.get(), HEARTBEAT_INTERVAL)
+        except asyncio.TimeoutError:
+            await _send_chunk(send, ": keep-alive\n\n")
+            continue
+        await _send_chunk(send, f"event: {event}\ndata: {data}\n\n")
+
+
+async def _wait_for_disconnect(receive):
+    while (await receive())["type"] != "http.disconnect":
+        pass
+
+
+async def change_events_app(scope, receive, send):
+    """
+    Server-sent event stream of the user's changes. Each `change` event is a
+    JSON {model, action, ids, data} the client patches into local state; a
+    `resync` event means events were lost and the client should refetch.
+
+    A bare ASGI app rather than a Django view: Django runs every request's
+    sync middleware and ORM calls on a thread reserved for that request until
+    it finishes, so each open stream would pin a thread. Here the session
+    lookup borrows the shared sync thread and an idle stream is only a
+    coroutine waiting on its queue.
+    """
+    request = ASGIRequest(scope, io.BytesIO())
+    user = await sync_to_async(_authenticate)(request)
+    cors_headers = _cors_headers(request)
+
+    if not user.is_authenticated:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 401,
+                "headers": [(b"content-type", b"application/json"), *cors_headers],
+            }
+        )
+        body = json.dumps({"error": "Authentication required"}).encode()
+        await send({"type": "http.response.body", "body": body})
+        return
+
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"text/event-stream"),
+                (b"cache-control", b"no-cache"),
+                (b"x-accel-buffering", b"no"),  # stop nginx buffering the stream
+                *cors_headers,
+            ],
+        }
+    )
+    async with broker.subscribe(user.id) as queue:
+        pump = asyncio.create_task(_pump(queue, send))
+        try:
+            await _wait_for_disconnect(receive)
+        finally:
+            pump.cancel()
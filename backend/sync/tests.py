@@ -0,0 +1,231 @@
+import asyncio
+import io
+import json
+import zipfile
+from unittest.mock import MagicMock, patch
+from asgiref.sync import sync_to_async
+from datetime import date, timedelta
+from django.conf import settings
+from django.test import Client, SimpleTestCase, TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase, APIClient
+from django.contrib.auth import get_user_model
+from AI_generator.models import CoverLetter
+from contacts.models import Contact
+from job_applications.models import JobApplication, Attachment
+from sync.events import CHANGE, EVENT_QUEUE_SIZE, RESYNC, broker, publish_change
+from sync.streams import EVENTS_PATH, change_events_app
+
+User = get_user_model()
+
+
+class SyncAPITestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="josh@example.com", password="testpass123"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse("sync")
+
+    def _job(self, company):
+        return JobApplication.objects.create(
+            user=self.user,
+            company=company,
+            position="SWE",
+            status="applied",
+            date_applied=date.today(),
+        )
+
+    def _age(self, model, pk, days=1):
+        # Push a row outside the overlap window, as if it synced long ago
+        model.objects.filter(pk=pk).update(
+            updated_at=timezone.now() - timedelta(days=days)
+        )
+
+    def test_full_sync_without_cursor(self):
+        self._job("Google")
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data["full"])
+        self.assertEqual(len(response.data["job_applications"]), 1)
+
+    def test_delta_returns_changed_rows_and_deletions(self):
+        stale = self._job("Stale")
+        changed = self._job("Changed")
+        removed = self._job("Removed")
+        contact = Contact.objects.create(user=self.user, name="Ada")
+        for job in (stale, changed, removed):
+            self._age(JobApplication, job.id)
+        self._age(Contact, contact.id)
+        since = timezone.now().isoformat()
+
+        self.client.put(
+            reverse("job_application_detail", args=[changed.id]),
+            {"status": "interview"},
+            format="multipart",
+        )
+        self.client.delete(reverse("job_application_detail", args=[removed.id]))
+        self.client.delete(reverse("contact-detail", args=[contact.id]))
+
+        response = self.client.get(self.url, {"updated_since": since})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.data["full"])
+        self.assertEqual(
+            [j["id"] for j in response.data["job_applications"]], [changed.id]
+        )
+        self.assertEqual(response.data["deleted"]["job_applications"], [removed.id])
+        self.assertEqual(response.data["deleted"]["contacts"], [contact.id])
+
+    def test_bulk_update_bumps_updated_at(self):
+        job = self._job("Google")
+        self._age(JobApplication, job.id)
+        since = timezone.now().isoformat()
+        self.client.post(
+            reverse("job_application_bulk_update"),
+            {"ids": [job.id], "status": "offer"},
+            format="json",
+        )
+        response = self.client.get(self.url, {"updated_since": since})
+        self.assertEqual([j["id"] for j in response.data["job_applications"]], [job.id])
+
+    def test_rejects_malformed_cursor(self):
+        response = self.client.get(self.url, {"updated_since": "yesterday"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_archive_streams_tables_and_files(self):
+        job = self._job("Meta")
+        Attachment.objects.create(
+            job_application=job, name="cv.pdf", type="resume", file_url="k/cv.pdf"
+        )
+        Attachment.objects.create(
+            job_application=job, name="gone.pdf", type="resume", file_url="k/gone"
+        )
+        Contact.objects.create(
+            user=self.user, name="Ada", email="ada@example.com", tags=["a", "b"]
+        )
+        cover = CoverLetter.objects.create(
+            user=self.user,
+            job_title="SWE",
+            company_name="Meta",
+            cover_letter_file_path=f"cover_letters/{self.user.id}/SWE_Meta.pdf",
+        )
+
+        def get_object(Bucket, Key):
+            if Key == "k/gone":
+                raise Exception("NoSuchKey")
+            body = MagicMock()
+            body.iter_chunks.return_value = [b"%PDF-", Key.encode()]
+            return {"Body": body}
+
+        s3 = MagicMock()
+        s3.get_object.side_effect = get_object
+        with patch("sync.views.get_s3_client", return_value=s3):
+            response = self.client.get(reverse("sync_archive"))
+        self.assertEqual(response.status_code, 200)
+        archive = zipfile.ZipFile(io.BytesIO(b"".join(response.streaming_content)))
+        self.assertIsNone(archive.testzip())
+
+        jobs = archive.read("job_applications.csv").decode().splitlines()
+        self.assertEqual(jobs[1].split(",")[:2], [str(job.id), "Meta"])
+        self.assertIn("a; b", archive.read("contacts.csv").decode())
+        attachment = next(n for n in archive.namelist() if n.startswith("attachments/"))
+        self.assertTrue(attachment.endswith("_cv.pdf"))
+        self.assertEqual(archive.read(attachment), b"%PDF-k/cv.pdf")
+        self.assertEqual(
+            archive.read(f"cover_letters/{cover.id}_SWE_Meta.pdf"),
+            b"%PDF-" + cover.cover_letter_file_path.encode(),
+        )
+        self.assertIn("gone.pdf", archive.read("missing_files.txt").decode())
+
+
+class ChangeBrokerTestCase(SimpleTestCase):
+    # publish_change defers to on_commit, which checks the connection state
+    databases = {"default"}
+
+    async def test_fans_out_to_the_users_streams(self):
+        async with broker.subscribe(1) as first, broker.subscribe(
+            1
+        ) as second, broker.subscribe(2) as other:
+            await sync_to_async(publish_change)(
+                1, "job_application", "updated", [7], {"status": "offer"}
+            )
+            for queue in (first, second):
+                event, data = await asyncio.wait_for(queue.get(), 2)
+                self.assertEqual(event, CHANGE)
+                self.assertEqual(
+                    json.loads(data),
+                    {
+                        "model": "job_application",
+                        "action": "updated",
+                        "ids": [7],
+                        "data": {"status": "offer"},
+                    },
+                )
+            self.assertTrue(other.empty())
+
+    async def test_slow_stream_is_told_to_resync(self):
+        async with broker.subscribe(1) as queue:
+            for _ in range(EVENT_QUEUE_SIZE + 1):
+                broker._dispatch(b"events:1", b"{}")
+            self.assertEqual(queue.qsize(), 1)
+            self.assertEqual(queue.get_nowait()[0], RESYNC)
+
+
+class ChangeStreamTestCase(TransactionTestCase):
+    # The stream closes its database connection after auth, which would
+    # break TestCase's wrapping transaction
+
+    async def _open_stream(self, cookie=b""):
+        sent = []
+        disconnected = asyncio.Event()
+
+        async def receive():
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {
+            "type": "http",
+            "method": "GET",
+            "path": EVENTS_PATH,
+            "query_string": b"",
+            "headers": [(b"cookie", cookie)] if cookie else [],
+        }
+        task = asyncio.create_task(change_events_app(scope, receive, send))
+        return task, sent, disconnected
+
+    async def _wait_for_body(self, sent, text):
+        for _ in range(100):
+            if any(text in m.get("body", b"").decode() for m in sent):
+                return
+            await asyncio.sleep(0.02)
+        self.fail(f"{text!r} never sent")
+
+    async def test_requires_login(self):
+        task, sent, _ = await self._open_stream()
+        await asyncio.wait_for(task, 2)
+        self.assertEqual(sent[0]["status"], 401)
+
+    async def test_streams_the_users_changes(self):
+        def login():
+            user = User.objects.create_user(
+                email="josh@example.com", password="testpass123"
+            )
+            client = Client()
+            client.force_login(user)
+            return user.id, client.cookies[settings.SESSION_COOKIE_NAME].value
+
+        user_id, session_id = await sync_to_async(login)()
+        cookie = f"{settings.SESSION_COOKIE_NAME}={session_id}".encode()
+        task, sent, disconnected = await self._open_stream(cookie)
+        await self._wait_for_body(sent, "retry:")
+        self.assertEqual(sent[0]["status"], 200)
+
+        await sync_to_async(publish_change)(user_id, "contact", "deleted", [3])
+        await self._wait_for_body(sent, '"action": "deleted"')
+        disconnected.set()
+        await asyncio.wait_for(task, 2)
@@ -0,0 +1,9 @@
+# sync/urls.py
+from django.urls import path
+from .views import ArchiveAPIView, SyncAPIView
+
+urlpatterns = [
+    path("", SyncAPIView.as_view(), name="sync"),
+    # Everything the user has stored, files included, as a streamed ZIP
+    path("archive/", ArchiveAPIView.as_view(), name="sync_archive"),
+]
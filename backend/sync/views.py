@@ -0,0 +1,119 @@
+# sync/views.py
+
+from collections import defaultdict
+from datetime import timedelta
+
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from contacts.models import Contact, Interaction
+from job_applications.models import JobApplication, Attachment
+from job_applications.views import get_s3_client
+
+from .archive import archive_chunks
+from .models import Tombstone
+from .serializers import SyncResponseSerializer
+
+# Rows committed slightly after server_time was read can carry an earlier
+# updated_at; re-sending this window makes sure nothing is skipped. Clients
+# upsert by id, so the overlap only costs a few duplicate rows.
+SYNC_OVERLAP = timedelta(seconds=5)
+# Tombstones older than this are pruned; older cursors get a full resync
+TOMBSTONE_RETENTION = timedelta(days=30)
+
+# response key -> model, for the "deleted" section
+SYNCED_MODELS = {
+    "job_applications": JobApplication,
+    "attachments": Attachment,
+    "contacts": Contact,
+    "interactions": Interaction,
+}
+
+
+class SyncAPIView(APIView):
+    """
+    Delta sync: everything the user changed or deleted since `updated_since`
+    (an ISO timestamp, normally the previous response's server_time). With no
+    cursor, or one older than the tombstone retention, the full data set is
+    returned with full=true and the client should replace its cache.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        server_time = timezone.now()
+        since_param = request.query_params.get("updated_since")
+        since = None
+        if since_param:
+            since = parse_datetime(since_param)
+            if since is None:
+                return Response(
+                    {"error": "updated_since must be an ISO 8601 timestamp"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+            if since < server_time - TOMBSTONE_RETENTION:
+                since = None
+        full = since is None
+
+        user = request.user
+        job_apps = JobApplication.objects.filter(user=user)
+        attachments = Attachment.objects.filter(
+            job_application__user=user
+        ).select_related("blob")
+        contacts = Contact.objects.filter(user=user)
+        interactions = Interaction.objects.filter(contact__user=user)
+        deleted = defaultdict(list)
+        if not full:
+            # (user, updated_at) indexes on the parents; the child tables are
+            # range-scanned on updated_at and joined to their parent for user
+            cutoff = since - SYNC_OVERLAP
+            job_apps = job_apps.filter(updated_at__gte=cutoff)
+            attachments = attachments.filter(updated_at__gte=cutoff)
+            contacts = contacts.filter(updated_at__gte=cutoff)
+            interactions = interactions.filter(updated_at__gte=cutoff)
+
+            labels = {model._meta.label: key for key, model in SYNCED_MODELS.items()}
+            tombstones = Tombstone.objects.filter(
+                user=user, deleted_at__gte=cutoff
+            ).values_list("model", "object_id")
+            for label, object_id in tombstones:
+                if label in labels:
+                    deleted[labels[label]].append(object_id)
+
+        payload = {
+            "server_time": server_time,
+            "full": full,
+            "job_applications": job_apps.order_by("id"),
+            "attachments": attachments.order_by("id"),
+            "contacts": contacts.order_by("id"),
+            "interactions": interactions.order_by("id"),
+            "deleted": {key: deleted.get(key, []) for key in SYNCED_MODELS},
+        }
+        return Response(SyncResponseSerializer(payload).data, status=status.HTTP_200_OK)
+
+
+class ArchiveAPIView(APIView):
+    """
+    Download everything the user has stored, files included, as one ZIP
+    that is streamed while it is built.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        response = StreamingHttpResponse(
+            archive_chunks(request.user, get_s3_client()),
+            content_type="application/zip",
+        )
+        filename = f"hiremind-data-{timezone.localdate().isoformat()}.zip"
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        # Minutes-long downloads must reach the client as they are produced
+        response["X-Accel-Buffering"] = "no"
+        return response
@@ -11,6 +11,13 @@ export async function fetchJobApplications(
   return await axios.get(API_URL + "/", { params, withCredentials: true });
 }
 
+// Fetch a single job application with every field (list pages are compact)
+export async function fetchJobApplication(
+  id: string
+): Promise<AxiosResponse<JobApplication>> {
+  return await axios.get(`${API_URL}/${id}/`, { withCredentials: true });
+}
+
 // Create a job application
 export async function createJobApplication(
   formData: FormData,
@@ -3,12 +3,14 @@ import type { JobApplication } from "@/types/JobApplicationTypes";
 import { getCookie } from "@/utils/csrfUtils";
 import {
   fetchJobApplications,
+  fetchJobApplication,
   createJobApplication,
   updateJobApplicationAPI,
   deleteJobApplicationAPI,
   deleteAttachmentAPI,
 } from "@/api/jobApplications";
 import { useSidebar } from "@/context/SideBarContext";
+import { useChangeEvents, type ChangeEvent } from "@/hooks/useChangeEvents";
 import { Button } from "@/components/ui/button";
 import { Input } from "@/components/ui/input";
 import { Label } from "@/components/ui/label";
@@ -130,6 +132,40 @@ const JobApplicationsPage: React.FC = () => {
     window.scrollTo(0, 0);
   }, [currentPage]);
 
+  // Patch the loaded page from server change events instead of refetching
+  const patchJobs = useCallback((ids: number[], patch: (job: JobApplication) => JobApplication | null) => {
+    const targets = new Set(ids.map(String));
+    setJobs(prev =>
+      prev.flatMap(job => {
+        if (!targets.has(String(job.id))) return [job];
+        const next = patch(job);
+        return next ? [next] : [];
+      })
+    );
+  }, []);
+
+  // A status change can move a job off the active tab
+  const visibleOnTab = (job: JobApplication) =>
+    activeTab === "all" || job.status === activeTab ? job : null;
+
+  useChangeEvents(
+    (event: ChangeEvent) => {
+      if (event.model === "job_application") {
+        // New rows land wherever the server's ordering puts them
+        if (event.action === "created") fetchJobs(currentPage);
+        else if (event.action === "deleted") patchJobs(event.ids, () => null);
+        else patchJobs(event.ids, job => visibleOnTab({ ...job, ...event.data }));
+      } else if (event.model === "attachment" && event.action === "deleted") {
+        const removed = new Set(event.ids.map(String));
+        patchJobs([event.data?.job_application], job => ({
+          ...job,
+          attachments: job.attachments.filter(a => !removed.has(String(a.id))),
+        }));
+      }
+    },
+    () => fetchJobs(currentPage)
+  );
+
   // Form handlers
   const handleChange = (e: React.ChangeEvent<HTMLInputElement | HTMLTextAreaElement>) => {
     const { name, value } = e.target;
@@ -179,9 +215,9 @@ const JobApplicationsPage: React.FC = () => {
     Object.entries(formData).forEach(([k, v]) => form.append(k, v as string));
     files.forEach(f => form.append("attachments", f));
     try {
-      await updateJobApplicationAPI(currentJob.id, form, getCookie("csrftoken"));
-      resetPage();
-      fetchJobs(1);
+      const { data } = await updateJobApplicationAPI(currentJob.id, form, getCookie("csrftoken"));
+      const notes_preview = (data.notes || "").slice(0, 200);
+      patchJobs([Number(data.id)], job => visibleOnTab({ ...job, ...data, notes_preview }));
       resetForm();
       setIsEditOpen(false);
       setCurrentJob(null);
@@ -207,13 +243,24 @@ const JobApplicationsPage: React.FC = () => {
     if (!confirm("Delete this attachment?")) return;
     try {
       await deleteAttachmentAPI(jobId, attId, getCookie("csrftoken"));
-      fetchJobs(currentPage);
+      patchJobs([Number(jobId)], job => ({
+        ...job,
+        attachments: job.attachments.filter(a => String(a.id) !== String(attId)),
+      }));
     } catch {
       alert("Error deleting attachment");
     }
   };
 
-  const startEdit = (job: JobApplication) => {
+  const startEdit = async (listJob: JobApplication) => {
+    // List cards only carry a notes preview; load the full record to edit
+    let job = listJob;
+    try {
+      job = (await fetchJobApplication(listJob.id)).data;
+    } catch {
+      alert("Error loading job application");
+      return;
+    }
     setCurrentJob(job);
     setFormData({
       company: job.company,
@@ -221,7 +268,7 @@ const JobApplicationsPage: React.FC = () => {
       location: job.location,
       status: job.status,
       date_applied: new Date(job.date_applied).toISOString().split("T")[0],
-      notes: job.notes,
+      notes: job.notes || "",
       salary: job.salary || "",
       contact_person: job.contact_person || "",
       contact_email: job.contact_email || "",
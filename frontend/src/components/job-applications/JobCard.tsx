@@ -138,10 +138,10 @@ const JobCard: React.FC<JobCardProps> = ({ job, onEdit, onDelete, onDeleteAttach
             )}
           </div>
         )}
-        {job.notes && (
+        {(job.notes_preview ?? job.notes) && (
           <div className="mb-3 mt-4">
             <h4 className="text-sm font-medium mb-1.5">Notes</h4>
-            <p className="text-sm text-muted-foreground line-clamp-3">{job.notes}</p>
+            <p className="text-sm text-muted-foreground line-clamp-3">{job.notes_preview ?? job.notes}</p>
           </div>
         )}
         {job.attachments && job.attachments.length > 0 && (
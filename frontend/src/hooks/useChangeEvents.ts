@@ -0,0 +1,36 @@
+import { useEffect, useRef } from "react";
+
+const EVENTS_URL = import.meta.env.VITE_API_BASE_URL + "sync/events/";
+
+export type ChangeEvent = {
+  model: "job_application" | "attachment" | "contact" | "interaction" | "cover_letter";
+  action: "created" | "updated" | "deleted";
+  ids: number[];
+  // Field values that apply to every id (the new row, or e.g. { status })
+  data: Record<string, any> | null;
+};
+
+// Subscribe to the server's change stream. onResync runs when events were
+// missed (reconnect or backlog) and local state should be refetched.
+export function useChangeEvents(
+  onChange: (event: ChangeEvent) => void,
+  onResync: () => void
+) {
+  const handlers = useRef({ onChange, onResync });
+  handlers.current = { onChange, onResync };
+
+  useEffect(() => {
+    const source = new EventSource(EVENTS_URL, { withCredentials: true });
+    let opened = false;
+    source.addEventListener("change", e =>
+      handlers.current.onChange(JSON.parse((e as MessageEvent).data))
+    );
+    source.addEventListener("resync", () => handlers.current.onResync());
+    // EventSource reconnects by itself; anything sent meanwhile is lost
+    source.onopen = () => {
+      if (opened) handlers.current.onResync();
+      opened = true;
+    };
+    return () => source.close();
+  }, []);
+}
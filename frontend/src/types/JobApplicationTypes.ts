@@ -15,6 +15,8 @@ export interface JobApplication {
   status: "saved" | "applied" | "interview" | "offer" | "rejected"
   date_applied: string
   notes: string
+  // List responses send notes_preview instead of notes; fetch the detail for notes
+  notes_preview?: string
   attachments: Attachment[]
   salary?: string
   contactPerson?: string